@@ -0,0 +1,77 @@
+"""
+Files/sec converting small HTML pages with and without the fast path.
+
+Usage
+-----
+$ python benchmarks/bench_html_fast_path.py wiki/*.html
+$ python benchmarks/bench_html_fast_path.py --generate 2000
+
+Runs the same inputs twice: once through Docling's HTML backend one file
+at a time (``fast_html=False``, the old behaviour) and once with the
+lean parser, which falls back to Docling for pages it can't handle.
+"""
+from __future__ import annotations
+
+import argparse
+import tempfile
+import time
+from pathlib import Path
+from typing import List
+
+from merge2md.converter import ConversionSettings, DoclingMarkdownConverter
+
+_PAGE = """<!DOCTYPE html>
+<html><head><title>Page {n}</title><style>body {{ margin: 0 }}</style></head>
+<body>
+<h1>Page {n}</h1>
+<p>Intro for page {n} with a <a href="page{next}.html">link</a> and <b>bold</b> text.</p>
+<h2>Details</h2>
+<ul><li>First point</li><li>Second point<ul><li>nested</li></ul></li></ul>
+<table><tr><th>Key</th><th>Value</th></tr><tr><td>id</td><td>{n}</td></tr></table>
+<pre>print({n})</pre>
+</body></html>
+"""
+
+
+def _generate(count: int, directory: Path) -> List[Path]:
+    """Write *count* wiki-style pages to *directory*."""
+    paths = []
+    for n in range(count):
+        path = directory / f"page{n:05d}.html"
+        path.write_text(_PAGE.format(n=n, next=n + 1), encoding="utf-8")
+        paths.append(path)
+    return paths
+
+
+def _run(paths: List[Path], settings: ConversionSettings) -> float:
+    converter = DoclingMarkdownConverter(settings)
+    # Warm up so backend import/initialisation doesn't skew the comparison.
+    converter.to_markdown(paths[:1])
+    start = time.perf_counter()
+    converter.to_markdown(paths)
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    ap.add_argument("files", nargs="*", type=Path)
+    ap.add_argument("--generate", type=int, metavar="N",
+                    help="Benchmark N synthetic pages instead of FILES")
+    args = ap.parse_args()
+    if not args.files and not args.generate:
+        ap.error("give HTML files or --generate N")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        files = args.files or _generate(args.generate, Path(tmp))
+        baseline = _run(files, ConversionSettings(fast_html=False, dedupe=False))
+        fast = _run(files, ConversionSettings(dedupe=False))
+
+    count = len(files)
+    print(f"{'mode':<10} {'seconds':>10} {'files/sec':>10}")
+    print(f"{'docling':<10} {baseline:>10.2f} {count / baseline:>10.1f}")
+    print(f"{'fast':<10} {fast:>10.2f} {count / fast:>10.1f}")
+    print(f"speed-up: {baseline / fast:.1f}x over {count} files")
+
+
+if __name__ == "__main__":
+    main()
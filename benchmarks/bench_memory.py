@@ -0,0 +1,136 @@
+"""
+Memory retained and peak per call over a long run of conversions.
+
+Usage
+-----
+$ python benchmarks/bench_memory.py                        # tests/data fixtures
+$ python benchmarks/bench_memory.py docs/*.pdf --rounds 500
+$ python benchmarks/bench_memory.py --synthetic 32         # plus a 32 MiB Markdown/CSV pair
+
+Converts the same inputs *rounds* times on one converter – through
+`to_markdown`, `MarkdownMerger.merge` and `export`, with real Docling –
+and reports, per stage, the Python heap still held after each call
+(tracemalloc), the peak while it ran, and the process RSS before and
+after. A steady per-call "retained" figure is a leak in Python code; RSS
+growing while the heap stays flat points at native code (model caches,
+allocator fragmentation). The top allocation sites of retained memory
+are listed to say which.
+"""
+from __future__ import annotations
+
+import argparse
+import gc
+import os
+import tempfile
+import tracemalloc
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+from merge2md.converter import ConversionSettings, DoclingMarkdownConverter
+from merge2md.merger import MarkdownMerger
+
+_DATA_DIR = Path(__file__).resolve().parent.parent / "tests" / "data"
+
+
+def _rss() -> Optional[int]:
+    """Resident set size in bytes, where /proc is available."""
+    try:
+        with open("/proc/self/statm") as fh:
+            return int(fh.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except OSError:
+        return None
+
+
+def _generate(mib: int, directory: Path) -> List[Path]:
+    """Write a Markdown file and a CSV of about *mib* MiB each to *directory*."""
+    md_path = directory / "synthetic.md"
+    csv_path = directory / "synthetic.csv"
+    with open(md_path, "w", encoding="utf-8") as md, open(csv_path, "w", encoding="utf-8") as table:
+        table.write("id,name,value\n")
+        n = 0
+        while md.tell() < mib << 20:
+            md.write(f"## Section {n}\n\n" + "Lorem ipsum dolor sit amet. " * 40 + "\n\n")
+            table.write(f"{n},row {n},{n * 3}\n" * 50)
+            n += 1
+    return [md_path, csv_path]
+
+
+class _Stage:
+    """Per-call numbers for one stage of the run."""
+
+    def __init__(self) -> None:
+        self.calls = 0
+        self.peak = 0
+
+    def measure(self, call: Callable[[], object]) -> object:
+        tracemalloc.reset_peak()
+        current, _ = tracemalloc.get_traced_memory()
+        value = call()
+        self.peak = max(self.peak, tracemalloc.get_traced_memory()[1] - current)
+        self.calls += 1
+        return value
+
+
+def _run(paths: List[Path], rounds: int, out: Path, top: int) -> None:
+    converter = DoclingMarkdownConverter(ConversionSettings(dedupe=False))
+    merger = MarkdownMerger()
+    # Warm up: model loading and lazy imports aren't leaks.
+    merger.export(merger.merge(converter.to_markdown(paths)), out)
+
+    stages: Dict[str, _Stage] = {name: _Stage() for name in ("to_markdown", "merge", "export")}
+    gc.collect()
+    rss_start = _rss()
+    tracemalloc.start(10)
+    before = tracemalloc.take_snapshot()
+    for _ in range(rounds):
+        blocks = stages["to_markdown"].measure(lambda: converter.to_markdown(paths))
+        merged = stages["merge"].measure(lambda: merger.merge(blocks))
+        stages["export"].measure(lambda: merger.export(merged, out))
+        del blocks, merged
+    gc.collect()
+    after = tracemalloc.take_snapshot()
+    # tracemalloc's own bookkeeping grows with the run; it isn't ours.
+    overhead = tracemalloc.get_tracemalloc_memory()
+    rss_end = _rss()
+    tracemalloc.stop()
+
+    growth = after.compare_to(before, "traceback")
+    retained = sum(stat.size_diff for stat in growth)
+    print(f"{len(paths)} inputs x {rounds} rounds")
+    print(f"{'stage':<12} {'calls':>7} {'peak/call':>12}")
+    for name, stage in stages.items():
+        print(f"{name:<12} {stage.calls:>7} {stage.peak / 1024:>10.1f} KiB")
+    print(f"retained: {retained / 1024:.1f} KiB total, {retained / rounds:.1f} B per round")
+    if rss_start is not None and rss_end is not None:
+        print(
+            f"rss: {rss_start / 2**20:.1f} -> {(rss_end - overhead) / 2**20:.1f} MiB "
+            f"({(rss_end - overhead - rss_start) / rounds / 1024:+.1f} KiB per round, "
+            f"tracemalloc's own {overhead / 2**20:.1f} MiB excluded)"
+        )
+    print(f"top {top} sites of retained memory:")
+    for stat in growth[:top]:
+        frame = stat.traceback[-1]  # where the memory was allocated
+        print(
+            f"  {stat.size_diff / 1024:>+9.1f} KiB {stat.count_diff:>+7} blocks"
+            f"  {frame.filename}:{frame.lineno}"
+        )
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    ap.add_argument("files", nargs="*", type=Path)
+    ap.add_argument("--rounds", type=int, default=200)
+    ap.add_argument("--synthetic", type=int, metavar="MIB",
+                    help="also convert a generated Markdown file and CSV of this size")
+    ap.add_argument("--top", type=int, default=10)
+    args = ap.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = args.files or sorted(_DATA_DIR.iterdir())
+        if args.synthetic:
+            paths += _generate(args.synthetic, Path(tmp))
+        _run(paths, args.rounds, Path(tmp) / "out.md", args.top)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""
+Pages/sec with the default batch sizes and with bigger ones.
+
+Usage
+-----
+$ python benchmarks/bench_ocr_batching.py scans/*.pdf --doc-batch-size 8
+
+Runs the same inputs twice: once with `ConversionSettings`' defaults
+(4 pages per model call, one file at a time – what runs without any
+batching flags) and once with the requested batch sizes.
+"""
+from __future__ import annotations
+
+import argparse
+import time
+from pathlib import Path
+from typing import List
+
+from merge2md.converter import ConversionSettings, DoclingMarkdownConverter
+
+
+def _count_pages(paths: List[Path]) -> int:
+    """Count PDF pages via pypdfium2 (a Docling dependency); other files count as one."""
+    import pypdfium2
+
+    pages = 0
+    for path in paths:
+        if path.suffix.lower() == ".pdf":
+            pages += len(pypdfium2.PdfDocument(str(path)))
+        else:
+            pages += 1
+    return pages
+
+
+def _run(paths: List[Path], settings: ConversionSettings) -> float:
+    converter = DoclingMarkdownConverter(settings)
+    # Warm up the models so load time doesn't skew the comparison.
+    converter.to_markdown(paths[:1])
+    start = time.perf_counter()
+    converter.to_markdown(paths)
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    ap.add_argument("files", nargs="+", type=Path)
+    ap.add_argument("--page-batch-size", type=int, default=16)
+    ap.add_argument("--doc-batch-size", type=int, default=8)
+    ap.add_argument("--batch-concurrency", type=int, default=2)
+    args = ap.parse_args()
+
+    pages = _count_pages(args.files)
+    baseline = _run(args.files, ConversionSettings())
+    batched = _run(
+        args.files,
+        ConversionSettings(
+            page_batch_size=args.page_batch_size,
+            doc_batch_size=args.doc_batch_size,
+            batch_concurrency=args.batch_concurrency,
+        ),
+    )
+
+    print(f"{'mode':<10} {'seconds':>10} {'pages/sec':>10}")
+    print(f"{'baseline':<10} {baseline:>10.2f} {pages / baseline:>10.2f}")
+    print(f"{'batched':<10} {batched:>10.2f} {pages / batched:>10.2f}")
+    print(f"speed-up: {baseline / batched:.2f}x over {pages} pages")
+
+
+if __name__ == "__main__":
+    main()
@@ -3,25 +3,74 @@
 Exposes a compact public API (`convert_and_merge`) so other Python
 programs—or your Automator script—can call the core logic directly.
 """
+import logging
+from contextlib import ExitStack
 from pathlib import Path
-from typing import Iterable, Optional
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple, Union
 
+from .chunking import ChunkWriter
 from .converter import DoclingMarkdownConverter, ConversionSettings
+from .jobs import JobQueue
 from .merger import MarkdownMerger
-from .notifier import get_default_output_path, show_completion_dialog
+from .profiling import stage
+from .progress import ProgressCallback
+from .results import (
+    ConversionResult,
+    RetryPolicy,
+    SpilledMarkdown,
+    load_results,
+    save_results,
+)
+from .notifier import (
+    Notifier,
+    default_notifier,
+    get_default_output_path,
+    notify,
+    show_completion_dialog,
+)
 
 __all__ = ["convert_and_merge", "ConversionSettings", "DoclingMarkdownConverter", 
-         "get_default_output_path", "show_completion_dialog"]
+         "ConversionResult", "RetryPolicy", "JobQueue", "get_default_output_path",
+         "show_completion_dialog"]
 __version__: str = "0.1.0"
 
+logger = logging.getLogger(__name__)
+
+
+def _resolve_output(output: Union[str, Path, None], reserved: List[Path]) -> Path:
+    """
+    Default to Downloads/merged.md; bare filenames also land in Downloads.
+
+    Downloads names are reserved on disk (and appended to *reserved*) so
+    parallel runs never write to the same file.
+    """
+    output = Path("merged.md" if output is None else output)
+    if output.parent.parts:
+        return output
+    path = get_default_output_path(output.name, reserve=True)
+    reserved.append(path)
+    return path
+
+
 def convert_and_merge(
     paths: Iterable[Path],
-    output: Optional[Path] = None,
+    output: Union[str, Path, Sequence[Union[str, Path]], None] = None,
     *,
     title: Optional[str] = None,
     settings: Optional[ConversionSettings] = None,
+    dedupe_sections: bool = False,
+    toc: bool = False,
+    chunk_tokens: int = 512,
+    compression_level: Optional[int] = None,
+    compression_threads: int = -1,
+    fsync: bool = False,
     show_notification: bool = True,
-) -> Path:
+    notifier: Optional[Notifier] = None,
+    progress: Optional[ProgressCallback] = None,
+    retry: Optional[RetryPolicy] = None,
+    results: Optional[Path] = None,
+    retry_failed: bool = False,
+) -> Union[Path, List[Path]]:
     """
     Convert *paths* to Markdown (via Docling) and merge into *output*.
 
@@ -30,39 +79,166 @@ def convert_and_merge(
     paths
         Collection of file paths or `Path` objects.
     output
-        Destination path. If None, uses "merged.md" in Downloads folder.
-        Extension determines output format: `.md` for Markdown, `.pdf` for PDF.
+        Destination path, or a list of them to export several formats from
+        one conversion pass. If None, uses "merged.md" in Downloads folder.
+        Extension determines output format: `.md` for Markdown, `.pdf` for
+        PDF, `.html` for HTML, `.md.gz`/`.md.zst` for compressed Markdown,
+        `.jsonl` for RAG chunks (one JSON object per line, written as each
+        document finishes converting).
     title
         Optional H1 heading inserted at the top of the merged document.
     settings
         Optional `ConversionSettings` instance for fine-tuning OCR.
+    dedupe_sections
+        Collapse near-identical sections (e.g. repeated boilerplate
+        exhibits) in the merged output.
+    toc
+        Prepend a table of contents with an anchor per source file and
+        heading. Markdown outputs also get a ``<output>.index.json``
+        sidecar mapping each source and heading to byte offsets.
+    chunk_tokens
+        Upper bound on words per chunk for `.jsonl` outputs.
+    compression_level
+        gzip/zstd level for `.md.gz`/`.md.zst` outputs (default: 6 / 3).
+    compression_threads
+        zstd worker threads; -1 (default) uses every core.
+    fsync
+        Flush Markdown outputs to disk before they are renamed into place
+        (slower; protects against power loss, not just crashes).
     show_notification
-        Whether to show a completion notification (macOS only).
+        Whether to send a completion notification.
+    notifier
+        Backend for it, e.g. `merge2md.notifier.WebhookNotifier`; defaults
+        to a Finder dialog on macOS, ``notify-send`` on Linux desktops, else
+        a console line. It runs on a background thread, so this function
+        never waits on the notification.
+    progress
+        Called with a `merge2md.progress.ProgressEvent` as each file is
+        queued, started, finished or failed; `merge2md.progress.ProgressBar`
+        draws them with throughput and ETA.
+    retry
+        `merge2md.results.RetryPolicy` for transient failures (default:
+        three attempts with exponential backoff).
+    results
+        Write a `ConversionResult` per input (status, timings, pages,
+        error) to this JSON file; converted Markdown goes next to it in
+        ``<results>.blocks/``.
+    retry_failed
+        Read *results* from an earlier run first: files that succeeded
+        there are reused as-is and only the rest are converted again.
+        With no *paths*, the earlier run's inputs are used. Can't rebuild
+        `.jsonl` outputs, which need every converted document.
 
     Returns
     -------
-    Path
-        The *output* path, for convenience.
+    Path or list[Path]
+        The resolved *output* path(s), in the shape they were given.
     """
-    # Determine output path
-    if output is None:
-        output = get_default_output_path("merged.md")
-    elif not output.parent.parts:
-        # If only filename provided, put in Downloads
-        output = get_default_output_path(output.name)
+    many = output is not None and not isinstance(output, (str, Path))
+    reserved: List[Path] = []
+    outputs = [
+        _resolve_output(Path(o), reserved) for o in output
+    ] if many else [_resolve_output(output, reserved)]
+    
+    chunk_outputs = [o for o in outputs if o.suffix.lower() == ".jsonl"]
+    doc_outputs = [o for o in outputs if o.suffix.lower() != ".jsonl"]
     
+    paths = list(paths)
+    previous: Dict[Path, ConversionResult] = {}
     try:
-        converter = DoclingMarkdownConverter(settings=settings)
-        md_blocks = converter.to_markdown(paths)
-        merger = MarkdownMerger()
-        merged_md = merger.merge(md_blocks, header=title)
-        merger.export(merged_md, output)
-        
+        if retry_failed:
+            if results is None or chunk_outputs:
+                raise ValueError("retry_failed needs a results file and no .jsonl outputs")
+            prior = load_results(results)
+            paths = paths or [result.path for result in prior]
+            previous = {
+                result.path: result
+                for result in prior
+                if result.ok and (result.markdown is not None or (
+                    result.spill_path is not None and result.spill_path.exists()
+                ))
+            }
+
+        merger = MarkdownMerger(
+            dedupe_sections=dedupe_sections,
+            compression_level=compression_level,
+            compression_threads=compression_threads,
+            fsync=fsync,
+        )
+        merger.check_formats(doc_outputs)
+        converter = DoclingMarkdownConverter(settings=settings, progress=progress, retry=retry)
+        reused = [isinstance(path, Path) and path in previous for path in paths]
+        fresh = converter.iter_results(
+            [path for path, skip in zip(paths, reused) if not skip]
+        )
+        outcomes: List[ConversionResult] = []
+        # Spill files live as long as their documents; hold them until exported.
+        spilled_documents: List[SpilledMarkdown] = []
+        with ExitStack() as stack:
+            writers = [
+                stack.enter_context(ChunkWriter(o, max_tokens=chunk_tokens))
+                for o in chunk_outputs
+            ]
+            for path, skip in zip(paths, reused):
+                if skip:
+                    outcomes.append(previous[path])
+                    continue
+                result, document = next(fresh)
+                if document is not None:
+                    with stage("chunk"):
+                        for writer in writers:
+                            writer.write(result.path, document)
+                    if isinstance(document, SpilledMarkdown):
+                        # Already on disk; the merger copies it from there.
+                        result.spill_path = document.path
+                        spilled_documents.append(document)
+                    elif doc_outputs or results is not None:
+                        with stage("export_to_markdown"):
+                            result.markdown = document.export_to_markdown()
+                outcomes.append(result)
+        if previous:
+            logger.info("Reused %d files from %s", sum(reused), results)
+
+        spilled = any(result.ok and result.markdown is None for result in outcomes)
+        if doc_outputs and spilled and not (toc or dedupe_sections):
+            # Blocks on disk (worker processes, reused results) are copied
+            # into the outputs without being read back into memory.
+            with stage("export"):
+                merger.export_parts(
+                    [
+                        result.markdown if result.markdown is not None else result.spill_path
+                        for result in outcomes if result.ok
+                    ],
+                    doc_outputs,
+                    header=title,
+                )
+        elif doc_outputs:
+            converted: List[Tuple[Path, str]] = [
+                (result.path, result.read_markdown()) for result in outcomes if result.ok
+            ]
+            sources = [path for path, _ in converted]
+            with stage("merge"):
+                merged_md = merger.merge(
+                    [md for _, md in converted], header=title, sources=sources, toc=toc
+                )
+            with stage("export"):
+                merger.export_all(merged_md, doc_outputs)
+            if toc:
+                for out_path in doc_outputs:
+                    if out_path.suffix.lower() == ".md":
+                        merger.write_index(merged_md, out_path, sources)
+        if results is not None:
+            save_results(outcomes, results)
+
         if show_notification:
-            show_completion_dialog(output, success=True)
+            notify(notifier or default_notifier(), outputs[0], success=True)
         
-        return output
+        return outputs if many else outputs[0]
     except Exception as e:
+        # Don't leave empty placeholders for outputs that never got written.
+        for path in reserved:
+            if path.exists() and path.stat().st_size == 0:
+                path.unlink()
         if show_notification:
-            show_completion_dialog(output, success=False)
+            notify(notifier or default_notifier(), outputs[0], success=False)
         raise
\ No newline at end of file
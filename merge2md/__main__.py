@@ -4,19 +4,36 @@ Command-line interface for merge2md.
 Usage
 -----
 $ python -m merge2md *.pdf *.docx -o merged.pdf --title "Pack"
+$ python -m merge2md *.pdf -o pack.md -o pack.pdf -o pack.html
+$ python -m merge2md bundle.zip 'scans.zip!/*.pdf' -o merged.md
+$ python -m merge2md *.pdf -o pack.md --profile-to prof/
+$ python -m merge2md *.pdf -o pack.md --results run.json
+$ python -m merge2md -o pack.md --results run.json --retry-failed
+$ python -m merge2md models fetch --path ~/models
+$ python -m merge2md models verify --path ~/models
+$ python -m merge2md watch ~/Scans -o scans.md
+$ python -m merge2md coordinator /shared/q.db /shared/in/*.pdf -o out.md
+$ python -m merge2md worker /shared/q.db          # on each host
 """
 from __future__ import annotations
 
 import argparse
 import logging
 import sys
+from contextlib import nullcontext
 from pathlib import Path
-from concurrent.futures import ThreadPoolExecutor
 
-from .converter import ConversionSettings, DoclingMarkdownConverter
-from .merger import MarkdownMerger
+from . import convert_and_merge
+from .converter import OCR_ENGINES, PROFILES, ConversionSettings, DoclingMarkdownConverter
+from .distributed import WorkQueue, coordinate, run_worker
+from .models import DEFAULT_ARTIFACTS_PATH, fetch_models, verify_models
+from .notifier import NOTIFIERS, get_notifier
+from .profiling import Profiler
+from .progress import ProgressBar
+from .results import RetryPolicy
+from .sources import ARCHIVE_SEP, expand_archive, is_archive
 from .utils import natural_sort
-from .notifier import show_completion_dialog, get_default_output_path
+from .watcher import FolderWatcher
 
 logging.basicConfig(
     level=logging.INFO,
@@ -35,17 +52,146 @@ def _parse_args(argv: list[str] | None = None) -> argparse.Namespace:
     )
     ap.add_argument(
         "files", 
-        nargs="+", 
-        help="One or more files or glob patterns. Supported formats: "
-             "PDF, DOCX, PPTX, HTML, CSV, MD, AsciiDoc, images (PNG, JPG, etc.)"
+        nargs="*", 
+        help="One or more files or glob patterns (optional with --retry-failed). "
+             "Supported formats: PDF, DOCX, PPTX, HTML, CSV, MD, AsciiDoc, images (PNG, JPG, etc.); "
+             "ZIP archives are read in place ('bundle.zip' or 'bundle.zip!/*.pdf')"
     )
     ap.add_argument(
         "-o", "--output", 
+        dest="outputs",
+        action="append",
         default=None, 
-        help="Output path (default: merged.md in Downloads folder)"
+        help="Output path; repeat to export several formats (.md, .md.gz, .md.zst, "
+             ".pdf, .html, .jsonl chunks) from one conversion "
+             "(default: merged.md in Downloads folder)"
     )
     ap.add_argument("--title", help="Optional H1 title in the merged file")
-    ap.add_argument("--threads", type=int, default=4, help="Parallel workers")
+    ap.add_argument(
+        "--toc",
+        action="store_true",
+        help="Prepend a table of contents; .md outputs also get a "
+             "<output>.index.json of byte offsets per source and heading",
+    )
+    ap.add_argument(
+        "--compress-level",
+        type=int,
+        default=None,
+        help="Compression level for .md.gz/.md.zst outputs (default: gzip 6, zstd 3)",
+    )
+    ap.add_argument(
+        "--compress-threads",
+        type=int,
+        default=-1,
+        help="zstd compression threads; -1 uses every core, 0 compresses inline (default: -1)",
+    )
+    ap.add_argument(
+        "--fsync",
+        action="store_true",
+        help="fsync Markdown outputs before renaming them into place",
+    )
+    ap.add_argument(
+        "--progress",
+        choices=["auto", "on", "off"],
+        default="auto",
+        help="Live progress bar with pages/s and ETA on stderr (default: auto – when a TTY)",
+    )
+    ap.add_argument(
+        "--notify",
+        choices=["auto", *NOTIFIERS, "webhook"],
+        default="auto",
+        help="Completion notification, sent without blocking (default: auto – "
+             "dialog on macOS, notify-send on Linux desktops, else console)",
+    )
+    ap.add_argument(
+        "--webhook-url",
+        default=None,
+        help="Endpoint for --notify webhook; receives {\"output\", \"success\"} as JSON",
+    )
+    ap.add_argument(
+        "--chunk-tokens",
+        type=int,
+        default=512,
+        help="Max words per chunk for .jsonl outputs (default: 512)",
+    )
+    ap.add_argument(
+        "--results",
+        type=Path,
+        default=None,
+        metavar="FILE",
+        help="Write each file's status, timings, pages and error to FILE (JSON); "
+             "converted Markdown is kept in FILE.blocks/",
+    )
+    ap.add_argument(
+        "--retry-failed",
+        action="store_true",
+        help="Re-convert only the files that failed in the --results run, "
+             "reusing the rest (files default to that run's inputs)",
+    )
+    ap.add_argument(
+        "--retries",
+        type=int,
+        default=3,
+        help="Attempts per file for transient errors such as timeouts or "
+             "out-of-memory (default: 3)",
+    )
+    ap.add_argument(
+        "--retry-backoff",
+        type=float,
+        default=1.0,
+        help="Seconds before the first retry, doubling each time (default: 1)",
+    )
+    ap.add_argument(
+        "--profile-to",
+        type=Path,
+        default=None,
+        metavar="DIR",
+        help="Profile the run: write a stage-timing summary, collapsed stacks "
+             "(for flame graphs) and cProfile stats to DIR",
+    )
+    _add_conversion_args(ap)
+    return ap.parse_args(argv)
+
+
+def _add_conversion_args(ap: argparse.ArgumentParser, threads: int = 4) -> None:
+    """
+    Flags shared by every command that converts files (see `_build_settings`).
+
+    *threads* is the default worker count; commands that convert one file
+    at a time pass 1 so the models keep every core.
+    """
+    ap.add_argument(
+        "--no-dedupe",
+        action="store_true",
+        help="Convert byte-identical inputs separately instead of once",
+    )
+    ap.add_argument(
+        "--dedupe-sections",
+        action="store_true",
+        help="Collapse near-identical sections in the merged output",
+    )
+    ap.add_argument(
+        "--threads", type=int, default=threads, help=f"Parallel workers (default: {threads})"
+    )
+    ap.add_argument(
+        "--processes",
+        action="store_true",
+        help="Run the parallel workers as processes, each loading its own models",
+    )
+    ap.add_argument(
+        "--model-threads",
+        type=int,
+        default=None,
+        help="Intra-op (torch/ONNX) threads per worker "
+             "(default: CPU cores split evenly across parallel workers; "
+             "Docling's own default for one worker)",
+    )
+    ap.add_argument(
+        "--device",
+        choices=["auto", "cpu", "cuda", "mps"],
+        default="auto",
+        help="Accelerator device for Docling models (default: auto)",
+    )
     ap.add_argument(
         "--lang",
         dest="languages",
@@ -53,53 +199,413 @@ def _parse_args(argv: list[str] | None = None) -> argparse.Namespace:
         help="Language code for OCR (can be used multiple times)",
     )
     ap.add_argument("--no-ocr", action="store_true", help="Disable OCR entirely")
-    return ap.parse_args(argv)
+    ap.add_argument(
+        "--ocr-engine",
+        choices=sorted(OCR_ENGINES),
+        default=None,
+        help="OCR engine (default: easyocr, or the profile's engine)",
+    )
+    ap.add_argument(
+        "--profile",
+        choices=list(PROFILES),
+        default=None,
+        help="Speed/quality preset for OCR engine, table mode and image scale",
+    )
+    ap.add_argument(
+        "--no-tables",
+        action="store_true",
+        help="Skip table-structure recognition (much faster for prose)",
+    )
+    ap.add_argument(
+        "--table-mode",
+        choices=["fast", "accurate"],
+        default=None,
+        help="TableFormer mode (default: accurate, or the profile's mode)",
+    )
+    ap.add_argument(
+        "--picture-classification",
+        action="store_true",
+        help="Classify pictures (off by default)",
+    )
+    ap.add_argument(
+        "--picture-images",
+        action="store_true",
+        help="Extract picture images (off by default)",
+    )
+    ap.add_argument(
+        "--override",
+        dest="overrides",
+        action="append",
+        metavar="PATTERN:KEY=VALUE[,KEY=VALUE]",
+        help="Per-file settings for names matching PATTERN, e.g. "
+             "'*financial*.pdf:table_structure=true,table_mode=accurate' "
+             "(can be used multiple times)",
+    )
+    ap.add_argument(
+        "--artifacts-path",
+        type=Path,
+        default=None,
+        help="Load Docling models from this directory (see `merge2md models fetch`) "
+             "and never download",
+    )
+    ap.add_argument(
+        "--cache-dir",
+        type=Path,
+        default=None,
+        help="Keep converted documents as compressed Docling JSON here; "
+             "unchanged inputs are re-exported from it without running the models",
+    )
+    ap.add_argument(
+        "--page-batch-size",
+        type=int,
+        default=4,
+        help="Pages of one document per layout/OCR model call (default: 4)",
+    )
+    ap.add_argument(
+        "--doc-batch-size",
+        type=int,
+        default=1,
+        help="Files Docling takes at a time and converts side by side "
+             "(default: 1)",
+    )
+    ap.add_argument(
+        "--batch-concurrency",
+        type=int,
+        default=1,
+        help="Threads converting the files of a batch side by side (default: 1)",
+    )
+    ap.add_argument(
+        "--csv-max-rows",
+        type=int,
+        default=None,
+        help="Truncate CSV/TSV tables after this many rows (default: keep all)",
+    )
+    ap.add_argument(
+        "--csv-no-align",
+        action="store_true",
+        help="Don't pad CSV table cells to a common width (smaller output)",
+    )
+    ap.add_argument(
+        "--docling-csv",
+        action="store_true",
+        help="Convert CSV through Docling's document model instead of streaming it",
+    )
+    ap.add_argument(
+        "--docling-html",
+        action="store_true",
+        help="Convert every HTML page through Docling, not just those the "
+             "lightweight parser can't handle",
+    )
+    ap.add_argument(
+        "--trust-extensions",
+        action="store_true",
+        help="Pick each file's format by extension only, without sniffing its "
+             "first bytes (unsupported files then fail during conversion)",
+    )
 
 
 def _collect_paths(patterns: list[str]) -> list[Path]:
+    """Expand globs; ``.zip`` files expand to their members, ``x.zip!/*.pdf`` to matching ones."""
     paths: list[Path] = []
     for pattern in patterns:
-        p = Path(pattern)
-        paths.extend(p.parent.glob(p.name))
+        archive_pattern, sep, member_pattern = pattern.partition(ARCHIVE_SEP)
+        p = Path(archive_pattern)
+        for match in p.parent.glob(p.name):
+            if is_archive(match):
+                paths.extend(expand_archive(match, member_pattern if sep else "*"))
+            elif not sep:
+                paths.append(match)
     return natural_sort(paths)
 
 
-def main(argv: list[str] | None = None) -> None:  # pragma: no cover
-    args = _parse_args(argv)
+def _parse_value(raw: str) -> object:
+    """Coerce a CLI override value to bool/int/float, else keep the string."""
+    if raw.lower() in ("true", "yes", "on"):
+        return True
+    if raw.lower() in ("false", "no", "off"):
+        return False
+    for cast in (int, float):
+        try:
+            return cast(raw)
+        except ValueError:
+            pass
+    return raw
+
+
+def _parse_overrides(specs: list[str] | None) -> dict[str, dict[str, object]]:
+    """Parse ``PATTERN:key=value,key=value`` specs into `ConversionSettings.overrides`."""
+    overrides: dict[str, dict[str, object]] = {}
+    for spec in specs or []:
+        pattern, sep, assignments = spec.rpartition(":")
+        if not sep or not pattern:
+            raise ValueError(f"Invalid override (expected PATTERN:KEY=VALUE): {spec}")
+        values = overrides.setdefault(pattern, {})
+        for assignment in assignments.split(","):
+            key, sep, raw = assignment.partition("=")
+            if not sep:
+                raise ValueError(f"Invalid override (expected KEY=VALUE): {assignment}")
+            values[key.strip()] = _parse_value(raw.strip())
+    return overrides
+
+
+def _build_settings(args: argparse.Namespace) -> ConversionSettings:
+    """Translate CLI flags into `ConversionSettings`; explicit flags beat the profile."""
+    kwargs = dict(
+        ocr=not args.no_ocr,
+        languages=args.languages or ["en"],
+        page_batch_size=args.page_batch_size,
+        doc_batch_size=args.doc_batch_size,
+        batch_concurrency=args.batch_concurrency,
+        workers=args.threads,
+        processes=args.processes,
+        num_threads=args.model_threads,
+        device=args.device,
+        artifacts_path=args.artifacts_path,
+        dedupe=not args.no_dedupe,
+        cache_dir=args.cache_dir,
+        stream_csv=not args.docling_csv,
+        fast_html=not args.docling_html,
+        detect_formats=not args.trust_extensions,
+        csv_max_rows=args.csv_max_rows,
+        csv_align=not args.csv_no_align,
+        table_structure=not args.no_tables,
+        picture_classification=args.picture_classification,
+        picture_images=args.picture_images,
+        overrides=_parse_overrides(args.overrides),
+    )
+    if args.ocr_engine:
+        kwargs["ocr_engine"] = args.ocr_engine
+    if args.table_mode:
+        kwargs["table_mode"] = args.table_mode
+    if args.profile:
+        return ConversionSettings.from_profile(args.profile, **kwargs)
+    return ConversionSettings(**kwargs)
+
+
+def _parse_models_args(argv: list[str]) -> argparse.Namespace:
+    ap = argparse.ArgumentParser(
+        prog="merge2md models",
+        description="Pre-fetch and verify Docling model weights for offline use.",
+    )
+    ap.add_argument("action", choices=["fetch", "verify"])
+    ap.add_argument(
+        "--path",
+        type=Path,
+        default=DEFAULT_ARTIFACTS_PATH,
+        help=f"Model directory (default: {DEFAULT_ARTIFACTS_PATH})",
+    )
+    ap.add_argument("--force", action="store_true", help="Re-download existing weights")
+    ap.add_argument("--no-easyocr", action="store_true", help="Skip EasyOCR weights")
+    return ap.parse_args(argv)
+
+
+def _models_main(argv: list[str]) -> None:  # pragma: no cover
+    args = _parse_models_args(argv)
+    if args.action == "fetch":
+        fetch_models(args.path, force=args.force, with_easyocr=not args.no_easyocr)
+    problems = verify_models(args.path)
+    for problem in problems:
+        LOGGER.error(problem)
+    if problems:
+        sys.exit(1)
+    LOGGER.info("Models in %s verified", args.path)
+
+
+def _parse_watch_args(argv: list[str]) -> argparse.Namespace:
+    ap = argparse.ArgumentParser(
+        prog="merge2md watch",
+        description="Convert files as they land in DIR and keep OUTPUT up to date.",
+    )
+    ap.add_argument("directory", type=Path, help="Folder to watch")
+    ap.add_argument("-o", "--output", type=Path, required=True, help="Merged output path")
+    ap.add_argument("--title", help="Optional H1 title in the merged file")
+    ap.add_argument("--toc", action="store_true", help="Prepend a table of contents")
+    ap.add_argument(
+        "--settle",
+        type=float,
+        default=1.0,
+        help="Seconds a file's size/mtime must stay unchanged before converting (default: 1.0)",
+    )
+    ap.add_argument(
+        "--interval",
+        type=float,
+        default=0.5,
+        help="Seconds between directory scans (default: 0.5)",
+    )
+    _add_conversion_args(ap, threads=1)
+    return ap.parse_args(argv)
+
+
+def _watch_main(argv: list[str]) -> None:  # pragma: no cover
+    args = _parse_watch_args(argv)
+    watcher = FolderWatcher(
+        args.directory,
+        args.output,
+        settings=_build_settings(args),
+        title=args.title,
+        toc=args.toc,
+        dedupe_sections=args.dedupe_sections,
+        settle=args.settle,
+        interval=args.interval,
+    )
+    try:
+        watcher.run()
+    except KeyboardInterrupt:
+        LOGGER.info("Stopped watching %s", args.directory)
+
+
+def _add_queue_args(ap: argparse.ArgumentParser) -> None:
+    ap.add_argument("queue", type=Path, help="SQLite queue file on storage every host can reach")
+    ap.add_argument(
+        "--lease",
+        type=float,
+        default=60.0,
+        help="Seconds a claim stays valid without renewal (default: 60)",
+    )
+    ap.add_argument(
+        "--max-attempts",
+        type=int,
+        default=3,
+        help="Attempts per file before giving up on it (default: 3)",
+    )
+    ap.add_argument(
+        "--steal-after",
+        type=float,
+        default=300.0,
+        help="Idle workers duplicate tasks running longer than this (default: 300)",
+    )
+    ap.add_argument("--poll", type=float, default=2.0, help="Seconds between queue polls")
+
+
+def _open_queue(args: argparse.Namespace) -> WorkQueue:
+    return WorkQueue(
+        args.queue,
+        lease=args.lease,
+        max_attempts=args.max_attempts,
+        steal_after=args.steal_after,
+    )
+
+
+def _parse_coordinator_args(argv: list[str]) -> argparse.Namespace:
+    ap = argparse.ArgumentParser(
+        prog="merge2md coordinator",
+        description="Queue files for `merge2md worker` processes and merge their output.",
+    )
+    _add_queue_args(ap)
+    ap.add_argument("files", nargs="+", help="Files or glob patterns (paths must be valid on workers)")
+    ap.add_argument("-o", "--output", type=Path, required=True, help="Merged output path")
+    ap.add_argument("--title", help="Optional H1 title in the merged file")
+    ap.add_argument("--toc", action="store_true", help="Prepend a table of contents")
+    ap.add_argument(
+        "--dedupe-sections",
+        action="store_true",
+        help="Collapse near-identical sections in the merged output",
+    )
+    return ap.parse_args(argv)
+
+
+def _coordinator_main(argv: list[str]) -> None:  # pragma: no cover
+    args = _parse_coordinator_args(argv)
     paths = _collect_paths(args.files)
     if not paths:
         LOGGER.error("No files matched.")
         sys.exit(1)
+    coordinate(
+        _open_queue(args),
+        paths,
+        args.output,
+        title=args.title,
+        toc=args.toc,
+        dedupe_sections=args.dedupe_sections,
+        poll=args.poll,
+    )
+
+
+def _parse_worker_args(argv: list[str]) -> argparse.Namespace:
+    ap = argparse.ArgumentParser(
+        prog="merge2md worker",
+        description="Convert files claimed from a `merge2md coordinator` queue.",
+    )
+    _add_queue_args(ap)
+    ap.add_argument("--worker-id", default=None, help="Name in logs (default: host:pid:thread)")
+    ap.add_argument(
+        "--exit-when-idle",
+        action="store_true",
+        help="Stop once there is nothing left to claim instead of polling",
+    )
+    _add_conversion_args(ap, threads=1)
+    return ap.parse_args(argv)
 
-    # Determine output path
-    if args.output is None:
-        # Use default filename in Downloads folder
-        output_path = get_default_output_path("merged.md")
-    else:
-        output_path = Path(args.output)
-        # If only filename provided (no path), put in Downloads
-        if not output_path.parent.parts:
-            output_path = get_default_output_path(output_path.name)
 
+def _worker_main(argv: list[str]) -> None:  # pragma: no cover
+    args = _parse_worker_args(argv)
+    converter = DoclingMarkdownConverter(settings=_build_settings(args))
     try:
-        settings = ConversionSettings(
-            ocr=not args.no_ocr,
-            languages=args.languages or ["en"],
+        completed = run_worker(
+            _open_queue(args),
+            converter,
+            worker_id=args.worker_id,
+            poll=args.poll,
+            exit_when_idle=args.exit_when_idle,
         )
-        converter = DoclingMarkdownConverter(settings=settings)
-        with ThreadPoolExecutor(max_workers=args.threads) as pool:
-            md_blocks = pool.submit(converter.to_markdown, paths).result()
-
-        merger = MarkdownMerger()
-        merged = merger.merge(md_blocks, header=args.title)
-        merger.export(merged, output_path)
-        
-        # Show success notification
-        show_completion_dialog(output_path, success=True)
-        
+    except KeyboardInterrupt:
+        return
+    LOGGER.info("Worker finished %d files", completed)
+
+
+# Sub-commands dispatched on the first argument; anything else is a file list.
+_SUBCOMMANDS = {
+    "models": _models_main,
+    "watch": _watch_main,
+    "coordinator": _coordinator_main,
+    "worker": _worker_main,
+}
+
+
+def main(argv: list[str] | None = None) -> None:  # pragma: no cover
+    argv = sys.argv[1:] if argv is None else argv
+    if argv and argv[0] in _SUBCOMMANDS:
+        return _SUBCOMMANDS[argv[0]](argv[1:])
+
+    args = _parse_args(argv)
+    if args.retry_failed and not args.results:
+        LOGGER.error("--retry-failed needs --results FILE from the earlier run.")
+        sys.exit(1)
+    paths = _collect_paths(args.files)
+    if not paths and not args.retry_failed:
+        LOGGER.error("No files matched.")
+        sys.exit(1)
+
+    progress = None
+    if args.progress == "on" or (args.progress == "auto" and sys.stderr.isatty()):
+        progress = ProgressBar()
+        # Per-file INFO lines would break up the bar; it shows the same.
+        logging.getLogger("merge2md").setLevel(logging.WARNING)
+
+    profiler = Profiler(args.profile_to) if args.profile_to else nullcontext()
+    try:
+        notifier = get_notifier(args.notify, webhook_url=args.webhook_url)
+        with profiler:
+            convert_and_merge(
+                paths,
+                [Path(o) for o in args.outputs] if args.outputs else None,
+                title=args.title,
+                settings=_build_settings(args),
+                dedupe_sections=args.dedupe_sections,
+                toc=args.toc,
+                chunk_tokens=args.chunk_tokens,
+                compression_level=args.compress_level,
+                compression_threads=args.compress_threads,
+                fsync=args.fsync,
+                show_notification=args.notify != "none",
+                notifier=notifier,
+                progress=progress,
+                retry=RetryPolicy(attempts=max(1, args.retries), backoff=args.retry_backoff),
+                results=args.results,
+                retry_failed=args.retry_failed,
+            )
     except Exception as e:
         LOGGER.error(f"Conversion failed: {e}")
-        show_completion_dialog(output_path, success=False)
         sys.exit(1)
 
 
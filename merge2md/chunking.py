@@ -0,0 +1,210 @@
+"""
+Heading-aware, token-bounded chunks for RAG pipelines, streamed as JSONL.
+
+Chunks are cut from each converted `DoclingDocument` (not from the merged
+Markdown), so every record keeps its source file, page range and heading
+path. `ChunkWriter` writes and flushes one JSON line per chunk as each
+document finishes, so an embedder tailing the file can start right away.
+"""
+from __future__ import annotations
+
+import json
+import logging
+import re
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Iterable, Iterator, List, Optional, TextIO
+
+from docling_core.transforms.chunker import HierarchicalChunker
+
+from .results import SpilledMarkdown
+from .simple_html import HtmlPage
+from .tables import CsvTable
+
+logger = logging.getLogger(__name__)
+
+_HEADING_RE = re.compile(r"^(#{1,6})\s+(.+?)\s*$")
+
+
+def count_words(text: str) -> int:
+    """Default token counter: whitespace-separated words."""
+    return len(text.split())
+
+
+@dataclass(slots=True)
+class Chunk:
+    """One JSONL record."""
+
+    source: str
+    index: int
+    text: str
+    headings: List[str] = field(default_factory=list)
+    page_start: Optional[int] = None
+    page_end: Optional[int] = None
+    tokens: int = 0
+
+    def to_json(self) -> str:
+        return json.dumps(asdict(self), ensure_ascii=False)
+
+
+def chunk_document(
+    document: Any,
+    source: Path,
+    *,
+    max_tokens: int = 512,
+    count_tokens: Callable[[str], int] = count_words,
+) -> Iterator[Chunk]:
+    """
+    Yield token-bounded chunks of *document* (a `DoclingDocument`, a
+    `CsvTable`, which is chunked row by row, or an `HtmlPage` /
+    `SpilledMarkdown`, chunked by their Markdown paragraphs and headings).
+
+    Docling's `HierarchicalChunker` supplies one piece per document item
+    with its heading path; consecutive pieces under the same headings are
+    packed up to *max_tokens*, and oversized pieces are split on word
+    boundaries. Pass a tokenizer's counting function as *count_tokens* to
+    bound by model tokens instead of words.
+    """
+    if isinstance(document, CsvTable):
+        # One piece per row, packed like any other run of same-heading items.
+        pieces: Iterable[tuple[str, List[str], List[int]]] = (
+            (record, [], []) for record in document.iter_records()
+        )
+    elif isinstance(document, (HtmlPage, SpilledMarkdown)):
+        pieces = _markdown_pieces(document.export_to_markdown())
+    else:
+        pieces = (
+            (piece.text, list(piece.meta.headings or []), _pages(piece))
+            for piece in HierarchicalChunker().chunk(dl_doc=document)
+        )
+    for index, (text, headings, pages) in enumerate(
+        _pack(pieces, max_tokens, count_tokens)
+    ):
+        yield Chunk(
+            source=str(source),
+            index=index,
+            text=text,
+            headings=headings,
+            page_start=min(pages) if pages else None,
+            page_end=max(pages) if pages else None,
+            tokens=count_tokens(text),
+        )
+
+
+class ChunkWriter:
+    """
+    Stream chunks of converted documents to a JSONL file.
+
+    Example
+    -------
+    >>> with ChunkWriter(Path("chunks.jsonl")) as writer:
+    ...     for path, doc in converter.iter_documents(paths):
+    ...         writer.write(path, doc)
+    """
+
+    def __init__(
+        self,
+        out_path: Path,
+        *,
+        max_tokens: int = 512,
+        count_tokens: Callable[[str], int] = count_words,
+    ) -> None:
+        self.out_path = out_path
+        self.max_tokens = max_tokens
+        self.count_tokens = count_tokens
+        self.chunks_written = 0
+        self._fh: Optional[TextIO] = None
+
+    def __enter__(self) -> "ChunkWriter":
+        logger.info("Writing %s", self.out_path)
+        self._fh = self.out_path.open("w", encoding="utf-8")
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        if self._fh is not None:
+            self._fh.close()
+            self._fh = None
+
+    def write(self, source: Path, document: Any) -> int:
+        """Append *document*'s chunks and flush; return how many were written."""
+        assert self._fh is not None, "use ChunkWriter as a context manager"
+        count = 0
+        for chunk in chunk_document(
+            document, source, max_tokens=self.max_tokens, count_tokens=self.count_tokens
+        ):
+            self._fh.write(chunk.to_json() + "\n")
+            count += 1
+        self._fh.flush()
+        self.chunks_written += count
+        return count
+
+
+# ---------------------------------------------------------------------- #
+# Private helpers
+# ---------------------------------------------------------------------- #
+def _pages(piece: Any) -> List[int]:
+    """Page numbers a Docling chunk's items come from (empty for non-paged formats)."""
+    return sorted({
+        prov.page_no
+        for item in piece.meta.doc_items or []
+        for prov in getattr(item, "prov", None) or []
+    })
+
+
+def _markdown_pieces(markdown: str) -> Iterator[tuple[str, List[str], List[int]]]:
+    """Paragraphs of *markdown* with the heading path above each."""
+    headings: List[str] = []
+    for block in markdown.split("\n\n"):
+        match = _HEADING_RE.match(block)
+        if match:
+            headings = headings[:len(match.group(1)) - 1] + [match.group(2)]
+        else:
+            yield block, list(headings), []
+
+
+def _pack(
+    pieces: Iterable[tuple[str, List[str], List[int]]],
+    max_tokens: int,
+    count_tokens: Callable[[str], int],
+) -> Iterator[tuple[str, List[str], List[int]]]:
+    """Merge same-heading neighbours up to *max_tokens*; split oversized pieces."""
+    texts: list[str] = []
+    headings: List[str] = []
+    pages: set[int] = set()
+    size = 0
+
+    for text, piece_headings, piece_pages in pieces:
+        text = text.strip()
+        if not text:
+            continue
+        for part in _split(text, max_tokens, count_tokens):
+            part_size = count_tokens(part)
+            if texts and (piece_headings != headings or size + part_size > max_tokens):
+                yield "\n\n".join(texts), headings, sorted(pages)
+                texts, pages, size = [], set(), 0
+            texts.append(part)
+            headings = piece_headings
+            pages.update(piece_pages)
+            size += part_size
+
+    if texts:
+        yield "\n\n".join(texts), headings, sorted(pages)
+
+
+def _split(text: str, max_tokens: int, count_tokens: Callable[[str], int]) -> List[str]:
+    """Split *text* on word boundaries into parts of at most *max_tokens*."""
+    if count_tokens(text) <= max_tokens:
+        return [text]
+    parts: list[str] = []
+    current: list[str] = []
+    size = 0
+    for word in text.split():
+        word_size = count_tokens(word)
+        if current and size + word_size > max_tokens:
+            parts.append(" ".join(current))
+            current, size = [], 0
+        current.append(word)
+        size += word_size
+    if current:
+        parts.append(" ".join(current))
+    return parts
@@ -6,29 +6,226 @@ handling in one place so the CLI (and any GUI later) can stay lean.
 """
 from __future__ import annotations
 
+import fnmatch
+import gzip
+import hashlib
+import json
 import logging
-from dataclasses import dataclass, field
+import os
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter, deque
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from contextlib import ExitStack, contextmanager, nullcontext
+from dataclasses import dataclass, field, replace
+from io import BytesIO
+from multiprocessing import get_context
 from pathlib import Path
-from typing import Iterable, List, Sequence, Optional, Dict, Any
+from typing import (
+    Any,
+    BinaryIO,
+    Callable,
+    ContextManager,
+    Deque,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+)
 
 from docling.document_converter import DocumentConverter
-from docling.datamodel.base_models import InputFormat
-from docling.datamodel.pipeline_options import PdfPipelineOptions, EasyOcrOptions
-from docling.document_converter import PdfFormatOption, WordFormatOption
+from docling.datamodel.base_models import ConversionStatus, DocumentStream, InputFormat
+from docling.datamodel.pipeline_options import (
+    AcceleratorDevice,
+    AcceleratorOptions,
+    PdfPipelineOptions,
+    EasyOcrOptions,
+    OcrOptions,
+    RapidOcrOptions,
+    TableFormerMode,
+    TesseractCliOcrOptions,
+    TesseractOcrOptions,
+)
+from docling.document_converter import ImageFormatOption, PdfFormatOption, WordFormatOption
 from docling.pipeline.simple_pipeline import SimplePipeline
 from docling.pipeline.standard_pdf_pipeline import StandardPdfPipeline
 from docling.backend.pypdfium2_backend import PyPdfiumDocumentBackend
+from docling.datamodel.settings import settings as docling_settings
+from docling_core.types.doc import DoclingDocument
+
+from .detect import (
+    UnsupportedFormat,
+    detect_format,
+    format_for_suffix,
+    route_suffix,
+    unsniffed_format,
+    utf16_as_utf8,
+)
+from .models import EASYOCR_DIRNAME
+from .profiling import active_stages, stage
+from .progress import FAILED, FINISHED, QUEUED, STARTED, ProgressCallback, ProgressEvent
+from .results import FAILED as FAILED_STATUS
+from .results import MISSING, SUCCESS, UNSUPPORTED, ConversionResult, RetryPolicy, SpilledMarkdown
+from .sources import (
+    ConverterInput,
+    open_binary,
+    open_input,
+    source_digest,
+    source_exists,
+    source_size,
+    stream_digest,
+)
+from .simple_html import HTML_SUFFIXES, MAX_BYTES as HTML_MAX_BYTES, HtmlPage, parse_html
+from .tables import CsvTable, is_table
+from .utils import split_cores
 
 logger = logging.getLogger(__name__)
 
+# Tesseract wants ISO 639-2 codes ("eng"); map the EasyOCR-style two-letter
+# codes users already pass with ``--lang``. Unknown codes pass through as-is.
+_TESSERACT_LANGS: Dict[str, str] = {
+    "en": "eng",
+    "de": "deu",
+    "fr": "fra",
+    "es": "spa",
+    "it": "ita",
+    "pt": "por",
+    "nl": "nld",
+    "ja": "jpn",
+    "zh": "chi_sim",
+}
+
+
+def _tesseract_langs(languages: Sequence[str]) -> List[str]:
+    return [_TESSERACT_LANGS.get(lang, lang) for lang in languages]
+
+
+# OCR engine name -> factory building Docling's options for *languages*.
+OCR_ENGINES: Dict[str, Callable[[Sequence[str]], OcrOptions]] = {
+    "easyocr": lambda langs: EasyOcrOptions(lang=list(langs)),
+    "tesseract": lambda langs: TesseractCliOcrOptions(lang=_tesseract_langs(langs)),
+    "tesserocr": lambda langs: TesseractOcrOptions(lang=_tesseract_langs(langs)),
+    "rapidocr": lambda langs: RapidOcrOptions(),
+}
+
+class _DoclingPerf:
+    """
+    Docling's process-wide batching settings (``settings.perf``), lent to
+    one set of values at a time.
+
+    Converters that agree on the values share them concurrently; one that
+    needs others waits until they're done. Docling's own values come back
+    once nobody holds them, so converters never reset each other.
+    """
+
+    _FIELDS = ("page_batch_size", "doc_batch_size", "doc_batch_concurrency")
+
+    def __init__(self) -> None:
+        self._changed = threading.Condition()
+        self._values: Optional[Tuple[int, ...]] = None
+        self._saved: Tuple[int, ...] = ()
+        self._holders = 0
+
+    @contextmanager
+    def applied(self, values: Tuple[int, ...]) -> Iterator[None]:
+        """Docling's perf settings set to *values* while the block runs."""
+        perf = docling_settings.perf
+        with self._changed:
+            self._changed.wait_for(lambda: self._holders == 0 or self._values == values)
+            if self._holders == 0:
+                self._saved = tuple(getattr(perf, name) for name in self._FIELDS)
+                for name, value in zip(self._FIELDS, values):
+                    setattr(perf, name, value)
+                self._values = values
+            self._holders += 1
+        try:
+            yield
+        finally:
+            with self._changed:
+                self._holders -= 1
+                if self._holders == 0:
+                    for name, value in zip(self._FIELDS, self._saved):
+                        setattr(perf, name, value)
+                    self._values = None
+                    self._changed.notify_all()
+
+
+_DOCLING_PERF = _DoclingPerf()
+
+# Env vars Docling reads its model thread count from when not given one.
+_THREAD_ENV_VARS = frozenset(("DOCLING_NUM_THREADS", "OMP_NUM_THREADS"))
+
+# Named speed/quality trade-offs; see `ConversionSettings.from_profile`.
+PROFILES: Dict[str, Dict[str, Any]] = {
+    "fast": {"ocr_engine": "tesseract", "table_mode": "fast", "images_scale": 1.0},
+    "balanced": {"ocr_engine": "rapidocr", "table_mode": "fast", "images_scale": 1.5},
+    "accurate": {"ocr_engine": "easyocr", "table_mode": "accurate", "images_scale": 2.0},
+}
+
 
 @dataclass(slots=True)
 class ConversionSettings:
-    """User-tunable knobs for Docling + EasyOCR."""
+    """User-tunable knobs for Docling and its OCR engines."""
 
     ocr: bool = True
     languages: Sequence[str] = field(default_factory=lambda: ["en"])
+    ocr_engine: str = "easyocr"  # One of `OCR_ENGINES`.
+    table_mode: str = "accurate"  # TableFormer mode: "fast" or "accurate".
+    images_scale: float = 1.0  # Page render scale fed to layout/OCR.
+    # Expensive PDF/image enrichment stages. Turn tables off when only
+    # prose is needed; picture analysis stays off unless asked for.
+    table_structure: bool = True
+    picture_classification: bool = False
+    picture_images: bool = False
+    # Per-file overrides: glob pattern on the file name -> settings fields,
+    # e.g. {"*financial*.pdf": {"table_structure": True}}. First match wins.
+    overrides: Dict[str, Dict[str, Any]] = field(default_factory=dict)
     dpi: int = 300  # Higher dpi improves OCR but slows conversion.
+    # Batching: Docling runs layout/OCR on `page_batch_size` pages of one
+    # document per model call, and takes `doc_batch_size` files at a time,
+    # converting them side by side on `batch_concurrency` threads. Bigger
+    # page batches amortize the per-call overhead that dominates on
+    # CPU-only hosts.
+    page_batch_size: int = 4
+    doc_batch_size: int = 1
+    batch_concurrency: int = 1
+    # Parallelism: `workers` files convert concurrently, each model using
+    # `num_threads` intra-op (torch/ONNX) threads. None splits the cores
+    # evenly so workers × threads doesn't oversubscribe the machine, or
+    # with one worker leaves the count to Docling and the user's env.
+    # With `processes`, workers are processes (each loading its own models)
+    # that hand Markdown back as spill files, not pickled strings.
+    workers: int = 1
+    processes: bool = False
+    num_threads: Optional[int] = None
+    device: str = "auto"  # Accelerator: "auto", "cpu", "cuda" or "mps".
+    # Local model directory from `merge2md models fetch`. When set, models
+    # load only from here and nothing is downloaded.
+    artifacts_path: Optional[Path] = None
+    # Convert byte-identical inputs once and reuse the block for every copy.
+    dedupe: bool = True
+    # Keep each converted DoclingDocument as gzipped JSON here, keyed by
+    # file content + conversion settings; later runs re-export from it
+    # without running layout/OCR again.
+    cache_dir: Optional[Path] = None
+    # CSV/TSV inputs skip Docling's document model and stream straight to
+    # a Markdown table (see `merge2md.tables`); `csv_max_rows` truncates
+    # huge tables, `csv_align` pads cells to the sampled column widths.
+    stream_csv: bool = True
+    csv_max_rows: Optional[int] = None
+    csv_align: bool = True
+    # Small HTML pages with simple markup skip Docling too (see
+    # `merge2md.simple_html`); anything else still goes through Docling.
+    fast_html: bool = True
+    # Classify every input by its first bytes (see `merge2md.detect`):
+    # unsupported files are rejected without a conversion attempt and
+    # mislabeled ones are routed to the right backend or fast path.
+    detect_formats: bool = True
     # Supported formats - all formats that Docling can handle
     allowed_formats: List[InputFormat] = field(default_factory=lambda: [
         InputFormat.PDF,
@@ -41,16 +238,162 @@ class ConversionSettings:
         InputFormat.MD,
     ])
 
+    @classmethod
+    def from_profile(cls, name: str, **overrides: Any) -> "ConversionSettings":
+        """
+        Build settings from a named profile (`fast`, `balanced`, `accurate`).
+
+        Keyword *overrides* win over the profile's values.
+        """
+        if name not in PROFILES:
+            raise ValueError(f"Unknown profile: {name}")
+        return cls(**{**PROFILES[name], **overrides})
+
     def to_pipeline_options(self) -> PdfPipelineOptions:
-        """Create pipeline options with OCR settings."""
+        """Create pipeline options with OCR, table and scale settings."""
         pipeline_options = PdfPipelineOptions()
         pipeline_options.do_ocr = self.ocr
         if self.ocr:
-            pipeline_options.ocr_options = EasyOcrOptions(
-                lang=list(self.languages)
-            )
+            if self.ocr_engine not in OCR_ENGINES:
+                raise ValueError(f"Unsupported OCR engine: {self.ocr_engine}")
+            pipeline_options.ocr_options = OCR_ENGINES[self.ocr_engine](self.languages)
+            if self.artifacts_path and isinstance(pipeline_options.ocr_options, EasyOcrOptions):
+                pipeline_options.ocr_options.model_storage_directory = str(
+                    Path(self.artifacts_path) / EASYOCR_DIRNAME
+                )
+                pipeline_options.ocr_options.download_enabled = False
+        if self.artifacts_path:
+            pipeline_options.artifacts_path = str(self.artifacts_path)
+        pipeline_options.do_table_structure = self.table_structure
+        pipeline_options.table_structure_options.mode = TableFormerMode(self.table_mode)
+        pipeline_options.do_picture_classification = self.picture_classification
+        pipeline_options.generate_picture_images = self.picture_images
+        pipeline_options.images_scale = self.images_scale
+        accelerator: Dict[str, Any] = {"device": AcceleratorDevice(self.device)}
+        # Otherwise Docling takes DOCLING_NUM_THREADS / OMP_NUM_THREADS itself.
+        if self.num_threads or (
+            self.splits_threads and not _THREAD_ENV_VARS.intersection(os.environ)
+        ):
+            accelerator["num_threads"] = self.model_threads
+        pipeline_options.accelerator_options = AcceleratorOptions(**accelerator)
         return pipeline_options
 
+    @property
+    def model_threads(self) -> int:
+        """Intra-op threads per worker: `num_threads`, or an even core split."""
+        if self.num_threads:
+            return self.num_threads
+        return split_cores(max(1, self.workers) * max(1, self.batch_concurrency))
+
+    @property
+    def splits_threads(self) -> bool:
+        """
+        Whether merge2md sets the model thread count: `num_threads` was given
+        or files convert in parallel. A single worker keeps the runtimes'
+        defaults (and the user's thread env vars).
+        """
+        return bool(self.num_threads) or max(self.workers, self.batch_concurrency) > 1
+
+    def cache_key(self) -> str:
+        """Short digest of every field that changes the converted document."""
+        try:
+            from importlib.metadata import version
+
+            docling_version = version("docling")
+        except Exception:  # pragma: no cover
+            docling_version = "unknown"
+        fields = (
+            docling_version, self.ocr, list(self.languages), self.ocr_engine,
+            self.table_mode, self.images_scale, self.table_structure,
+            self.picture_classification, self.picture_images,
+        )
+        return hashlib.sha256(repr(fields).encode()).hexdigest()[:12]
+
+    def for_pattern(self, pattern: str) -> "ConversionSettings":
+        """Return a copy with the `overrides[pattern]` fields applied."""
+        try:
+            return replace(self, overrides={}, **self.overrides[pattern])
+        except TypeError as exc:
+            raise ValueError(f"Invalid override for {pattern!r}: {exc}") from None
+
+    def batch_settings(self) -> ContextManager[None]:
+        """
+        Docling's (process-wide) batching settings set to these knobs while
+        the block runs; see `_DoclingPerf`.
+        """
+        return _DOCLING_PERF.applied((
+            max(1, self.page_batch_size),
+            max(1, self.doc_batch_size),
+            max(1, self.batch_concurrency),
+        ))
+
+    def apply_thread_settings(self) -> None:
+        """
+        Cap the intra-op thread pools of torch and OpenMP-based runtimes.
+
+        Only when threads were asked for (`num_threads`) or files convert in
+        parallel; a single worker keeps the runtimes' defaults. Thread env
+        vars the user already set are left alone. The env vars only bite for
+        libraries imported afterwards, so torch is also capped directly if
+        it's already loaded.
+        """
+        if not self.splits_threads:
+            return  # guard clause (nothing to split)
+        threads = str(self.model_threads)
+        user_set = "OMP_NUM_THREADS" in os.environ
+        for var in ("OMP_NUM_THREADS", "MKL_NUM_THREADS", "OPENBLAS_NUM_THREADS"):
+            os.environ.setdefault(var, threads)
+        torch = sys.modules.get("torch")
+        if torch is not None and (self.num_threads or not user_set):
+            torch.set_num_threads(self.model_threads)
+
+    def apply_offline_settings(self) -> None:
+        """
+        Forbid Hugging Face downloads when models come from `artifacts_path`.
+
+        huggingface_hub and transformers read their offline flags once, at
+        import – and Docling has usually imported them by now – so the
+        loaded modules are switched over directly; the env vars cover
+        later imports and worker processes. Like the env vars, this holds
+        for the whole process.
+        """
+        if not self.artifacts_path:  # guard clause
+            return
+        os.environ["HF_HUB_OFFLINE"] = "1"
+        os.environ["TRANSFORMERS_OFFLINE"] = "1"
+        constants = sys.modules.get("huggingface_hub.constants")
+        if constants is not None:
+            constants.HF_HUB_OFFLINE = True
+        hub = sys.modules.get("transformers.utils.hub")
+        if hub is not None and hasattr(hub, "_is_offline_mode"):
+            hub._is_offline_mode = True
+
+
+@dataclass(slots=True)
+class _Call:
+    """
+    Bookkeeping of one `DoclingMarkdownConverter.iter_results` call.
+
+    Kept per call rather than on the converter, so calls running at the
+    same time on one converter (e.g. the slots of a `merge2md.jobs.JobQueue`)
+    never see or drop each other's inputs and outcomes – even for the
+    same path – and nothing outlives the call.
+    """
+
+    # In-memory inputs by key (see `iter_results`), and the Path(name)
+    # each key is reported as.
+    streams: Dict[Path, DocumentStream] = field(default_factory=dict)
+    names: Dict[Path, Path] = field(default_factory=dict)
+    # Formats found by `detect_formats`, keyed like `streams`.
+    formats: Dict[Path, InputFormat] = field(default_factory=dict)
+    # Progress bookkeeping: when each in-flight file started, how often it
+    # was tried, and the outcome of finished files until yielded.
+    started: Dict[Path, float] = field(default_factory=dict)
+    attempts: Dict[Path, int] = field(default_factory=dict)
+    results: Dict[Path, ConversionResult] = field(default_factory=dict)
+    # SHA-256 of each input, shared by dedupe and the document cache.
+    digests: Dict[Path, str] = field(default_factory=dict)
+
 
 class DoclingMarkdownConverter:
     """
@@ -60,19 +403,54 @@ class DoclingMarkdownConverter:
     -------
     >>> conv = DoclingMarkdownConverter()
     >>> md = conv.to_markdown([Path("report.pdf")])[0]
+
+    Pass *progress* (e.g. a `merge2md.progress.ProgressBar`) to receive a
+    `ProgressEvent` as each file is queued, started, finished or failed.
+    Transient failures (timeouts, busy files, out-of-memory) are retried
+    per *retry* (default: `RetryPolicy()`, three attempts with backoff).
     """
 
-    def __init__(self, settings: ConversionSettings | None = None) -> None:
+    def __init__(
+        self,
+        settings: ConversionSettings | None = None,
+        *,
+        progress: Optional[ProgressCallback] = None,
+        retry: Optional[RetryPolicy] = None,
+    ) -> None:
         self.settings = settings or ConversionSettings()
+        self.progress = progress
+        self.retry = retry or RetryPolicy()
+        self.settings.apply_thread_settings()
+        self.settings.apply_offline_settings()
         
+        self._converter = self._build_converter(self.settings)
+        # One extra Docling converter per override pattern, in priority order
+        self._override_converters: Dict[str, DocumentConverter] = {
+            pattern: self._build_converter(self.settings.for_pattern(pattern))
+            for pattern in self.settings.overrides
+        }
+        # Guards every call's `_Call` bookkeeping and serializes progress
+        # callbacks across calls.
+        self._progress_lock = threading.Lock()
+
+    @staticmethod
+    def _build_converter(settings: ConversionSettings) -> DocumentConverter:
+        """Create a Docling converter configured from *settings*."""
         # Create format options for different file types
         format_options: Dict[InputFormat, Any] = {}
         
         # PDF format with OCR options
+        pipeline_options = settings.to_pipeline_options()
         format_options[InputFormat.PDF] = PdfFormatOption(
             pipeline_cls=StandardPdfPipeline,
             backend=PyPdfiumDocumentBackend,
-            pipeline_options=self.settings.to_pipeline_options()
+            pipeline_options=pipeline_options
+        )
+        
+        # Images go through the same OCR pipeline as scanned PDFs
+        format_options[InputFormat.IMAGE] = ImageFormatOption(
+            pipeline_cls=StandardPdfPipeline,
+            pipeline_options=pipeline_options
         )
         
         # Word format with simple pipeline
@@ -81,15 +459,15 @@ class DoclingMarkdownConverter:
         )
         
         # Create converter with all supported formats
-        self._converter = DocumentConverter(
-            allowed_formats=self.settings.allowed_formats,
+        return DocumentConverter(
+            allowed_formats=settings.allowed_formats,
             format_options=format_options
         )
 
     # --------------------------------------------------------------------- #
     # Public API
     # --------------------------------------------------------------------- #
-    def to_markdown(self, paths: Iterable[Path]) -> List[str]:
+    def to_markdown(self, paths: Iterable[Path | DocumentStream]) -> List[str]:
         """
         Convert *paths* (any supported format) to Markdown.
 
@@ -100,24 +478,691 @@ class DoclingMarkdownConverter:
         list[str]
             Markdown blocks in the same order as *paths*.
         """
-        md_blocks: list[str] = []
+        return [md for _, md in self.to_markdown_with_sources(paths)]
+
+    def to_markdown_with_sources(
+        self, paths: Iterable[Path | DocumentStream]
+    ) -> List[Tuple[Path, str]]:
+        """
+        Like `to_markdown`, but pair each block with the path it came from.
+
+        Returns
+        -------
+        list[tuple[Path, str]]
+            ``(path, markdown)`` for every converted file, in input order.
+        """
+        return [
+            (path, document.export_to_markdown())
+            for path, document in self.iter_documents(paths)
+        ]
+
+    def iter_documents(
+        self, paths: Iterable[Path | DocumentStream]
+    ) -> Iterator[Tuple[Path, DoclingDocument | CsvTable]]:
+        """
+        Convert *paths*, yielding ``(path, DoclingDocument)`` as each finishes.
+
+        Input order is kept; missing or failed files are logged and skipped.
+        Byte-identical files are converted once and the document is yielded
+        again for every copy. Consumers can start on the first document
+        while later ones are still converting.
+
+        Besides files, *paths* may hold archive members
+        (``Path("bundle.zip!/doc.pdf")``) and in-memory `DocumentStream`s
+        (see `merge2md.sources.read_stream`); a stream is reported as
+        ``Path(stream.name)``.
+
+        CSV/TSV files yield a `merge2md.tables.CsvTable` instead (unless
+        `ConversionSettings.stream_csv` is off), which renders its Markdown
+        row by row when exported, and small simple HTML pages a
+        `merge2md.simple_html.HtmlPage` (unless `fast_html` is off).
+        """
+        for result, document in self.iter_results(paths):
+            if document is not None:
+                yield result.path, document
 
+    def iter_results(
+        self, paths: Iterable[Path | DocumentStream]
+    ) -> Iterator[Tuple[ConversionResult, Optional[DoclingDocument | CsvTable]]]:
+        """
+        Like `iter_documents`, but yield a `ConversionResult` for *every*
+        input – failed and missing ones included – with its document (None
+        unless converted). The result's `markdown` is left to the caller.
+        """
+        call = _Call()
+        inputs: list[Path] = []
+        missing: set[Path] = set()
         for path in paths:
-            if not path.exists():  # guard clause
+            if isinstance(path, DocumentStream):
+                # Streams may share a name; each gets its own key, with the
+                # name's last part so routing by extension still works.
+                key = Path(f"<stream {len(call.streams)}>", Path(path.name).name)
+                call.streams[key] = path
+                call.names[key] = Path(path.name)
+                path = key
+            elif not source_exists(path):
                 logger.warning("Missing file: %s – skipping", path)
+                missing.add(path)
+            inputs.append(path)
+        yield from self._iter_inputs(call, inputs, missing)
+
+    def _iter_inputs(
+        self, call: _Call, inputs: List[Path], missing: set[Path]
+    ) -> Iterator[Tuple[ConversionResult, Optional[DoclingDocument | CsvTable]]]:
+        """The body of `iter_results`, once streams are registered."""
+        existing = [path for path in inputs if path not in missing]
+
+        # Files nothing can convert fail here, before any conversion work.
+        unsupported: Dict[Path, str] = {}
+        if self.settings.detect_formats:
+            for path in existing:
+                error = self._detect(call, path)
+                if error is not None:
+                    unsupported[path] = error
+            existing = [path for path in existing if path not in unsupported]
+
+        # Identical files (same bytes under different names) convert once.
+        canonical: Dict[Path, Path] = {path: path for path in existing}
+        if self.settings.dedupe:
+            first_by_digest: Dict[str, Path] = {}
+            for path in existing:
+                canonical[path] = first_by_digest.setdefault(self._digest(call, path), path)
+        unique = list(dict.fromkeys(canonical.values()))
+        if len(unique) < len(existing):
+            logger.info(
+                "Skipping %d duplicate files (identical content)",
+                len(existing) - len(unique),
+            )
+
+        # Only documents that are needed again later stay in memory, and
+        # only until their last copy has been yielded.
+        uses = Counter(canonical[path] for path in existing)
+        kept: Dict[Path, Tuple[ConversionResult, Optional[DoclingDocument | CsvTable]]] = {}
+        stream = self._iter_converted(call, unique)
+        for path in inputs:
+            shown = call.names.get(path, path)
+            if path in missing:
+                yield ConversionResult(path=shown, status=MISSING, error="Missing file"), None
                 continue
+            if path in unsupported:
+                yield ConversionResult(
+                    path=shown, status=UNSUPPORTED, error=unsupported[path]
+                ), None
+                continue
+            rep = canonical[path]
+            uses[rep] -= 1
+            if rep in kept:
+                result, document = kept.pop(rep) if uses[rep] == 0 else kept[rep]
+            else:
+                _, document = next(stream)
+                with self._progress_lock:
+                    result = call.results.pop(rep, None) or ConversionResult(
+                        path=rep, status=SUCCESS if document is not None else FAILED_STATUS
+                    )
+                if uses[rep] > 0:
+                    kept[rep] = (result, document)
+            if result.path != shown:
+                result = replace(result, path=shown)
+            yield result, document
+
+    def to_results(
+        self,
+        paths: Iterable[Path | DocumentStream],
+        *,
+        spill_dir: Optional[Path] = None,
+    ) -> List[ConversionResult]:
+        """
+        Convert *paths* and return one `ConversionResult` per input, in order.
+
+        Converted results carry their Markdown; with *spill_dir* it is
+        written to a file there as each document finishes (see
+        `ConversionResult.spill`), so large batches don't pile up in memory.
+        """
+        results: list[ConversionResult] = []
+        for result, document in self.iter_results(paths):
+            if isinstance(document, SpilledMarkdown) and spill_dir is not None:
+                result.spill_path = document.path
+                result.spill(spill_dir)
+            elif document is not None:
+                with stage("export_to_markdown"):
+                    result.markdown = document.export_to_markdown()
+                if spill_dir is not None:
+                    result.spill(spill_dir)
+            results.append(result)
+        return results
+
+    # --------------------------------------------------------------------- #
+    # Private helpers
+    # --------------------------------------------------------------------- #
+    def _iter_converted(
+        self, call: _Call, paths: List[Path]
+    ) -> Iterator[Tuple[Path, Optional[DoclingDocument | CsvTable]]]:
+        """Yield ``(path, document or None)`` for every path, in order."""
+        for path in paths:
+            self._emit(call, QUEUED, path)
+        if self.settings.doc_batch_size > 1:
+            yield from self._iter_batched(call, paths)
+        elif self.settings.workers > 1 and len(paths) > 1 and self.settings.processes:
+            yield from self._iter_processes(call, paths)
+        elif self.settings.workers > 1 and len(paths) > 1:
+            with ThreadPoolExecutor(max_workers=self.settings.workers) as pool:
+                yield from zip(
+                    paths, pool.map(lambda path: self._load_or_convert(call, path), paths)
+                )
+        else:
+            for path in paths:
+                yield path, self._load_or_convert(call, path)
 
+    def _load_or_convert(self, call: _Call, path: Path) -> Optional[DoclingDocument | CsvTable]:
+        """Return *path*'s cached document, or convert (and cache) it."""
+        self._emit(call, STARTED, path)
+        light = self._convert_lightweight(call, path)
+        if light is not None:
+            # Cheaper to redo than to cache.
+            self._emit(call, FINISHED, path, light)
+            return light
+        with stage("cache.load"):
+            document = self._load_cached(call, path)
+        if document is not None:
+            self._emit(call, FINISHED, path, document, cached=True)
+            return document
+        document = self._convert_path(call, path)
+        if document is not None:
+            with stage("cache.store"):
+                self._store_cached(call, path, document)
+            self._emit(call, FINISHED, path, document)
+        return document
+
+    def _convert_path(self, call: _Call, path: Path) -> Optional[DoclingDocument]:
+        """Convert one existing file (retrying transient errors); log and return None on failure."""
+        attempt = 0
+        while True:
+            attempt += 1
+            with self._progress_lock:
+                call.attempts[path] = attempt
             try:
                 logger.info("Converting %s …", path.name)
                 # Convert document
-                result = self._converter.convert(str(path))
-                # Export to markdown
+                with stage("convert"), self._open_input(call, path) as source, \
+                        self.settings.batch_settings():
+                    result = self._converter_for(path).convert(source)
+                self._record_timings(result)
                 if result and result.document:
-                    md_content = result.document.export_to_markdown()
-                    md_blocks.append(md_content)
-                else:
-                    logger.error("No document content for %s", path)
+                    return result.document
+                logger.error("No document content for %s", path)
+                self._emit(call, FAILED, path, error="No document content")
+                return None
+            except Exception as exc:
+                delay = self.retry.delay(attempt, exc)
+                if delay is None:
+                    logger.error("Docling failed on %s (%s)", path, exc)
+                    self._emit(call, FAILED, path, error=str(exc))
+                    return None
+                logger.warning(
+                    "Retrying %s in %.1fs (attempt %d failed: %s)", path.name, delay, attempt, exc
+                )
+                time.sleep(delay)
+
+    def _convert_lightweight(self, call: _Call, path: Path) -> Optional[CsvTable | HtmlPage]:
+        """
+        A CSV table or simple HTML page for *path*, made without Docling;
+        None if the file needs the full converter.
+        """
+        if self._streams_table(call, path):
+            # Rows are read when the table is exported.
+            return self._csv_table(call, path)
+        if (
+            self.settings.fast_html
+            and InputFormat.HTML in self.settings.allowed_formats
+            and self._format_of(call, path) == InputFormat.HTML
+            # Per-file overrides ask for specific Docling settings.
+            and self._match_override(path) is None
+        ):
+            with stage("fast_html"):
+                return self._html_page(call, path)
+        return None
+
+    def _html_page(self, call: _Call, path: Path) -> Optional[HtmlPage]:
+        stream = call.streams.get(path)
+        try:
+            if stream is not None:
+                data = bytes(stream.stream.getbuffer())
+            else:
+                with open_binary(path) as fh:
+                    data = fh.read(HTML_MAX_BYTES + 1)
+        except OSError:
+            return None  # Docling reports it
+        if len(data) > HTML_MAX_BYTES:
+            return None
+        return parse_html(data, path.name)
+
+    def _streams_table(self, call: _Call, path: Path) -> bool:
+        """Whether *path* takes the streaming CSV path instead of Docling."""
+        input_format = call.formats.get(path)
+        return (
+            self.settings.stream_csv
+            and InputFormat.CSV in self.settings.allowed_formats
+            and (is_table(path) if input_format is None else input_format == InputFormat.CSV)
+        )
+
+    def _csv_table(self, call: _Call, path: Path) -> CsvTable:
+        stream = call.streams.get(path)
+
+        def opener() -> ContextManager[BinaryIO]:
+            if stream is None:
+                return open_binary(path)
+            stream.stream.seek(0)
+            return nullcontext(stream.stream)
+
+        return CsvTable(
+            path.name,
+            opener,
+            max_rows=self.settings.csv_max_rows,
+            align=self.settings.csv_align,
+        )
+
+    @staticmethod
+    def _record_timings(result: Any) -> None:
+        """Pass Docling's per-stage timings to the running profiler, if any."""
+        stages = active_stages()
+        if stages is not None and result is not None:
+            stages.add_docling(getattr(result, "timings", None))
+
+    def _emit(
+        self,
+        call: _Call,
+        kind: str,
+        path: Path,
+        document: Optional[DoclingDocument] = None,
+        *,
+        cached: bool = False,
+        error: Optional[str] = None,
+        pages: int = 0,
+    ) -> None:
+        """
+        Record a file's outcome in *call* and send a `ProgressEvent`
+        to the progress callback, if any (thread-safe). *pages* stands in
+        for the page count of documents that aren't `DoclingDocument`s.
+        """
+        now = time.monotonic()
+        doc_pages = getattr(document, "pages", None)
+        page_count = len(doc_pages) if isinstance(doc_pages, dict) else pages
+        with self._progress_lock:
+            if kind == STARTED:
+                call.started[path] = now
+            started = call.started.pop(path, now) if kind in (FINISHED, FAILED) else now
+            if kind in (FINISHED, FAILED):
+                call.results[path] = ConversionResult(
+                    path=path,
+                    status=SUCCESS if kind == FINISHED else FAILED_STATUS,
+                    seconds=now - started,
+                    pages=page_count,
+                    attempts=call.attempts.pop(path, 0 if cached else 1),
+                    cached=cached,
+                    error=error,
+                )
+            if self.progress is None:  # guard clause
+                return
+            stream = call.streams.get(path)
+            try:
+                size = stream.stream.getbuffer().nbytes if stream else source_size(path)
+            except OSError:
+                size = 0
+            event = ProgressEvent(
+                kind=kind,
+                path=call.names.get(path, path),
+                bytes=size,
+                pages=page_count,
+                elapsed=now - started,
+                cached=cached,
+                error=error,
+            )
+            try:
+                self.progress(event)
+            except Exception as exc:  # a broken callback must not fail the run
+                logger.warning("Progress callback failed (%s)", exc)
+
+    def _cache_path(self, call: _Call, path: Path) -> Optional[Path]:
+        """Where *path*'s converted document lives in `cache_dir`, if caching."""
+        if not self.settings.cache_dir:  # guard clause
+            return None
+        pattern = self._match_override(path)
+        settings = self.settings if pattern is None else self.settings.for_pattern(pattern)
+        name = f"{self._digest(call, path)}-{settings.cache_key()}.docling.json.gz"
+        return Path(self.settings.cache_dir) / name
+
+    def _load_cached(self, call: _Call, path: Path) -> Optional[DoclingDocument]:
+        cache_path = self._cache_path(call, path)
+        if cache_path is None or not cache_path.exists():
+            return None
+        try:
+            with gzip.open(cache_path, "rt", encoding="utf-8") as fh:
+                document = DoclingDocument.model_validate(json.load(fh))
+        except Exception as exc:
+            logger.warning("Ignoring unreadable cache %s (%s)", cache_path, exc)
+            return None
+        logger.info("Loaded %s from cache", path.name)
+        return document
+
+    def _store_cached(self, call: _Call, path: Path, document: DoclingDocument) -> None:
+        cache_path = self._cache_path(call, path)
+        if cache_path is None:  # guard clause
+            return
+        try:
+            cache_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = cache_path.with_name(
+                f".{cache_path.name}.{os.getpid()}.{threading.get_ident()}.tmp"
+            )
+            with gzip.open(tmp_path, "wt", encoding="utf-8", compresslevel=6) as fh:
+                json.dump(document.export_to_dict(), fh, separators=(",", ":"))
+            os.replace(tmp_path, cache_path)
+        except Exception as exc:
+            logger.warning("Could not cache %s (%s)", path, exc)
+
+    def _digest(self, call: _Call, path: Path) -> str:
+        """
+        SHA-256 of *path*'s bytes, whether a file, archive member or stream;
+        computed once per call, however many times dedupe and the cache ask.
+        """
+        digest = call.digests.get(path)
+        if digest is None:
+            stream = call.streams.get(path)
+            digest = stream_digest(stream) if stream is not None else source_digest(path)
+            call.digests[path] = digest
+        return digest
+
+    def _open_input(self, call: _Call, path: Path) -> ContextManager[ConverterInput]:
+        """
+        What to hand Docling for *path* (see `merge2md.sources.open_input`),
+        renamed if its detected format doesn't match its extension.
+        """
+        input_format = call.formats.get(path)
+        suffix = None if input_format is None else route_suffix(path.name, input_format)
+        stream = call.streams.get(path)
+        if stream is None:
+            return open_input(path, suffix=suffix)
+        stream.stream.seek(0)
+        if suffix is not None:
+            return nullcontext(DocumentStream(name=stream.name + suffix, stream=stream.stream))
+        return nullcontext(stream)
+
+    def _detect(self, call: _Call, path: Path) -> Optional[str]:
+        """
+        Sniff *path*'s real format into `call.formats`; return why it can't be
+        converted, or None if it can (or couldn't be read – conversion
+        reports that). UTF-16 text is swapped for a UTF-8 copy in
+        `call.streams`.
+        """
+        passthrough = unsniffed_format(path.name, self.settings.allowed_formats)
+        if passthrough is not None:
+            call.formats[path] = passthrough
+            return None
+
+        def sniff(fh: BinaryIO) -> Tuple[InputFormat, Optional[bytes]]:
+            input_format = detect_format(fh, path.name)
+            return input_format, utf16_as_utf8(fh, input_format)
+
+        stream = call.streams.get(path)
+        try:
+            if stream is not None:
+                stream.stream.seek(0)
+                input_format, utf8 = sniff(stream.stream)
+            else:
+                with open_binary(path) as fh:
+                    input_format, utf8 = sniff(fh)
+        except UnsupportedFormat as exc:
+            error = str(exc)
+        except OSError:
+            return None
+        else:
+            if input_format in self.settings.allowed_formats:
+                call.formats[path] = input_format
+                expected = format_for_suffix(path.suffix)
+                if expected is not None and expected != input_format:
+                    logger.info("%s is %s, not %s", path.name, input_format.value, expected.value)
+                if utf8 is not None:
+                    name = path.name if stream is None else stream.name
+                    call.streams[path] = DocumentStream(name=name, stream=BytesIO(utf8))
+                return None
+            error = f"{input_format.value} files aren't enabled"
+        logger.warning("Unsupported file %s (%s) – skipping", path, error)
+        return error
+
+    def _format_of(self, call: _Call, path: Path) -> Optional[InputFormat]:
+        """*path*'s detected format, else the one its extension implies."""
+        input_format = call.formats.get(path)
+        if input_format is None and path.suffix.lower() in HTML_SUFFIXES:
+            return InputFormat.HTML
+        return input_format if input_format is not None else format_for_suffix(path.suffix)
+
+    def _match_override(self, path: Path) -> Optional[str]:
+        """Return the first override pattern matching *path*'s name, if any."""
+        name = path.name.lower()
+        for pattern in self._override_converters:
+            if fnmatch.fnmatch(name, pattern.lower()):
+                return pattern
+        return None
+
+    def _converter_for(self, path: Path) -> DocumentConverter:
+        """Pick the Docling converter configured for *path*."""
+        pattern = self._match_override(path)
+        if pattern is None:
+            return self._converter
+        return self._override_converters[pattern]
+
+    def _iter_processes(
+        self, call: _Call, paths: List[Path]
+    ) -> Iterator[Tuple[Path, Optional[SpilledMarkdown]]]:
+        """
+        Convert *paths* in `workers` processes, yielding in input order.
+
+        Each worker builds its own converter and spills every document's
+        Markdown to a file (see `_process_convert`); only a small
+        `ConversionResult` comes back through the pool's pipe. The files
+        go to a directory of this call's own, which every yielded
+        `SpilledMarkdown` keeps alive: it is removed once the call and all
+        its documents are gone, so long-lived services don't pile them up.
+        """
+        spill_tmp = tempfile.TemporaryDirectory(prefix="merge2md-spill-")
+        spill_dir = Path(spill_tmp.name)
+        logger.info("Converting %d files in %d worker processes …", len(paths), self.settings.workers)
+
+        ready: Dict[Path, Optional[SpilledMarkdown]] = {}
+        running: Dict[Future[ConversionResult], Path] = {}
+        todo = iter(paths)
+        position = 0
+        # Spawned, not forked: the parent may hold threads and loaded models.
+        with ProcessPoolExecutor(
+            max_workers=self.settings.workers,
+            mp_context=get_context("spawn"),
+            initializer=_process_init,
+            initargs=(self.settings, self.retry),
+        ) as pool:
+            while True:
+                # Keep one file per worker in flight so STARTED means started.
+                for path in todo:
+                    self._emit(call, STARTED, path)
+                    running[pool.submit(
+                        _process_convert, path, spill_dir,
+                        call.streams.get(path), call.formats.get(path),
+                        call.digests.get(path),
+                    )] = path
+                    if len(running) >= self.settings.workers:
+                        break
+                if not running:
+                    break
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    path = running.pop(future)
+                    try:
+                        result = future.result()
+                    except Exception as exc:  # worker died or result unpicklable
+                        logger.error("Worker failed on %s (%s)", path, exc)
+                        result = ConversionResult(path=path, status=FAILED_STATUS, error=str(exc))
+                    self._emit(
+                        call,
+                        FINISHED if result.ok else FAILED, path,
+                        cached=result.cached, error=result.error, pages=result.pages,
+                    )
+                    with self._progress_lock:
+                        # The worker's timings and attempts, not the round trip.
+                        call.results[path] = replace(result, markdown=None, spill_path=None)
+                    ready[path] = (
+                        SpilledMarkdown(path.name, result.spill_path, owner=spill_tmp)
+                        if result.ok and result.spill_path is not None
+                        else None
+                    )
+                while position < len(paths) and paths[position] in ready:
+                    yield paths[position], ready.pop(paths[position])
+                    position += 1
+
+    def _iter_batched(
+        self, call: _Call, paths: List[Path]
+    ) -> Iterator[Tuple[Path, Optional[DoclingDocument | CsvTable]]]:
+        """
+        Convert *paths* through :meth:`DocumentConverter.convert_all`.
+
+        Docling takes `doc_batch_size` files at a time and converts them
+        side by side on `batch_concurrency` threads; layout and OCR still
+        batch pages within each document, not across files. Results are
+        re-ordered to match *paths* and yielded as soon as they're next.
+        """
+        ready: Dict[Path, Optional[DoclingDocument | CsvTable]] = {}
+        pending: list[Path] = []
+        for path in paths:
+            light = self._convert_lightweight(call, path)
+            if light is not None:
+                self._emit(call, STARTED, path)
+                self._emit(call, FINISHED, path, light)
+                ready[path] = light
+                continue
+            cached = self._load_cached(call, path)
+            if cached is None:
+                pending.append(path)
+            else:
+                self._emit(call, STARTED, path)
+                self._emit(call, FINISHED, path, cached, cached=True)
+                ready[path] = cached
+
+        position = 0
+        for source, document in self._batched_results(call, pending):
+            if document is not None:
+                self._store_cached(call, source, document)
+            ready[source] = document
+            while position < len(paths) and paths[position] in ready:
+                yield paths[position], ready.pop(paths[position])
+                position += 1
+        for path in paths[position:]:
+            yield path, ready.pop(path, None)
+
+    def _batched_results(
+        self, call: _Call, paths: List[Path]
+    ) -> Iterator[Tuple[Path, Optional[DoclingDocument]]]:
+        """Yield ``(path, document or None)`` per path as Docling's batches finish."""
+        if not paths:  # guard clause
+            return
+        logger.info(
+            "Converting %d files in batches of %d …",
+            len(paths), self.settings.doc_batch_size,
+        )
+        # Files sharing an override pattern share a converter and a batch.
+        groups: Dict[Optional[str], List[Path]] = {}
+        for path in paths:
+            groups.setdefault(self._match_override(path), []).append(path)
+
+        for group in groups.values():
+            seen: set[Path] = set()
+            # Inputs are opened as Docling pulls them and closed as their
+            # results come back, so only the current batch is held in memory.
+            # Streams may share a name, so each name queues its inputs in
+            # the order Docling returns them.
+            opened: Dict[Path, Deque[Tuple[Path, ExitStack]]] = {}
+
+            def inputs(group: List[Path] = group) -> Iterator[ConverterInput]:
+                for path in group:
+                    self._emit(call, STARTED, path)
+                    stack = ExitStack()
+                    source = stack.enter_context(self._open_input(call, path))
+                    name = source.name if isinstance(source, DocumentStream) else source
+                    opened.setdefault(Path(name), deque()).append((path, stack))
+                    yield source
+
+            try:
+                # Batches run lazily while iterating; "convert" here is only
+                # setup, Docling's own timings cover the pipeline itself.
+                # Docling reads its batch settings as each result is made,
+                # so they're only held for that, not while our caller works.
+                with self.settings.batch_settings():
+                    results = self._converter_for(group[0]).convert_all(
+                        inputs(), raises_on_error=False
+                    )
+                while True:
+                    with self.settings.batch_settings():
+                        result = next(results, None)
+                    if result is None:
+                        break
+                    queued = opened.get(Path(result.input.file))
+                    if queued:
+                        source, stack = queued.popleft()
+                        stack.close()
+                    else:
+                        source = Path(result.input.file)
+                    seen.add(source)
+                    self._record_timings(result)
+                    if result.status not in (
+                        ConversionStatus.SUCCESS, ConversionStatus.PARTIAL_SUCCESS
+                    ) or not result.document:
+                        logger.error("Docling failed on %s (%s)", source, result.status)
+                        self._emit(call, FAILED, source, error=str(result.status))
+                        yield source, None
+                        continue
+                    self._emit(call, FINISHED, source, result.document)
+                    yield source, result.document
             except Exception as exc:
-                logger.error("Docling failed on %s (%s)", path, exc)
+                logger.error("Docling batch failed (%s)", exc)
+            finally:
+                for queued in opened.values():
+                    for _, stack in queued:
+                        stack.close()
+            for path in group:
+                if path not in seen:
+                    logger.error("No document content for %s", path)
+                    self._emit(call, FAILED, path, error="No document content")
+                    yield path, None
+
+
+# The converter of a worker process started by `_iter_processes`.
+_process_converter: Optional[DoclingMarkdownConverter] = None
+
+
+def _process_init(settings: ConversionSettings, retry: RetryPolicy) -> None:
+    """Pool initializer: build this worker process's converter."""
+    global _process_converter
+    _process_converter = DoclingMarkdownConverter(replace(settings, processes=False), retry=retry)
+
 
-        return md_blocks
\ No newline at end of file
+def _process_convert(
+    path: Path,
+    spill_dir: Path,
+    stream: Optional[DocumentStream] = None,
+    input_format: Optional[InputFormat] = None,
+    digest: Optional[str] = None,
+) -> ConversionResult:
+    """Convert *path* in a worker process and spill its Markdown to *spill_dir*."""
+    converter = _process_converter
+    assert converter is not None, "worker not initialized"
+    call = _Call()
+    if stream is not None:
+        call.streams[path] = stream
+    if input_format is not None:
+        call.formats[path] = input_format
+    if digest is not None:
+        call.digests[path] = digest
+    document = converter._load_or_convert(call, path)
+    result = call.results.pop(path, None) or ConversionResult(
+        path=path, status=SUCCESS if document is not None else FAILED_STATUS
+    )
+    if document is not None:
+        result.markdown = document.export_to_markdown()
+        result.spill(spill_dir)
+    return result
@@ -0,0 +1,203 @@
+"""
+Tell an input's real format from its first bytes, before Docling sees it.
+
+Docling picks a backend by file extension (and some probing), so a
+mislabeled file – a Word document saved as ``.pdf``, an HTML page saved
+as ``.txt`` – or a file no backend handles only fails after a full
+conversion attempt. `detect_format` reads the first `HEAD_BYTES` of a file
+instead:
+
+* magic numbers for PDF and the image formats Docling reads;
+* for zip containers, the member names in the central directory
+  (``word/document.xml`` → DOCX, ``ppt/presentation.xml`` → PPTX, …);
+* for text, HTML markup, else the extension (CSV, AsciiDoc, Markdown
+  and plain text, which Docling's Markdown backend reads).
+
+Anything else raises `UnsupportedFormat` with the reason. Formats this
+module can't sniff (JATS XML, Docling JSON, …) are left to Docling when
+they're enabled (see `unsniffed_format`), and UTF-16 text is re-encoded
+for Docling's UTF-8-only text backends (see `utf16_as_utf8`).
+"""
+from __future__ import annotations
+
+import re
+import zipfile
+from pathlib import Path
+from typing import BinaryIO, Dict, Iterable, Optional, Tuple
+
+from docling.datamodel.base_models import FormatToExtensions, InputFormat
+
+# Bytes read to classify a file.
+HEAD_BYTES: int = 8 * 1024
+
+# Extensions Docling recognises per format; the first is used to route
+# mislabeled files (see `route_suffix`).
+SUFFIXES: Dict[InputFormat, Tuple[str, ...]] = {
+    InputFormat.PDF: (".pdf",),
+    InputFormat.DOCX: (".docx", ".dotx", ".docm", ".dotm"),
+    InputFormat.PPTX: (".pptx", ".potx", ".ppsx", ".pptm", ".potm", ".ppsm"),
+    InputFormat.HTML: (".html", ".htm", ".xhtml"),
+    InputFormat.IMAGE: (".png", ".jpg", ".jpeg", ".tif", ".tiff", ".bmp", ".webp"),
+    InputFormat.MD: (".md", ".markdown"),
+    InputFormat.ASCIIDOC: (".adoc", ".asciidoc", ".asc"),
+    InputFormat.CSV: (".csv",),
+}
+if hasattr(InputFormat, "XLSX"):
+    SUFFIXES[InputFormat.XLSX] = (".xlsx", ".xlsm")
+
+# Plain-text extensions read as Markdown.
+_TEXT_SUFFIXES = ("", ".txt", ".text")
+_TABLE_SUFFIXES = (".csv", ".tsv")
+# Formats whose Docling backends read text as UTF-8, whatever its BOM says.
+_UTF8_TEXT_FORMATS = (InputFormat.MD, InputFormat.ASCIIDOC, InputFormat.CSV)
+_UTF16_BOMS = (b"\xff\xfe", b"\xfe\xff")
+
+_IMAGE_MAGIC = (
+    b"\x89PNG\r\n\x1a\n",
+    b"\xff\xd8\xff",  # JPEG
+    b"II*\x00",  # TIFF, little-endian
+    b"MM\x00*",  # TIFF, big-endian
+)
+_OLE2_MAGIC = b"\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1"
+_ZIP_MAGIC = (b"PK\x03\x04", b"PK\x05\x06")
+# Member that marks each Office Open XML format.
+_OOXML_MEMBERS = {
+    "word/document.xml": InputFormat.DOCX,
+    "ppt/presentation.xml": InputFormat.PPTX,
+    "xl/workbook.xml": getattr(InputFormat, "XLSX", None),
+}
+_HTML_RE = re.compile(rb"<(?:!doctype\s+html|html|head|body)[\s>]", re.IGNORECASE)
+# Control bytes that don't occur in text (tab, newlines, form feed and ESC do).
+_BINARY_BYTES = bytes(set(range(32)) - {9, 10, 12, 13, 27})
+
+
+class UnsupportedFormat(ValueError):
+    """The file isn't in a format merge2md can convert."""
+
+
+def format_for_suffix(suffix: str) -> Optional[InputFormat]:
+    """The format Docling assumes for *suffix*, if any."""
+    suffix = suffix.lower()
+    for input_format, suffixes in SUFFIXES.items():
+        if suffix in suffixes:
+            return input_format
+    return None
+
+
+def route_suffix(name: str, input_format: InputFormat) -> Optional[str]:
+    """
+    Extension to hand Docling *name* under so it picks *input_format*;
+    None if the current one already does.
+    """
+    suffix = Path(name).suffix.lower()
+    if suffix in SUFFIXES.get(input_format, (suffix,)):
+        return None
+    return SUFFIXES[input_format][0]
+
+
+def unsniffed_format(name: str, allowed: Iterable[InputFormat]) -> Optional[InputFormat]:
+    """
+    The *allowed* format Docling picks for *name* by extension, if it's one
+    `detect_format` can't sniff (JATS XML, Docling JSON, …); such files go to
+    Docling as they are. None for the extensions `detect_format` handles.
+    """
+    name = name.lower()
+    suffix = Path(name).suffix
+    if suffix in _TEXT_SUFFIXES or suffix in _TABLE_SUFFIXES or format_for_suffix(suffix):
+        return None
+    for input_format in allowed:
+        extensions = FormatToExtensions.get(input_format, ())
+        if input_format not in SUFFIXES and any(name.endswith(f".{ext}") for ext in extensions):
+            return input_format
+    return None
+
+
+def detect_format(fh: BinaryIO, name: str) -> InputFormat:
+    """
+    Classify the file open as *fh* (binary, seekable, at its start) named
+    *name*; raise `UnsupportedFormat` if nothing can convert it.
+    """
+    head = fh.read(HEAD_BYTES)
+    suffix = Path(name).suffix.lower()
+    if not head:
+        input_format = format_for_suffix(suffix)
+        if input_format is None:
+            raise UnsupportedFormat("empty file")
+        return input_format
+
+    if _is_pdf(head):
+        return InputFormat.PDF
+    if head.startswith(_IMAGE_MAGIC) or (head[:4] == b"RIFF" and head[8:12] == b"WEBP"):
+        return InputFormat.IMAGE
+    if head.startswith(_ZIP_MAGIC):
+        fh.seek(0)
+        return _zip_format(fh)
+    if head.startswith(_OLE2_MAGIC):
+        raise UnsupportedFormat("legacy Office (OLE2) file; save it as .docx/.pptx/.xlsx")
+    if head.startswith((b"GIF87a", b"GIF89a")):
+        raise UnsupportedFormat("GIF image")
+
+    text = _text_head(head)
+    if text is None:
+        if head.startswith(b"BM"):
+            return InputFormat.IMAGE
+        raise UnsupportedFormat("unrecognised binary data")
+    if _HTML_RE.search(text) or (suffix in SUFFIXES[InputFormat.HTML] and b"<" in text):
+        return InputFormat.HTML
+    if suffix in _TABLE_SUFFIXES:
+        return InputFormat.CSV
+    if suffix in SUFFIXES[InputFormat.ASCIIDOC]:
+        return InputFormat.ASCIIDOC
+    if suffix in SUFFIXES[InputFormat.MD] or suffix in _TEXT_SUFFIXES:
+        return InputFormat.MD
+    raise UnsupportedFormat(f"plain text in a {suffix} file")
+
+
+def _is_pdf(head: bytes) -> bool:
+    """
+    Whether *head* starts a PDF: ``%PDF-`` in the first KiB, after nothing
+    but whitespace or binary junk (PDF readers skip both). Text that merely
+    mentions ``%PDF-`` doesn't count.
+    """
+    at = head.find(b"%PDF-", 0, 1024)
+    if at < 0:
+        return False
+    junk = head[:at]
+    return not junk.strip() or len(junk.translate(None, _BINARY_BYTES)) < len(junk)
+
+
+def utf16_as_utf8(fh: BinaryIO, input_format: InputFormat) -> Optional[bytes]:
+    """
+    The text of *fh* (binary, seekable) re-encoded as UTF-8 if it's
+    *input_format* text with a UTF-16 byte-order mark, else None. Docling's
+    Markdown, AsciiDoc and CSV backends only read UTF-8.
+    """
+    if input_format not in _UTF8_TEXT_FORMATS:  # guard clause
+        return None
+    fh.seek(0)
+    if fh.read(2) not in _UTF16_BOMS:
+        return None
+    fh.seek(0)
+    return fh.read().decode("utf-16", errors="replace").encode("utf-8")
+
+
+def _zip_format(fh: BinaryIO) -> InputFormat:
+    """Office Open XML format of a zip container, from its member names."""
+    try:
+        with zipfile.ZipFile(fh) as zf:
+            names = set(zf.namelist())
+    except zipfile.BadZipFile as exc:
+        raise UnsupportedFormat(f"corrupt zip container ({exc})") from None
+    for member, input_format in _OOXML_MEMBERS.items():
+        if member in names and input_format is not None:
+            return input_format
+    raise UnsupportedFormat("zip archive that isn't a Word, PowerPoint or Excel file")
+
+
+def _text_head(head: bytes) -> Optional[bytes]:
+    """*head* as ASCII-compatible text bytes, or None if it looks binary."""
+    if head.startswith(_UTF16_BOMS):
+        return head.decode("utf-16", errors="replace").encode("utf-8")
+    sample = head.removeprefix(b"\xef\xbb\xbf")
+    controls = len(sample) - len(sample.translate(None, _BINARY_BYTES))
+    return sample if controls <= len(sample) // 100 else None
@@ -0,0 +1,391 @@
+"""
+Spread conversion over several hosts through a shared SQLite work queue.
+
+The coordinator puts one task per input file into a `WorkQueue` (a SQLite
+file on storage every node can reach, alongside the inputs); workers on
+any host claim tasks, convert them with their own warm
+`DoclingMarkdownConverter` and store the Markdown back in the queue. The
+coordinator waits for the job and merges the blocks in natural order.
+
+Claims are leases. A worker that dies stops renewing its lease and the
+task goes back to the pool; a task that fails is retried up to
+``max_attempts`` times, unless the file itself is unsupported or corrupt. When nothing is left to claim, idle workers also
+take a second copy of tasks that have been running longer than
+``steal_after`` seconds, and whichever copy finishes first wins – so one
+slow node or a pathological file doesn't hold up the whole batch.
+"""
+from __future__ import annotations
+
+import logging
+import os
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+from contextlib import closing, contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from .converter import DoclingMarkdownConverter
+from .merger import MarkdownMerger
+from .results import SUCCESS, UNSUPPORTED
+from .utils import natural_sort
+
+logger = logging.getLogger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS tasks (
+    id          INTEGER PRIMARY KEY,
+    job         TEXT    NOT NULL,
+    seq         INTEGER NOT NULL,
+    path        TEXT    NOT NULL,
+    state       TEXT    NOT NULL DEFAULT 'pending',  -- pending | leased | done | failed
+    attempts    INTEGER NOT NULL DEFAULT 0,
+    copies      INTEGER NOT NULL DEFAULT 0,          -- workers currently holding it
+    worker      TEXT,
+    started_at  REAL,
+    lease_until REAL,
+    markdown    TEXT,
+    error       TEXT
+);
+CREATE INDEX IF NOT EXISTS tasks_state ON tasks (state, seq);
+-- Workers holding each leased task (two while a straggler is duplicated).
+CREATE TABLE IF NOT EXISTS leases (
+    task   INTEGER NOT NULL,
+    worker TEXT    NOT NULL
+);
+CREATE INDEX IF NOT EXISTS leases_task ON leases (task, worker);
+"""
+
+
+@dataclass(frozen=True)
+class Task:
+    """A claimed unit of work: one input file of one job."""
+
+    id: int
+    job: str
+    path: Path
+    attempt: int
+    worker: str
+
+
+class WorkQueue:
+    """
+    Task queue stored in a SQLite database shared by coordinator and workers.
+
+    Every call opens its own short-lived connection, so one instance can be
+    used from several threads (and any number of processes or hosts can
+    open the same file).
+    """
+
+    def __init__(
+        self,
+        db_path: Path,
+        *,
+        lease: float = 60.0,
+        max_attempts: int = 3,
+        steal_after: Optional[float] = 300.0,
+    ) -> None:
+        self.db_path = db_path
+        self.lease = lease
+        self.max_attempts = max_attempts
+        self.steal_after = steal_after
+        with closing(self._connect()) as db:
+            db.executescript(_SCHEMA)
+
+    # ------------------------------------------------------------------ #
+    # Coordinator side
+    # ------------------------------------------------------------------ #
+    def submit(self, paths: Iterable[Path]) -> str:
+        """Queue one task per path (in natural order) and return the job id."""
+        job = uuid.uuid4().hex[:12]
+        rows = [
+            (job, seq, str(path.resolve()))
+            for seq, path in enumerate(natural_sort(paths))
+        ]
+        with self._transaction() as db:
+            db.executemany("INSERT INTO tasks (job, seq, path) VALUES (?, ?, ?)", rows)
+        logger.info("Queued job %s (%d files) in %s", job, len(rows), self.db_path)
+        return job
+
+    def counts(self, job: str) -> Dict[str, int]:
+        """Number of *job*'s tasks in each state."""
+        with closing(self._connect()) as db:
+            rows = db.execute(
+                "SELECT state, COUNT(*) FROM tasks WHERE job = ? GROUP BY state", (job,)
+            ).fetchall()
+        return dict(rows)
+
+    def is_finished(self, job: str) -> bool:
+        """True once every task of *job* is done or has failed for good."""
+        counts = self.counts(job)
+        return not counts.get("pending") and not counts.get("leased")
+
+    def results(self, job: str) -> List[Tuple[Path, str]]:
+        """``(path, markdown)`` of *job*'s finished tasks, in submission order."""
+        with closing(self._connect()) as db:
+            rows = db.execute(
+                "SELECT path, markdown FROM tasks WHERE job = ? AND state = 'done' ORDER BY seq",
+                (job,),
+            ).fetchall()
+        return [(Path(path), markdown) for path, markdown in rows]
+
+    def failures(self, job: str) -> List[Tuple[Path, str]]:
+        """``(path, last error)`` of *job*'s tasks that ran out of attempts."""
+        with closing(self._connect()) as db:
+            rows = db.execute(
+                "SELECT path, error FROM tasks WHERE job = ? AND state = 'failed' ORDER BY seq",
+                (job,),
+            ).fetchall()
+        return [(Path(path), error) for path, error in rows]
+
+    # ------------------------------------------------------------------ #
+    # Worker side
+    # ------------------------------------------------------------------ #
+    def claim(self, worker: str, now: Optional[float] = None) -> Optional[Task]:
+        """
+        Lease the next task to *worker*, or return None if there is none.
+
+        Preference order: pending tasks, then tasks whose lease expired
+        (their worker died), then a second copy of the longest-running
+        task older than ``steal_after``.
+        """
+        now = time.time() if now is None else now
+        with self._transaction() as db:
+            row = db.execute(
+                "SELECT id FROM tasks WHERE state = 'pending' ORDER BY seq LIMIT 1"
+            ).fetchone()
+            if row is None:
+                row = db.execute(
+                    "SELECT id FROM tasks WHERE state = 'leased' AND lease_until < ? "
+                    "ORDER BY seq LIMIT 1",
+                    (now,),
+                ).fetchone()
+                if row is not None:
+                    # Its holder is gone; don't count it as still working.
+                    db.execute("UPDATE tasks SET copies = 0 WHERE id = ?", row)
+                    db.execute("DELETE FROM leases WHERE task = ?", row)
+            if row is None and self.steal_after is not None:
+                row = db.execute(
+                    "SELECT id FROM tasks WHERE state = 'leased' AND copies < 2 "
+                    "AND started_at < ? AND worker != ? ORDER BY started_at LIMIT 1",
+                    (now - self.steal_after, worker),
+                ).fetchone()
+                if row is not None:
+                    logger.info("Worker %s stealing straggler task %d", worker, row[0])
+            if row is None:
+                return None
+
+            db.execute(
+                "UPDATE tasks SET state = 'leased', attempts = attempts + 1, "
+                "copies = copies + 1, worker = ?, started_at = ?, lease_until = ? WHERE id = ?",
+                (worker, now, now + self.lease, row[0]),
+            )
+            db.execute("INSERT INTO leases (task, worker) VALUES (?, ?)", (row[0], worker))
+            job, path, attempts = db.execute(
+                "SELECT job, path, attempts FROM tasks WHERE id = ?", row
+            ).fetchone()
+        return Task(id=row[0], job=job, path=Path(path), attempt=attempts, worker=worker)
+
+    def renew(self, task: Task, now: Optional[float] = None) -> None:
+        """Extend *task*'s lease while it is still being worked on (and still held)."""
+        now = time.time() if now is None else now
+        with self._transaction() as db:
+            db.execute(
+                "UPDATE tasks SET lease_until = MAX(lease_until, ?) "
+                "WHERE id = ? AND state = 'leased' "
+                "AND EXISTS (SELECT 1 FROM leases WHERE task = ? AND worker = ?)",
+                (now + self.lease, task.id, task.id, task.worker),
+            )
+
+    def complete(self, task: Task, markdown: str) -> bool:
+        """Store *task*'s Markdown; False if another copy already finished it."""
+        with self._transaction() as db:
+            cursor = db.execute(
+                "UPDATE tasks SET state = 'done', markdown = ?, error = NULL, copies = 0 "
+                "WHERE id = ? AND state != 'done'",
+                (markdown, task.id),
+            )
+            db.execute("DELETE FROM leases WHERE task = ?", (task.id,))
+        return cursor.rowcount == 1
+
+    def fail(self, task: Task, error: str, *, permanent: bool = False) -> None:
+        """
+        Record a failed attempt; the task is retried until ``max_attempts``.
+
+        A *permanent* failure (the input itself can't be converted) gives up
+        at once. Ignored if *task*'s worker no longer holds the lease – the
+        task expired and went to another worker.
+        """
+        with self._transaction() as db:
+            held = db.execute(
+                "DELETE FROM leases WHERE task = ? AND worker = ?", (task.id, task.worker)
+            ).rowcount
+            state, attempts, copies = db.execute(
+                "SELECT state, attempts, copies FROM tasks WHERE id = ?", (task.id,)
+            ).fetchone()
+            if state != "leased" or not held:  # another copy finished, or the lease was lost
+                return
+            if copies > 1 and not permanent:
+                # A stolen copy is still running; let it decide the outcome.
+                db.execute(
+                    "UPDATE tasks SET copies = copies - 1, error = ? WHERE id = ?",
+                    (error, task.id),
+                )
+                return
+            db.execute("DELETE FROM leases WHERE task = ?", (task.id,))
+            if permanent or attempts >= self.max_attempts:
+                if permanent:
+                    logger.error("Not retrying %s: %s", task.path, error)
+                else:
+                    logger.error("Giving up on %s after %d attempts: %s", task.path, attempts, error)
+                db.execute(
+                    "UPDATE tasks SET state = 'failed', copies = 0, error = ? WHERE id = ?",
+                    (error, task.id),
+                )
+            else:
+                logger.warning("Retrying %s (attempt %d failed: %s)", task.path, attempts, error)
+                db.execute(
+                    "UPDATE tasks SET state = 'pending', copies = 0, worker = NULL, "
+                    "lease_until = NULL, error = ? WHERE id = ?",
+                    (error, task.id),
+                )
+
+    # ------------------------------------------------------------------ #
+    # Private helpers
+    # ------------------------------------------------------------------ #
+    def _connect(self) -> sqlite3.Connection:
+        db = sqlite3.connect(str(self.db_path), timeout=30.0, isolation_level=None)
+        db.execute("PRAGMA busy_timeout = 30000")
+        return db
+
+    @contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        """Write transaction that takes the lock up front (no upgrade deadlocks)."""
+        db = self._connect()
+        try:
+            db.execute("BEGIN IMMEDIATE")
+            try:
+                yield db
+            except BaseException:
+                db.execute("ROLLBACK")
+                raise
+            db.execute("COMMIT")
+        finally:
+            db.close()
+
+
+def default_worker_id() -> str:
+    """``host:pid:thread`` – unique per worker loop across a cluster."""
+    return f"{socket.gethostname()}:{os.getpid()}:{threading.get_ident()}"
+
+
+def run_worker(
+    queue: WorkQueue,
+    converter: DoclingMarkdownConverter,
+    *,
+    worker_id: Optional[str] = None,
+    poll: float = 2.0,
+    exit_when_idle: bool = False,
+    stop: Optional[threading.Event] = None,
+) -> int:
+    """
+    Claim and convert tasks until *stop* is set (or the queue runs dry).
+
+    The lease is renewed in the background while a file converts, so
+    long documents aren't mistaken for dead workers.
+
+    Returns
+    -------
+    int
+        Number of tasks this worker completed.
+    """
+    worker_id = worker_id or default_worker_id()
+    stop = stop or threading.Event()
+    completed = 0
+    logger.info("Worker %s polling %s", worker_id, queue.db_path)
+    while not stop.is_set():
+        task = queue.claim(worker_id)
+        if task is None:
+            if exit_when_idle:
+                break
+            stop.wait(poll)
+            continue
+
+        done = threading.Event()
+        renewer = threading.Thread(
+            target=_renew_until, args=(queue, task, done), daemon=True
+        )
+        renewer.start()
+        try:
+            result, = converter.to_results([task.path])
+            if result.status == SUCCESS:
+                completed += queue.complete(task, result.markdown)
+            else:
+                # Unsupported or corrupt input fails the same way on every worker.
+                queue.fail(
+                    task, result.error or "No document content",
+                    permanent=result.status == UNSUPPORTED,
+                )
+        except Exception as exc:
+            queue.fail(task, str(exc))
+        finally:
+            done.set()
+            renewer.join()
+    return completed
+
+
+def coordinate(
+    queue: WorkQueue,
+    paths: Iterable[Path],
+    output: Path,
+    *,
+    title: Optional[str] = None,
+    toc: bool = False,
+    dedupe_sections: bool = False,
+    poll: float = 2.0,
+) -> Path:
+    """
+    Queue *paths*, wait for workers to convert them, and merge into *output*.
+
+    Files that fail on every attempt are logged and left out, as in the
+    single-host path.
+    """
+    merger = MarkdownMerger(dedupe_sections=dedupe_sections)
+    merger.check_formats([output])
+    job = queue.submit(paths)
+
+    while not queue.is_finished(job):
+        counts = queue.counts(job)
+        logger.info(
+            "Job %s: %d done, %d running, %d pending, %d failed",
+            job, counts.get("done", 0), counts.get("leased", 0),
+            counts.get("pending", 0), counts.get("failed", 0),
+        )
+        time.sleep(poll)
+
+    for path, error in queue.failures(job):
+        logger.error("Failed: %s (%s)", path, error)
+    converted = queue.results(job)
+    sources = [path for path, _ in converted]
+    merged_md = merger.merge(
+        [md for _, md in converted], header=title, sources=sources, toc=toc
+    )
+    merger.export(merged_md, output)
+    if toc and output.suffix.lower() == ".md":
+        merger.write_index(merged_md, output, sources)
+    return output
+
+
+# ---------------------------------------------------------------------- #
+# Private helpers
+# ---------------------------------------------------------------------- #
+def _renew_until(queue: WorkQueue, task: Task, done: threading.Event) -> None:
+    """Renew *task*'s lease every third of a lease period until *done*."""
+    while not done.wait(queue.lease / 3):
+        try:
+            queue.renew(task)
+        except sqlite3.Error as exc:  # pragma: no cover - transient lock/NFS hiccup
+            logger.warning("Could not renew lease on %s: %s", task.path, exc)
@@ -0,0 +1,377 @@
+"""
+A multi-tenant job queue in front of one `DoclingMarkdownConverter`.
+
+A service that takes both interactive single-document requests and huge
+batch merges can't simply call `convert_and_merge` per request: a
+10-second request would wait behind a 2-hour one. `JobQueue` splits every
+job into its files and runs them on a fixed number of slots:
+
+* **Priority lanes** – whenever a slot frees up it takes the next file of
+  the highest-priority lane (`LANES`, most urgent first) that has work, so
+  a running batch is preempted at the next file boundary and interactive
+  jobs wait for at most one file per slot.
+* **Tenant quotas** – a tenant never holds more than its quota of slots,
+  so one customer's backlog can't starve the others.
+
+Within a lane, jobs are served first come, first served. When the last
+file of a job finishes, its blocks are merged and exported like
+`convert_and_merge` does.
+
+Example
+-------
+>>> with JobQueue(slots=4, quotas={"acme": 2}) as queue:
+...     job = queue.submit([Path("memo.pdf")], lane=INTERACTIVE, tenant="acme")
+...     markdown = job.result()
+"""
+from __future__ import annotations
+
+import itertools
+import logging
+import shutil
+import threading
+import time
+from collections import Counter, deque
+from concurrent.futures import Future, InvalidStateError
+from pathlib import Path
+from typing import Deque, Dict, List, Optional, Sequence, Union
+
+from .converter import DoclingMarkdownConverter
+from .merger import MarkdownMerger
+from .results import FAILED, ConversionResult
+
+logger = logging.getLogger(__name__)
+
+# Lanes, most urgent first.
+INTERACTIVE, BATCH = "interactive", "batch"
+LANES = (INTERACTIVE, BATCH)
+
+# Job states.
+QUEUED, RUNNING, DONE, CANCELLED = "queued", "running", "done", "cancelled"
+
+
+class Job:
+    """
+    Handle on a submitted job: poll `status`, wait with `result`, or `cancel`.
+
+    `results` holds a `ConversionResult` per input as files finish (None
+    until then); `waited` is how long the job queued before its first file
+    started.
+    """
+
+    def __init__(
+        self,
+        queue: "JobQueue",
+        paths: List[Path],
+        outputs: Optional[List[Path]],
+        *,
+        tenant: str,
+        lane: str,
+        title: Optional[str],
+        toc: bool,
+        many: bool,
+    ) -> None:
+        self.id = f"job-{next(_job_ids)}"
+        self.paths = paths
+        self.outputs = outputs
+        self.tenant = tenant
+        self.lane = lane
+        self.title = title
+        self.toc = toc
+        self.results: List[Optional[ConversionResult]] = [None] * len(paths)
+        self.submitted = time.monotonic()
+        self.started: Optional[float] = None
+        self.future: Future[Union[Path, List[Path], str]] = Future()
+        self._queue = queue
+        self._many = many
+        self._next = 0  # index of the next file to hand out
+        self._done = 0
+        self._total = len(paths)  # files that will run (fewer once cancelled)
+
+    @property
+    def status(self) -> str:
+        if self.future.cancelled():
+            return CANCELLED
+        if self.future.done():
+            return DONE
+        return QUEUED if self.started is None else RUNNING
+
+    @property
+    def waited(self) -> Optional[float]:
+        return None if self.started is None else self.started - self.submitted
+
+    def result(self, timeout: Optional[float] = None) -> Union[Path, List[Path], str]:
+        """
+        Wait for the job and return its output path(s) – or the merged
+        Markdown if it was submitted without an output. Re-raises the
+        merge/export error if the job failed.
+        """
+        return self.future.result(timeout)
+
+    def cancel(self) -> bool:
+        """Drop the job's remaining files; files already converting finish first."""
+        return self._queue._cancel(self)
+
+
+_job_ids = itertools.count(1)
+
+
+class JobQueue:
+    """
+    Convert and merge jobs on *slots* threads, by lane and within quotas.
+
+    Parameters
+    ----------
+    converter
+        Shared converter (models load once); defaults to a new one.
+    slots
+        Files converted at once (default: the converter's `workers`).
+    quotas
+        Most slots each tenant may hold at once, e.g. ``{"acme": 2}``.
+    default_quota
+        Quota for tenants not in *quotas*; None means up to *slots*.
+    merger
+        Merges finished jobs (default: a plain `MarkdownMerger`).
+    spill_dir
+        Write converted blocks here instead of holding them in memory
+        until their job finishes; worth it for big batches.
+    """
+
+    def __init__(
+        self,
+        converter: Optional[DoclingMarkdownConverter] = None,
+        *,
+        slots: Optional[int] = None,
+        quotas: Optional[Dict[str, int]] = None,
+        default_quota: Optional[int] = None,
+        merger: Optional[MarkdownMerger] = None,
+        spill_dir: Optional[Path] = None,
+    ) -> None:
+        self.converter = converter or DoclingMarkdownConverter()
+        self.slots = max(1, slots or self.converter.settings.workers)
+        self.quotas = dict(quotas or {})
+        self.default_quota = default_quota
+        self.merger = merger or MarkdownMerger()
+        self.spill_dir = spill_dir
+        # Jobs with files still to hand out, per lane in arrival order.
+        self._lanes: Dict[str, Deque[Job]] = {lane: deque() for lane in LANES}
+        self._busy: Counter[str] = Counter()  # slots held per tenant
+        self._cond = threading.Condition()
+        self._closed = False
+        self._threads = [
+            threading.Thread(target=self._work, name=f"merge2md-slot-{i}", daemon=True)
+            for i in range(self.slots)
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def __enter__(self) -> "JobQueue":
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+    # ------------------------------------------------------------------ #
+    # Public API
+    # ------------------------------------------------------------------ #
+    def submit(
+        self,
+        paths: Sequence[Path],
+        output: Union[Path, Sequence[Path], None] = None,
+        *,
+        tenant: str = "default",
+        lane: str = BATCH,
+        title: Optional[str] = None,
+        toc: bool = False,
+    ) -> Job:
+        """
+        Queue a merge of *paths* and return its `Job` right away.
+
+        *output* is a path or list of paths as for `convert_and_merge`
+        (``.jsonl`` excepted); without one the job's result is the merged
+        Markdown itself, which suits interactive requests.
+        """
+        if lane not in LANES:
+            raise ValueError(f"Unknown lane: {lane} (expected one of {', '.join(LANES)})")
+        many = output is not None and not isinstance(output, (str, Path))
+        outputs = None if output is None else (
+            [Path(o) for o in output] if many else [Path(output)]
+        )
+        if outputs:
+            self.merger.check_formats(outputs)
+        job = Job(
+            self, [Path(p) for p in paths], outputs,
+            tenant=tenant, lane=lane, title=title, toc=toc, many=many,
+        )
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("JobQueue is closed")
+            if job.paths:
+                self._lanes[lane].append(job)
+                self._cond.notify_all()
+        if not job.paths:
+            self._finish(job)
+        logger.info("Queued %s (%d files, %s lane, tenant %s)", job.id, len(job.paths), lane, tenant)
+        return job
+
+    def pending(self) -> Dict[str, int]:
+        """Files not yet started, per lane."""
+        with self._cond:
+            return {
+                lane: sum(len(job.paths) - job._next for job in jobs)
+                for lane, jobs in self._lanes.items()
+            }
+
+    def close(self, wait: bool = True) -> None:
+        """Stop taking jobs; with *wait*, finish the queued ones first."""
+        with self._cond:
+            self._closed = True
+            if not wait:
+                for jobs in self._lanes.values():
+                    for job in list(jobs):
+                        job.future.cancel()
+                        if self._drop(job):
+                            self._cleanup(job)
+            self._cond.notify_all()
+        if wait:
+            for thread in self._threads:
+                thread.join()
+
+    # ------------------------------------------------------------------ #
+    # Private helpers
+    # ------------------------------------------------------------------ #
+    def _quota(self, tenant: str) -> int:
+        quota = self.quotas.get(tenant, self.default_quota)
+        return self.slots if quota is None else max(1, quota)
+
+    def _take(self) -> Optional[tuple[Job, int]]:
+        """Next ``(job, file index)`` by lane, then arrival; caller holds the lock."""
+        for lane in LANES:
+            for job in self._lanes[lane]:
+                if self._busy[job.tenant] >= self._quota(job.tenant):
+                    continue
+                index = job._next
+                job._next += 1
+                if job._next == len(job.paths):
+                    self._lanes[lane].remove(job)
+                if job.started is None:
+                    job.started = time.monotonic()
+                self._busy[job.tenant] += 1
+                return job, index
+        return None
+
+    def _work(self) -> None:
+        """Slot thread: convert one file at a time, always the most urgent."""
+        while True:
+            with self._cond:
+                task = self._take()
+                while task is None:
+                    if self._closed and not any(self._lanes.values()):
+                        return
+                    self._cond.wait()
+                    task = self._take()
+            job, index = task
+            result = self._convert(job, index)
+            with self._cond:
+                self._busy[job.tenant] -= 1
+                job.results[index] = result
+                job._done += 1
+                finished = job._done == job._total
+                self._cond.notify_all()
+            if finished:
+                self._finish(job)
+
+    def _convert(self, job: Job, index: int) -> ConversionResult:
+        path = job.paths[index]
+        if job.future.cancelled():
+            return ConversionResult(path=path, status=FAILED, error="Cancelled")
+        try:
+            spill = None if self.spill_dir is None else self.spill_dir / job.id
+            return self.converter.to_results([path], spill_dir=spill)[0]
+        except Exception as exc:  # keep the slot alive whatever happens
+            logger.error("Converting %s for %s failed (%s)", path, job.id, exc)
+            return ConversionResult(path=path, status=FAILED, error=str(exc))
+
+    def _finish(self, job: Job) -> None:
+        """Merge and export a job whose files are all done, and resolve it."""
+        if job.future.cancelled():
+            self._cleanup(job)
+            return
+        try:
+            value = self._merge(job)
+        except Exception as exc:
+            logger.error("%s failed (%s)", job.id, exc)
+            _resolve(job.future, exception=exc)
+        else:
+            _resolve(job.future, value=value)
+            logger.info("Finished %s in %.1fs", job.id, time.monotonic() - job.submitted)
+        finally:
+            self._cleanup(job)
+
+    def _merge(self, job: Job) -> Union[Path, List[Path], str]:
+        converted = [result for result in job.results if result is not None and result.ok]
+        sources = [result.path for result in converted]
+        if job.outputs is None:
+            return self.merger.merge(
+                [result.read_markdown() or "" for result in converted],
+                header=job.title, sources=sources, toc=job.toc,
+            )
+        if job.toc or self.merger.dedupe_sections:
+            merged = self.merger.merge(
+                [result.read_markdown() or "" for result in converted],
+                header=job.title, sources=sources, toc=job.toc,
+            )
+            self.merger.export_all(merged, job.outputs)
+            if job.toc:
+                for out_path in job.outputs:
+                    if out_path.suffix.lower() == ".md":
+                        self.merger.write_index(merged, out_path, sources)
+        else:
+            # Spilled blocks are copied into the outputs from disk.
+            self.merger.export_parts(
+                [
+                    result.markdown if result.markdown is not None else result.spill_path
+                    for result in converted
+                ],
+                job.outputs,
+                header=job.title,
+            )
+        return job.outputs if job._many else job.outputs[0]
+
+    def _cleanup(self, job: Job) -> None:
+        if self.spill_dir is not None:
+            shutil.rmtree(self.spill_dir / job.id, ignore_errors=True)
+
+    def _cancel(self, job: Job) -> bool:
+        with self._cond:
+            if not job.future.cancel():
+                return False
+            idle = self._drop(job)
+        if idle:
+            self._cleanup(job)
+        logger.info("Cancelled %s", job.id)
+        return True
+
+    def _drop(self, job: Job) -> bool:
+        """
+        Take *job*'s unstarted files off its lane (caller holds the lock);
+        True if none of its files is still converting, so nobody will
+        `_finish` it.
+        """
+        if job not in self._lanes[job.lane]:  # guard clause
+            return False
+        self._lanes[job.lane].remove(job)
+        job._total = job._next
+        return job._done == job._total
+
+
+def _resolve(
+    future: Future, *, value: object = None, exception: Optional[BaseException] = None
+) -> None:
+    """Complete *future* unless it was cancelled meanwhile."""
+    try:
+        if exception is not None:
+            future.set_exception(exception)
+        else:
+            future.set_result(value)
+    except InvalidStateError:
+        pass
@@ -1,17 +1,33 @@
 """
-Markdown concatenation and optional PDF export.
+Markdown concatenation and optional PDF/HTML export.
 
 Uses **pandoc** via pypandoc *if available*, else falls back to a
 sub-process call so the code works even if pypandoc isn't installed.
+Markdown can also be written gzip- or zstd-compressed (``.md.gz``,
+``.md.zst``; the latter needs **zstandard**).
+
+Blocks already on disk (spilled by worker processes) can be merged with
+`export_parts`, which copies them into the output in the kernel
+(``copy_file_range``/``sendfile``) instead of reading them into strings.
 """
 from __future__ import annotations
 
+import errno
+import gzip
+import json
 import logging
+import mmap
+import os
+import re
 import shutil
 import subprocess
 import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager, nullcontext
 from pathlib import Path
-from typing import List, Optional
+from typing import Any, BinaryIO, Dict, Iterator, List, Optional, Sequence, Tuple, Union
+
+from .utils import atomic_write, hamming, simhash
 
 logger = logging.getLogger(__name__)
 
@@ -22,16 +38,75 @@ try:
 except ImportError:  # pragma: no cover
     _HAS_PYPANDOC = False
 
+try:
+    import zstandard
+
+    _HAS_ZSTD = True
+except ImportError:  # pragma: no cover
+    _HAS_ZSTD = False
+
+
+# Split point before every ATX heading (keeps the heading with its section).
+_SECTION_RE = re.compile(r"(?m)^(?=#{1,6}\s)")
+_HEADING_RE = re.compile(r"^(#{1,6})\s+(.+?)\s*#*\s*$")
+# Anchors emitted by `merge(toc=True)`; an optional heading line follows.
+_ANCHOR_RE = re.compile(r'(?m)^<a id="source-(\d+)(-[^"]*)?"></a>\n(?:#{1,6}\s+(.*))?')
+# ASCII bytes `str.strip` removes; file blocks are trimmed of these
+# without decoding them. Other UTF-8 sequences (NBSP, U+2028, …) are
+# decoded one character at a time at the ends (see `_stripped_span`).
+_WHITESPACE = frozenset(b" \t\n\r\x0b\x0c\x1c\x1d\x1e\x1f")
+# errnos meaning "no in-kernel copy between these two files": fall back.
+_NO_KERNEL_COPY = frozenset(
+    getattr(errno, name)
+    for name in ("EXDEV", "EINVAL", "ENOSYS", "EOPNOTSUPP", "ENOTSUP", "EBADF", "ENOTSOCK")
+    if hasattr(errno, name)
+)
+
 
 class MarkdownMerger:
-    """Merge Markdown blocks and export `.md` or `.pdf`."""
+    """Merge Markdown blocks and export `.md`, `.html` or `.pdf`."""
 
     SEP: str = "\n\n---\n\n"
+    # Near-duplicate sections: SimHash distance (of 64 bits) at or below
+    # which two sections count as the same, and the minimum section length
+    # worth comparing (short stubs like "## Notes" repeat legitimately).
+    NEAR_DUPLICATE_BITS: int = 6
+    MIN_SECTION_WORDS: int = 20
+    DUPLICATE_NOTE: str = "_Repeated section omitted (near-identical to an earlier one)._"
+
+    # Output suffixes `export` understands.
+    FORMATS: Tuple[str, ...] = (".md", ".pdf", ".html", ".htm", ".md.gz", ".md.zst")
+    # Default levels: gzip 6 (zlib's speed/size sweet spot), zstd 3.
+    DEFAULT_LEVELS: Dict[str, int] = {".gz": 6, ".zst": 3}
+    # Characters encoded and compressed per write, bounding the extra memory.
+    WRITE_CHUNK: int = 1 << 20
+
+    def __init__(
+        self,
+        *,
+        dedupe_sections: bool = False,
+        compression_level: Optional[int] = None,
+        compression_threads: int = -1,
+        fsync: bool = False,
+    ) -> None:
+        self.dedupe_sections = dedupe_sections
+        # fsync Markdown/index outputs before the atomic rename.
+        self.fsync = fsync
+        self.compression_level = compression_level
+        # zstd worker threads; -1 uses every core, 0 compresses inline.
+        self.compression_threads = compression_threads
 
     # ------------------------------------------------------------------ #
     # Public helpers
     # ------------------------------------------------------------------ #
-    def merge(self, md_blocks: List[str], *, header: Optional[str] = None) -> str:
+    def merge(
+        self,
+        md_blocks: List[str],
+        *,
+        header: Optional[str] = None,
+        sources: Optional[Sequence[Path]] = None,
+        toc: bool = False,
+    ) -> str:
         """
         Stitch Markdown pieces together with a horizontal-rule separator.
 
@@ -41,6 +116,11 @@ class MarkdownMerger:
             Individual Markdown fragments.
         header
             Optional H1 heading injected *once* at the very top.
+        sources
+            Paths the blocks came from (same order); used to label the TOC.
+        toc
+            Prepend a table of contents and put an HTML anchor before every
+            block and heading, which `write_index` turns into byte offsets.
 
         Returns
         -------
@@ -54,9 +134,59 @@ class MarkdownMerger:
         if not md_blocks:  # guard clause
             return self.SEP.join(merged) if merged else ""
 
-        merged.extend(block.strip() for block in md_blocks)
+        blocks = [block.strip() for block in md_blocks]
+        if self.dedupe_sections:
+            blocks = self._collapse_near_duplicates(blocks)
+        if toc:
+            labels = [
+                Path(source).name for source in sources
+            ] if sources else [f"Document {i}" for i in range(1, len(blocks) + 1)]
+            blocks, entries = self._add_anchors(blocks, labels)
+            merged.append(self._render_toc(entries))
+        merged.extend(blocks)
         return self.SEP.join(merged)
 
+    def build_index(
+        self, merged_md: str, sources: Optional[Sequence[Path]] = None
+    ) -> Dict[str, Any]:
+        """
+        Map each source block and heading of *merged_md* to byte offsets.
+
+        Works on output of `merge(toc=True)`. Offsets are into the UTF-8
+        encoded file, so readers can ``seek`` (or slice an ``mmap``)
+        straight to ``[start, end)`` of a source.
+        """
+        entries: list[Dict[str, Any]] = []
+        offset, pos = 0, 0
+        for match in _ANCHOR_RE.finditer(merged_md):
+            offset += len(merged_md[pos:match.start()].encode("utf-8"))
+            pos = match.start()
+            number, suffix, title = match.groups()
+            anchor = f"source-{number}{suffix or ''}"
+            if suffix is None:
+                n = int(number)
+                source = str(sources[n - 1]) if sources and n <= len(sources) else None
+                entries.append({"source": source, "anchor": anchor, "start": offset, "headings": []})
+            elif entries:
+                entries[-1]["headings"].append({"title": title, "anchor": anchor, "start": offset})
+
+        total = offset + len(merged_md[pos:].encode("utf-8"))
+        sep = len(self.SEP.encode("utf-8"))
+        for entry, following in zip(entries, entries[1:] + [None]):
+            entry["end"] = following["start"] - sep if following else total
+        return {"size": total, "sources": entries}
+
+    def write_index(
+        self, merged_md: str, out_path: Path, sources: Optional[Sequence[Path]] = None
+    ) -> Path:
+        """Write `build_index` as a ``<out_path>.index.json`` sidecar and return its path."""
+        index_path = out_path.with_name(out_path.name + ".index.json")
+        index = {"output": out_path.name, **self.build_index(merged_md, sources)}
+        with atomic_write(index_path, fsync=self.fsync) as fh:
+            fh.write(json.dumps(index, indent=2).encode("utf-8"))
+        logger.info("Writing %s", index_path)
+        return index_path
+
     # ------------------------------------------------------------------ #
     # Export
     # ------------------------------------------------------------------ #
@@ -65,32 +195,381 @@ class MarkdownMerger:
         Write *merged_md* to *out_path*.
 
         * If `out_path.suffix == ".md"` → write as UTF-8 text.
+        * If `== ".md.gz"` / `".md.zst"` → UTF-8 text, compressed as written.
         * If `== ".pdf"` → round-trip through Pandoc.
+        * If `== ".html"` → standalone HTML page via Pandoc.
+
+        Markdown outputs go to a temp file that is renamed over *out_path*
+        once complete, so a crash never leaves a truncated file behind.
         """
         logger.info("Writing %s", out_path)
-        suffix = out_path.suffix.lower()
+        suffix = _output_suffix(out_path)
 
-        if suffix == ".md":
-            out_path.write_text(merged_md, encoding="utf-8")
+        if suffix in (".md", ".md.gz", ".md.zst"):
+            self._write_markdown(merged_md, out_path, suffix)
         elif suffix == ".pdf":
             self._markdown_to_pdf(merged_md, out_path)
+        elif suffix in (".html", ".htm"):
+            self._pandoc(merged_md, out_path, "html", ["--standalone"])
         else:  # pragma: no cover
             raise ValueError(f"Unsupported output format: {suffix}")
 
+    def check_formats(self, out_paths: Sequence[Path]) -> None:
+        """Raise `ValueError` if any of *out_paths* has a suffix `export` can't write."""
+        for out_path in out_paths:
+            suffix = _output_suffix(out_path)
+            if suffix not in self.FORMATS:
+                raise ValueError(f"Unsupported output format: {suffix}")
+            if suffix == ".md.zst" and not _HAS_ZSTD:
+                raise RuntimeError("zstandard not installed (pip install zstandard)")
+
+    def export_all(self, merged_md: str, out_paths: Sequence[Path]) -> None:
+        """
+        Write *merged_md* to every path in *out_paths* concurrently.
+
+        Formats are checked up front so a bad suffix fails before any
+        (slow) Pandoc run starts. The first export error is re-raised.
+        """
+        self.check_formats(out_paths)
+        if len(out_paths) == 1:
+            self.export(merged_md, out_paths[0])
+            return
+        with ThreadPoolExecutor(max_workers=len(out_paths)) as pool:
+            futures = [pool.submit(self.export, merged_md, path) for path in out_paths]
+            for future in futures:
+                future.result()
+
+    def export_parts(
+        self,
+        parts: Sequence[Union[str, Path]],
+        out_paths: Sequence[Path],
+        *,
+        header: Optional[str] = None,
+    ) -> None:
+        """
+        Write ``merge(blocks, header=header)`` to *out_paths* without
+        building the merged document in memory.
+
+        Each part is a Markdown string or a file holding a block's UTF-8
+        Markdown (e.g. `merge2md.results.SpilledMarkdown.path`). The output
+        is byte-for-byte what `export` writes for the merged string. File
+        parts go into plain ``.md`` outputs by ``copy_file_range`` or
+        ``sendfile`` where the OS allows, otherwise by `WRITE_CHUNK`-byte
+        reads; either way they never become Python strings. PDF/HTML
+        outputs run Pandoc on the concatenated file.
+        """
+        self.check_formats(out_paths)
+        if len(out_paths) == 1:
+            self._export_parts(parts, out_paths[0], header)
+            return
+        with ThreadPoolExecutor(max_workers=len(out_paths)) as pool:
+            futures = [
+                pool.submit(self._export_parts, parts, path, header) for path in out_paths
+            ]
+            for future in futures:
+                future.result()
+
     # ------------------------------------------------------------------ #
     # Private helpers
     # ------------------------------------------------------------------ #
+    def _export_parts(
+        self, parts: Sequence[Union[str, Path]], out_path: Path, header: Optional[str]
+    ) -> None:
+        logger.info("Writing %s", out_path)
+        suffix = _output_suffix(out_path)
+        if suffix in (".md", ".md.gz", ".md.zst"):
+            with self._open_markdown(out_path, suffix) as fh:
+                self._write_parts(parts, fh, header, kernel_copy=suffix == ".md")
+            return
+        with tempfile.NamedTemporaryFile(delete=False, suffix=".md") as tmp:
+            self._write_parts(parts, tmp, header, kernel_copy=True)
+        try:
+            if suffix == ".pdf":
+                self._run_pandoc(Path(tmp.name), out_path, "pdf")
+            else:
+                self._run_pandoc(Path(tmp.name), out_path, "html", ["--standalone"])
+        finally:
+            Path(tmp.name).unlink(missing_ok=True)
+
+    def _write_parts(
+        self,
+        parts: Sequence[Union[str, Path]],
+        fh: BinaryIO,
+        header: Optional[str],
+        *,
+        kernel_copy: bool,
+    ) -> None:
+        """Write *header* and *parts* to *fh*, joined and stripped as `merge` does."""
+        sep = self.SEP.encode("utf-8")
+        first = True
+        if header:
+            fh.write(f"# {header}".encode("utf-8"))
+            first = False
+        for part in parts:
+            if not first:
+                fh.write(sep)
+            first = False
+            if isinstance(part, str):
+                text = part.strip()
+                for start in range(0, len(text), self.WRITE_CHUNK):
+                    fh.write(text[start:start + self.WRITE_CHUNK].encode("utf-8"))
+            else:
+                self._copy_block(Path(part), fh, kernel_copy)
+
+    def _copy_block(self, path: Path, fh: BinaryIO, kernel_copy: bool) -> None:
+        """Append *path*'s bytes, minus surrounding whitespace, to *fh*."""
+        with open(path, "rb") as src:
+            start, end = _stripped_span(src)
+            offset = start
+            if kernel_copy:
+                fh.flush()
+                offset += _kernel_copy(src.fileno(), fh.fileno(), start, end - start)
+                # Re-sync the buffered writer with the fd's new position.
+                fh.seek(0, os.SEEK_END)
+            src.seek(offset)
+            remaining = end - offset
+            while remaining > 0:
+                chunk = src.read(min(self.WRITE_CHUNK, remaining))
+                if not chunk:
+                    break
+                fh.write(chunk)
+                remaining -= len(chunk)
+
+    def _add_anchors(
+        self, blocks: List[str], labels: List[str]
+    ) -> Tuple[List[str], List[Tuple[int, str, str]]]:
+        """
+        Put an HTML anchor before each block and each of its headings.
+
+        Returns the anchored blocks and TOC entries ``(depth, title, anchor)``
+        where depth 0 is a source file and a block's shallowest heading
+        level is depth 1. Headings inside code fences are left alone.
+        """
+        anchored: list[str] = []
+        entries: list[Tuple[int, str, str]] = []
+        for number, (block, label) in enumerate(zip(blocks, labels), start=1):
+            prefix = f"source-{number}"
+            entries.append((0, label, prefix))
+            headings: list[Tuple[int, str, str]] = []
+            lines = [f'<a id="{prefix}"></a>']
+            used: Dict[str, int] = {}
+            in_fence = False
+            for line in block.splitlines():
+                if line.lstrip().startswith(("```", "~~~")):
+                    in_fence = not in_fence
+                match = None if in_fence else _HEADING_RE.match(line)
+                if match:
+                    title = match.group(2)
+                    slug = _slugify(title)
+                    used[slug] = used.get(slug, 0) + 1
+                    if used[slug] > 1:
+                        slug = f"{slug}-{used[slug] - 1}"
+                    anchor = f"{prefix}-{slug}"
+                    headings.append((len(match.group(1)), title, anchor))
+                    lines.append(f'<a id="{anchor}"></a>')
+                lines.append(line)
+            anchored.append("\n".join(lines))
+            top = min((level for level, _, _ in headings), default=1)
+            entries.extend((level - top + 1, title, anchor) for level, title, anchor in headings)
+        return anchored, entries
+
+    @staticmethod
+    def _render_toc(entries: List[Tuple[int, str, str]]) -> str:
+        """Render TOC entries as a nested Markdown list."""
+        lines = ["## Contents", ""]
+        for depth, title, anchor in entries:
+            indent = "  " * min(depth, 6)
+            lines.append(f"{indent}- [{title}](#{anchor})")
+        return "\n".join(lines)
+
+    def _collapse_near_duplicates(self, blocks: List[str]) -> List[str]:
+        """
+        Replace sections that repeat an earlier one with a short note.
+
+        Sections start at ATX headings. Each gets a 64-bit SimHash split
+        into eight 8-bit bands; any earlier hash within 7 bits must share
+        at least one band, so only those candidates are compared.
+        """
+        bands: Dict[Tuple[int, int], List[int]] = {}
+        collapsed = 0
+        result: list[str] = []
+        for block in blocks:
+            pieces = _SECTION_RE.split(block)
+            for i, section in enumerate(pieces):
+                if len(section.split()) < self.MIN_SECTION_WORDS:
+                    continue
+                fingerprint = simhash(section)
+                keys = [(band, fingerprint >> (8 * band) & 0xFF) for band in range(8)]
+                if any(
+                    hamming(fingerprint, other) <= self.NEAR_DUPLICATE_BITS
+                    for key in keys
+                    for other in bands.get(key, ())
+                ):
+                    heading = section.splitlines()[0] if section.startswith("#") else ""
+                    pieces[i] = f"{heading}\n\n{self.DUPLICATE_NOTE}\n\n".lstrip()
+                    collapsed += 1
+                    continue
+                for key in keys:
+                    bands.setdefault(key, []).append(fingerprint)
+            result.append("".join(pieces).strip())
+
+        if collapsed:
+            logger.info("Collapsed %d near-duplicate sections", collapsed)
+        return result
+
+    def _write_markdown(self, markdown: str, out_path: Path, suffix: str) -> None:
+        """
+        Atomically write *markdown* to *out_path*, gzip/zstd-compressed per *suffix*.
+
+        Text is encoded (and compressed) `WRITE_CHUNK` characters at a
+        time, so no second full-size copy of the document is built.
+        """
+        with self._open_markdown(out_path, suffix) as fh:
+            for start in range(0, len(markdown), self.WRITE_CHUNK):
+                fh.write(markdown[start:start + self.WRITE_CHUNK].encode("utf-8"))
+
+    @contextmanager
+    def _open_markdown(self, out_path: Path, suffix: str) -> Iterator[BinaryIO]:
+        """Atomically open *out_path* for writing, gzip/zstd-compressed per *suffix*."""
+        with atomic_write(out_path, fsync=self.fsync) as raw:
+            if suffix == ".md":
+                stream = nullcontext(raw)
+            else:
+                compression = out_path.suffix.lower()
+                level = self.compression_level
+                if level is None:
+                    level = self.DEFAULT_LEVELS[compression]
+                if compression == ".gz":
+                    # mtime=0 keeps the output byte-identical across runs.
+                    stream = gzip.GzipFile(
+                        filename="", mode="wb", fileobj=raw, compresslevel=level, mtime=0
+                    )
+                else:
+                    stream = zstandard.ZstdCompressor(
+                        level=level, threads=self.compression_threads
+                    ).stream_writer(raw, size=-1, closefd=False)
+            with stream as fh:
+                yield fh
+
     def _markdown_to_pdf(self, markdown: str, out_path: Path) -> None:
         """Convert *markdown* → PDF via Pandoc."""
+        self._pandoc(markdown, out_path, "pdf")
+
+    def _pandoc(
+        self,
+        markdown: str,
+        out_path: Path,
+        to: str,
+        extra_args: Sequence[str] = (),
+    ) -> None:
+        """Convert *markdown* to the Pandoc format *to* at *out_path*."""
         with tempfile.NamedTemporaryFile(delete=False, suffix=".md") as tmp:
             tmp.write(markdown.encode())
 
+        try:
+            self._run_pandoc(Path(tmp.name), out_path, to, extra_args)
+        finally:
+            Path(tmp.name).unlink(missing_ok=True)
+
+    @staticmethod
+    def _run_pandoc(
+        md_path: Path, out_path: Path, to: str, extra_args: Sequence[str] = ()
+    ) -> None:
+        """Convert the Markdown file *md_path* to *to* at *out_path*."""
         if _HAS_PYPANDOC:
-            pypandoc.convert_file(tmp.name, "pdf", outputfile=str(out_path))
+            pypandoc.convert_file(
+                str(md_path), to, outputfile=str(out_path), extra_args=list(extra_args)
+            )
         else:
             if not shutil.which("pandoc"):  # pragma: no cover
                 raise RuntimeError("pandoc not found (brew install pandoc)")
             subprocess.run(
-                ["pandoc", tmp.name, "-o", str(out_path)],
+                ["pandoc", str(md_path), "-o", str(out_path), *extra_args],
                 check=True,
-            )
\ No newline at end of file
+            )
+
+
+def _output_suffix(out_path: Path) -> str:
+    """Lower-case format suffix, keeping ``.md`` with a compression suffix."""
+    suffixes = [suffix.lower() for suffix in out_path.suffixes[-2:]]
+    if len(suffixes) == 2 and suffixes[1] in (".gz", ".zst"):
+        return "".join(suffixes)
+    return out_path.suffix.lower()
+
+
+def _slugify(title: str) -> str:
+    """GitHub-style anchor slug: lowercase words joined by hyphens."""
+    slug = re.sub(r"[^\w\s-]", "", title.lower()).strip()
+    return re.sub(r"[\s]+", "-", slug) or "section"
+
+
+def _stripped_span(src: BinaryIO) -> Tuple[int, int]:
+    """
+    ``[start, end)`` of *src*'s UTF-8 bytes without the leading/trailing
+    whitespace `str.strip` would remove.
+    """
+    size = os.fstat(src.fileno()).st_size
+    if size == 0:  # guard clause (empty files can't be mapped)
+        return 0, 0
+    with mmap.mmap(src.fileno(), 0, access=mmap.ACCESS_READ) as view:
+        start, end = 0, size
+        while start < end:
+            width = _space_width(view, start, end, forward=True)
+            if not width:
+                break
+            start += width
+        while end > start:
+            width = _space_width(view, start, end, forward=False)
+            if not width:
+                break
+            end -= width
+    return start, end
+
+
+def _space_width(view: mmap.mmap, start: int, end: int, *, forward: bool) -> int:
+    """
+    Byte length of the whitespace character at *start* (*forward*) or just
+    before *end*, or 0 if that character isn't whitespace.
+    """
+    byte = view[start] if forward else view[end - 1]
+    if byte < 0x80:
+        return 1 if byte in _WHITESPACE else 0
+    if forward:
+        width = 2 if byte < 0xE0 else 3 if byte < 0xF0 else 4
+        char = view[start:min(start + width, end)]
+    else:
+        # Back up over continuation bytes to the character's first byte.
+        first = end - 1
+        while first > max(start, end - 4) and 0x80 <= view[first] < 0xC0:
+            first -= 1
+        char = view[first:end]
+    try:
+        return len(char) if char.decode("utf-8").isspace() else 0
+    except UnicodeDecodeError:
+        return 0
+
+
+def _kernel_copy(src_fd: int, dst_fd: int, offset: int, count: int) -> int:
+    """
+    Append *count* bytes of *src_fd* from *offset* to *dst_fd* without
+    passing them through user space; return how many bytes were copied
+    (fewer – possibly 0 – where the OS or filesystem can't).
+    """
+    copied = 0
+    for name in ("copy_file_range", "sendfile"):
+        if not hasattr(os, name):
+            continue
+        try:
+            while copied < count:
+                if name == "copy_file_range":
+                    n = os.copy_file_range(src_fd, dst_fd, count - copied, offset + copied)
+                else:
+                    n = os.sendfile(dst_fd, src_fd, offset + copied, count - copied)
+                if n == 0:
+                    return copied
+                copied += n
+            return copied
+        except OSError as exc:
+            if exc.errno not in _NO_KERNEL_COPY:
+                raise
+    return copied
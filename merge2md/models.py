@@ -0,0 +1,109 @@
+"""
+Pre-fetch and pin Docling model weights for offline use.
+
+`fetch_models` downloads the layout, TableFormer and EasyOCR weights into
+one directory and records a SHA-256 manifest of every file; `verify_models`
+checks the directory against that manifest. Point
+`ConversionSettings.artifacts_path` at the directory and converters load
+from it without touching the network.
+"""
+from __future__ import annotations
+
+import json
+import logging
+from pathlib import Path
+from typing import Dict, List
+
+from .utils import file_digest
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_ARTIFACTS_PATH: Path = Path.home() / ".cache" / "merge2md" / "models"
+MANIFEST_NAME: str = "manifest.json"
+EASYOCR_DIRNAME: str = "EasyOcr"  # Sub-directory Docling's downloader uses.
+
+
+def fetch_models(
+    artifacts_path: Path = DEFAULT_ARTIFACTS_PATH,
+    *,
+    force: bool = False,
+    with_easyocr: bool = True,
+) -> Path:
+    """
+    Download Docling's model weights into *artifacts_path* and pin them.
+
+    Parameters
+    ----------
+    artifacts_path
+        Target directory (created if missing).
+    force
+        Re-download even if the weights are already present.
+    with_easyocr
+        Also fetch the EasyOCR detection/recognition weights.
+
+    Returns
+    -------
+    Path
+        *artifacts_path*, for convenience.
+    """
+    artifacts_path.mkdir(parents=True, exist_ok=True)
+    logger.info("Fetching Docling models into %s", artifacts_path)
+
+    try:
+        from docling.utils.model_downloader import download_models
+    except ImportError:  # pragma: no cover - Docling < 2.20
+        from docling.pipeline.standard_pdf_pipeline import StandardPdfPipeline
+
+        StandardPdfPipeline.download_models_hf(local_dir=artifacts_path, force=force)
+    else:
+        download_models(
+            output_dir=artifacts_path,
+            force=force,
+            progress=False,
+            with_easyocr=with_easyocr,
+        )
+
+    manifest = _hash_tree(artifacts_path)
+    (artifacts_path / MANIFEST_NAME).write_text(
+        json.dumps(manifest, indent=2, sort_keys=True), encoding="utf-8"
+    )
+    logger.info("Pinned %d model files", len(manifest))
+    return artifacts_path
+
+
+def verify_models(artifacts_path: Path = DEFAULT_ARTIFACTS_PATH) -> List[str]:
+    """
+    Check *artifacts_path* against the manifest written by `fetch_models`.
+
+    Returns
+    -------
+    list[str]
+        Human-readable problems; empty when every pinned file is present
+        and unchanged.
+    """
+    manifest_path = artifacts_path / MANIFEST_NAME
+    if not manifest_path.exists():  # guard clause
+        return [f"No manifest in {artifacts_path} (run `merge2md models fetch`)"]
+
+    expected: Dict[str, str] = json.loads(manifest_path.read_text(encoding="utf-8"))
+    problems: list[str] = []
+    for rel, digest in sorted(expected.items()):
+        path = artifacts_path / rel
+        if not path.is_file():
+            problems.append(f"Missing: {rel}")
+        elif file_digest(path) != digest:
+            problems.append(f"Checksum mismatch: {rel}")
+    return problems
+
+
+# ---------------------------------------------------------------------- #
+# Private helpers
+# ---------------------------------------------------------------------- #
+def _hash_tree(root: Path) -> Dict[str, str]:
+    """Map every file under *root* (except the manifest) to its SHA-256."""
+    return {
+        path.relative_to(root).as_posix(): file_digest(path)
+        for path in sorted(root.rglob("*"))
+        if path.is_file() and path.name != MANIFEST_NAME
+    }
+
@@ -1,22 +1,40 @@
 """
-macOS notification system for merge2md completion.
+Completion notifications for merge2md.
 
-Uses AppleScript via osascript to show native macOS dialogs.
+`show_completion_dialog` shows a native macOS dialog via AppleScript and
+waits for it. Pipelines use a *notifier* instead – any callable taking
+``(output_path, success)`` – dispatched with `notify` on a background
+thread, so conversions never wait on UI. Backends: `NullNotifier`,
+`ConsoleNotifier`, `DialogNotifier` (macOS), `DesktopNotifier`
+(notify-send / Notification Center), `WebhookNotifier` and
+`CallbackNotifier`.
 """
 from __future__ import annotations
 
+import json
+import os
+import shutil
 import subprocess
 import logging
+import sys
+import threading
+import urllib.request
 from pathlib import Path
-from typing import Optional
+from typing import Callable, Dict, Optional
 
 logger = logging.getLogger(__name__)
 
+# A notifier is anything called as ``notifier(output_path, success)``.
+Notifier = Callable[[Path, bool], None]
+
 
 def show_completion_dialog(output_path: Path, success: bool = True) -> None:
     """
     Show a macOS dialog notifying the user that the conversion is complete.
     
+    Blocks until the dialog is dismissed; `DialogNotifier` shows the same
+    dialog without waiting.
+    
     Parameters
     ----------
     output_path : Path
@@ -26,54 +44,10 @@ def show_completion_dialog(output_path: Path, success: bool = True) -> None:
     """
     try:
         output_path = output_path.resolve()  # Get absolute path
-        parent_dir = output_path.parent
-        filename = output_path.name
-        
-        if success:
-            title = "Conversion Complete"
-            message = f"File saved as: {filename}"
-            buttons = '{"Open in Finder", "OK"}'
-            default_button = 1
-        else:
-            title = "Conversion Failed"
-            message = "An error occurred during conversion."
-            buttons = '{"OK"}'
-            default_button = 1
-        
-        # Build AppleScript command
-        if success:
-            script = f'''
-            tell application "System Events"
-                activate
-                set theResult to display dialog "{message}" ¬
-                    with title "{title}" ¬
-                    buttons {buttons} ¬
-                    default button {default_button} ¬
-                    with icon note
-                
-                if button returned of theResult is "Open in Finder" then
-                    tell application "Finder"
-                        activate
-                        reveal POSIX file "{output_path}"
-                    end tell
-                end if
-            end tell
-            '''
-        else:
-            script = f'''
-            tell application "System Events"
-                activate
-                display dialog "{message}" ¬
-                    with title "{title}" ¬
-                    buttons {buttons} ¬
-                    default button {default_button} ¬
-                    with icon note
-            end tell
-            '''
         
         # Execute AppleScript
         subprocess.run(
-            ["osascript", "-e", script],
+            ["osascript", "-e", _dialog_script(output_path, success)],
             check=False,  # Don't raise exception if user cancels
             capture_output=True,
             text=True
@@ -82,13 +56,141 @@ def show_completion_dialog(output_path: Path, success: bool = True) -> None:
     except Exception as e:
         logger.warning(f"Could not show completion dialog: {e}")
         # Fall back to terminal message
-        if success:
-            print(f"\n✅ Conversion complete! File saved to: {output_path}")
+        _print_status(output_path, success)
+
+
+class NullNotifier:
+    """Send nothing (headless batch runs)."""
+
+    def __call__(self, output_path: Path, success: bool) -> None:
+        pass
+
+
+class ConsoleNotifier:
+    """Print a one-line status to stdout."""
+
+    def __call__(self, output_path: Path, success: bool) -> None:
+        _print_status(output_path, success)
+
+
+class DialogNotifier:
+    """macOS dialog with "Open in Finder", shown without waiting for a click."""
+
+    def __call__(self, output_path: Path, success: bool) -> None:
+        output_path = output_path.resolve()
+        # Own session: the dialog outlives us and never holds up the caller.
+        subprocess.Popen(
+            ["osascript", "-e", _dialog_script(output_path, success)],
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+            start_new_session=True,
+        )
+
+
+class DesktopNotifier:
+    """Transient desktop notification: ``notify-send`` on Linux, Notification Center on macOS."""
+
+    def __call__(self, output_path: Path, success: bool) -> None:
+        title = "Conversion Complete" if success else "Conversion Failed"
+        message = f"File saved as: {output_path.name}" if success else "An error occurred during conversion."
+        if sys.platform == "darwin":
+            command = ["osascript", "-e", f'display notification "{message}" with title "{title}"']
         else:
-            print(f"\n❌ Conversion failed.")
+            command = ["notify-send", "--app-name=merge2md", title, message]
+        subprocess.Popen(
+            command,
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+            start_new_session=True,
+        )
+
+
+class WebhookNotifier:
+    """POST ``{"output", "success"}`` as JSON to *url* (e.g. a local pipeline endpoint)."""
+
+    def __init__(self, url: str, *, timeout: float = 5.0) -> None:
+        self.url = url
+        self.timeout = timeout
+
+    def __call__(self, output_path: Path, success: bool) -> None:
+        body = json.dumps({"output": str(output_path), "success": success}).encode("utf-8")
+        request = urllib.request.Request(
+            self.url, data=body, headers={"Content-Type": "application/json"}, method="POST"
+        )
+        with urllib.request.urlopen(request, timeout=self.timeout):
+            pass
+
+
+class CallbackNotifier:
+    """Call *callback(output_path, success)*."""
 
+    def __init__(self, callback: Callable[[Path, bool], None]) -> None:
+        self.callback = callback
 
-def get_default_output_path(filename: str = "merged.md") -> Path:
+    def __call__(self, output_path: Path, success: bool) -> None:
+        self.callback(output_path, success)
+
+
+# Backends constructible without arguments, for `get_notifier` / ``--notify``.
+NOTIFIERS: Dict[str, Callable[[], Notifier]] = {
+    "none": NullNotifier,
+    "console": ConsoleNotifier,
+    "dialog": DialogNotifier,
+    "desktop": DesktopNotifier,
+}
+
+
+def default_notifier() -> Notifier:
+    """
+    Pick a backend for this machine: the Finder dialog on macOS, a desktop
+    notification where ``notify-send`` and a display exist, else console.
+    """
+    if sys.platform == "darwin":
+        return DialogNotifier()
+    if (os.environ.get("DISPLAY") or os.environ.get("WAYLAND_DISPLAY")) and shutil.which("notify-send"):
+        return DesktopNotifier()
+    return ConsoleNotifier()
+
+
+def get_notifier(name: str, *, webhook_url: Optional[str] = None) -> Notifier:
+    """
+    Build a notifier by name: ``auto``, ``none``, ``console``, ``dialog``,
+    ``desktop`` or ``webhook`` (which needs *webhook_url*).
+    """
+    if name == "auto":
+        return default_notifier()
+    if name == "webhook":
+        if not webhook_url:
+            raise ValueError("The webhook notifier needs a URL")
+        return WebhookNotifier(webhook_url)
+    try:
+        return NOTIFIERS[name]()
+    except KeyError:
+        raise ValueError(f"Unknown notifier: {name}") from None
+
+
+def notify(notifier: Notifier, output_path: Path, success: bool) -> threading.Thread:
+    """
+    Run *notifier* on a background thread and return immediately.
+
+    Errors are logged, never raised. The thread is not a daemon, so a
+    webhook still gets sent if the program is about to exit (each backend
+    bounds its own runtime).
+    """
+    def _run() -> None:
+        try:
+            notifier(output_path, success)
+        except Exception as exc:
+            logger.warning("Notification via %s failed: %s", type(notifier).__name__, exc)
+
+    thread = threading.Thread(target=_run, name="merge2md-notify")
+    thread.start()
+    return thread
+
+
+def get_default_output_path(filename: str = "merged.md", *, reserve: bool = False) -> Path:
     """
     Get the default output path in the user's Downloads folder.
     
@@ -96,6 +198,9 @@ def get_default_output_path(filename: str = "merged.md") -> Path:
     ----------
     filename : str
         The filename to use (default: "merged.md")
+    reserve : bool
+        Create the chosen file (empty) with ``O_EXCL`` so concurrent runs
+        can never pick the same name; the caller then overwrites it.
         
     Returns
     -------
@@ -105,14 +210,85 @@ def get_default_output_path(filename: str = "merged.md") -> Path:
     downloads = Path.home() / "Downloads"
     downloads.mkdir(exist_ok=True)  # Ensure Downloads folder exists
     
-    # If file already exists, add a number suffix
-    output_path = downloads / filename
-    if output_path.exists():
-        base = output_path.stem
-        ext = output_path.suffix
-        counter = 1
-        while output_path.exists():
-            output_path = downloads / f"{base}_{counter}{ext}"
-            counter += 1
+    # If file already exists, add a number suffix. One directory listing
+    # instead of an exists() call per candidate name.
+    base, ext = _split_name(filename)
+    taken = {entry.name for entry in os.scandir(downloads) if entry.name.startswith(base)}
+    counter = 0
+    while True:
+        name = filename if counter == 0 else f"{base}_{counter}{ext}"
+        counter += 1
+        if name in taken:
+            continue
+        output_path = downloads / name
+        if not reserve:
+            return output_path
+        try:
+            os.close(os.open(output_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY, 0o666))
+        except FileExistsError:  # another run got here first
+            continue
+        return output_path
+
+
+def _split_name(filename: str) -> tuple[str, str]:
+    """``("merged", ".md")``; keeps ``.md.gz``-style compound suffixes together."""
+    path = Path(filename)
+    suffixes = path.suffixes[-2:]
+    if len(suffixes) == 2 and suffixes[-1].lower() in (".gz", ".zst"):
+        ext = "".join(suffixes)
+    else:
+        ext = path.suffix
+    return filename[: len(filename) - len(ext)], ext
+
+
+def _dialog_script(output_path: Path, success: bool) -> str:
+    """AppleScript for the completion dialog (*output_path* must be absolute)."""
+    filename = output_path.name
     
-    return output_path 
\ No newline at end of file
+    if success:
+        title = "Conversion Complete"
+        message = f"File saved as: {filename}"
+        buttons = '{"Open in Finder", "OK"}'
+        default_button = 1
+    else:
+        title = "Conversion Failed"
+        message = "An error occurred during conversion."
+        buttons = '{"OK"}'
+        default_button = 1
+    
+    # Build AppleScript command
+    if success:
+        return f'''
+        tell application "System Events"
+            activate
+            set theResult to display dialog "{message}" ¬
+                with title "{title}" ¬
+                buttons {buttons} ¬
+                default button {default_button} ¬
+                with icon note
+            
+            if button returned of theResult is "Open in Finder" then
+                tell application "Finder"
+                    activate
+                    reveal POSIX file "{output_path}"
+                end tell
+            end if
+        end tell
+        '''
+    return f'''
+        tell application "System Events"
+            activate
+            display dialog "{message}" ¬
+                with title "{title}" ¬
+                buttons {buttons} ¬
+                default button {default_button} ¬
+                with icon note
+        end tell
+        '''
+
+
+def _print_status(output_path: Path, success: bool) -> None:
+    if success:
+        print(f"\n✅ Conversion complete! File saved to: {output_path}")
+    else:
+        print(f"\n❌ Conversion failed.")
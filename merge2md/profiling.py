@@ -0,0 +1,203 @@
+"""
+Attribute a run's time to Docling pipeline stages and Python call stacks.
+
+`Profiler` wraps a conversion and writes, per run:
+
+* ``<stem>.txt`` – summary table of stage timings (Docling's own per-page
+  timings such as layout, OCR, table structure and PDF parsing, plus
+  merge2md's export/merge steps) and the top functions by cumulative time;
+* ``<stem>.collapsed`` – sampled stacks of every thread in the collapsed
+  format read by ``flamegraph.pl``, speedscope and inferno;
+* ``<stem>.pstats`` – raw cProfile data of the calling thread for
+  ``snakeviz`` / ``pstats``.
+
+Code records its own stages with ``with stage("name"):`` – a no-op unless
+a profiler is running.
+"""
+from __future__ import annotations
+
+import cProfile
+import io
+import logging
+import os
+import pstats
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Mapping, Optional, Tuple
+
+from docling.datamodel.settings import settings as docling_settings
+
+logger = logging.getLogger(__name__)
+
+# The collector `stage()` reports to while a `Profiler` is active.
+_active: Optional["StageTimings"] = None
+
+
+class StageTimings:
+    """Thread-safe totals of ``stage → (calls, seconds)``."""
+
+    def __init__(self) -> None:
+        self._totals: Dict[str, Tuple[int, float]] = {}
+        self._lock = threading.Lock()
+
+    def add(self, name: str, seconds: float, count: int = 1) -> None:
+        with self._lock:
+            calls, total = self._totals.get(name, (0, 0.0))
+            self._totals[name] = (calls + count, total + seconds)
+
+    def add_docling(self, timings: Optional[Mapping[str, Any]]) -> None:
+        """Fold a `ConversionResult.timings` mapping (Docling's ProfilingItems) in."""
+        for name, item in (timings or {}).items():
+            times = list(getattr(item, "times", None) or [])
+            if times:
+                self.add(f"docling.{name}", sum(times), len(times))
+
+    def rows(self) -> List[Tuple[str, int, float]]:
+        """``(stage, calls, seconds)`` sorted by time spent, slowest first."""
+        with self._lock:
+            items = list(self._totals.items())
+        return sorted(
+            ((name, calls, total) for name, (calls, total) in items),
+            key=lambda row: row[2],
+            reverse=True,
+        )
+
+    def render(self) -> str:
+        rows = self.rows()
+        width = max([len("Stage")] + [len(name) for name, _, _ in rows])
+        lines = [f"{'Stage':<{width}}  {'Calls':>7}  {'Total s':>9}  {'Mean ms':>9}"]
+        for name, calls, total in rows:
+            lines.append(
+                f"{name:<{width}}  {calls:>7}  {total:>9.3f}  {1000 * total / calls:>9.1f}"
+            )
+        return "\n".join(lines)
+
+
+def active_stages() -> Optional[StageTimings]:
+    """The running profiler's collector, or None when not profiling."""
+    return _active
+
+
+@contextmanager
+def stage(name: str) -> Iterator[None]:
+    """Time the block as stage *name* if a `Profiler` is running."""
+    stages = _active
+    if stages is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        stages.add(name, time.perf_counter() - start)
+
+
+class Profiler:
+    """
+    Profile everything run inside ``with Profiler(out_dir):``.
+
+    Parameters
+    ----------
+    out_dir
+        Directory for the report files (created if missing).
+    interval
+        Seconds between stack samples (default 5 ms).
+    cprofile
+        Also run cProfile on the calling thread (more detail, more overhead).
+    """
+
+    def __init__(self, out_dir: Path, *, interval: float = 0.005, cprofile: bool = True) -> None:
+        self.out_dir = out_dir
+        self.interval = interval
+        self.stages = StageTimings()
+        self.samples: Counter[str] = Counter()
+        self.paths: Dict[str, Path] = {}
+        self._cprofile = cProfile.Profile() if cprofile else None
+        self._stop = threading.Event()
+        self._sampler: Optional[threading.Thread] = None
+        self._saved_docling_flag: Optional[bool] = None
+        self._started = 0.0
+
+    def __enter__(self) -> "Profiler":
+        global _active
+        if _active is not None:
+            raise RuntimeError("A Profiler is already running")
+        _active = self.stages
+        # Ask Docling to time its pipeline stages per page/document.
+        debug = getattr(docling_settings, "debug", None)
+        if debug is not None and hasattr(debug, "profile_pipeline_timings"):
+            self._saved_docling_flag = debug.profile_pipeline_timings
+            debug.profile_pipeline_timings = True
+
+        self._sampler = threading.Thread(target=self._sample, name="merge2md-sampler", daemon=True)
+        self._sampler.start()
+        self._started = time.perf_counter()
+        if self._cprofile is not None:
+            self._cprofile.enable()
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        global _active
+        if self._cprofile is not None:
+            self._cprofile.disable()
+        self.stages.add("total", time.perf_counter() - self._started)
+        self._stop.set()
+        if self._sampler is not None:
+            self._sampler.join()
+        if self._saved_docling_flag is not None:
+            docling_settings.debug.profile_pipeline_timings = self._saved_docling_flag
+        _active = None
+        self.write()
+
+    def write(self) -> Dict[str, Path]:
+        """Write the report files and return them by kind."""
+        self.out_dir.mkdir(parents=True, exist_ok=True)
+        stem = self.out_dir / f"merge2md-{datetime.now():%Y%m%d-%H%M%S}-{os.getpid()}"
+
+        collapsed = stem.with_suffix(".collapsed")
+        collapsed.write_text(
+            "".join(f"{stack} {count}\n" for stack, count in self.samples.most_common()),
+            encoding="utf-8",
+        )
+        self.paths = {"collapsed": collapsed}
+
+        summary = [self.stages.render()]
+        if self._cprofile is not None:
+            stats_path = stem.with_suffix(".pstats")
+            self._cprofile.dump_stats(str(stats_path))
+            self.paths["pstats"] = stats_path
+            buffer = io.StringIO()
+            pstats.Stats(self._cprofile, stream=buffer).sort_stats("cumulative").print_stats(20)
+            summary.append(buffer.getvalue().strip())
+        summary_path = stem.with_suffix(".txt")
+        summary_path.write_text("\n\n".join(summary) + "\n", encoding="utf-8")
+        self.paths["summary"] = summary_path
+
+        logger.info("Profile written to %s.{txt,collapsed%s}", stem, ",pstats" if self._cprofile else "")
+        return self.paths
+
+    # ------------------------------------------------------------------ #
+    # Private helpers
+    # ------------------------------------------------------------------ #
+    def _sample(self) -> None:
+        """Record every other thread's stack each *interval* until stopped."""
+        me = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                if ident == me:
+                    continue
+                frames: list[str] = []
+                while frame is not None:
+                    code = frame.f_code
+                    frames.append(
+                        f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+                    )
+                    frame = frame.f_back
+                thread_name = names.get(ident, str(ident))
+                self.samples[";".join([thread_name, *reversed(frames)])] += 1
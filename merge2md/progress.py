@@ -0,0 +1,213 @@
+"""
+Progress events from `DoclingMarkdownConverter` and a terminal progress bar.
+
+Pass a callback as ``progress=`` to the converter or `convert_and_merge`
+and it receives a `ProgressEvent` per file as it is queued, started,
+finished or failed. `ProgressTracker` folds those events into totals,
+throughput and an ETA; `ProgressBar` draws them on a TTY.
+
+The ETA is estimated per input format: finished files give pages per
+second and pages per byte for their format, so the remaining files'
+sizes can be turned into expected pages and then seconds. Formats
+without pages (DOCX, HTML, …) fall back to seconds per byte.
+"""
+from __future__ import annotations
+
+import sys
+import threading
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Dict, Optional, TextIO
+
+# Event kinds, in the order a file goes through them.
+QUEUED, STARTED, FINISHED, FAILED = "queued", "started", "finished", "failed"
+
+
+@dataclass(frozen=True)
+class ProgressEvent:
+    """One step of one file's conversion."""
+
+    kind: str
+    path: Path
+    bytes: int = 0
+    pages: int = 0
+    # Seconds spent converting this file (finished/failed events).
+    elapsed: float = 0.0
+    cached: bool = False
+    error: Optional[str] = None
+
+    @property
+    def format(self) -> str:
+        """Lower-case suffix the ETA is estimated by (``.pdf``, ``.docx``, …)."""
+        return self.path.suffix.lower()
+
+
+ProgressCallback = Callable[[ProgressEvent], None]
+
+
+@dataclass
+class _FormatStats:
+    """Observed cost of converting one format."""
+
+    files: int = 0
+    pages: int = 0
+    bytes: int = 0
+    seconds: float = 0.0
+
+    def estimate(self, size: int) -> Optional[float]:
+        """Seconds to convert *size* bytes of this format, or None if unknown."""
+        if not self.files or not self.bytes or self.seconds <= 0:
+            return None
+        if self.pages:
+            expected_pages = size * self.pages / self.bytes
+            return expected_pages / (self.pages / self.seconds)
+        return size * self.seconds / self.bytes
+
+
+@dataclass
+class ProgressTracker:
+    """
+    Aggregate progress events into counts, throughput and an ETA.
+
+    Thread-safe: events may arrive from converter worker threads.
+    """
+
+    clock: Callable[[], float] = time.monotonic
+    files_total: int = 0
+    files_done: int = 0
+    files_failed: int = 0
+    bytes_total: int = 0
+    bytes_done: int = 0
+    pages_done: int = 0
+    current: Optional[Path] = None
+    started_at: Optional[float] = None
+    _remaining: Dict[Path, int] = field(default_factory=dict)
+    _formats: Dict[str, _FormatStats] = field(default_factory=dict)
+    _busy_seconds: float = 0.0
+    _lock: threading.Lock = field(default_factory=threading.Lock)
+
+    def __call__(self, event: ProgressEvent) -> None:
+        with self._lock:
+            if event.kind == QUEUED:
+                self.files_total += 1
+                self.bytes_total += event.bytes
+                self._remaining[event.path] = event.bytes
+            elif event.kind == STARTED:
+                if self.started_at is None:
+                    self.started_at = self.clock()
+                self.current = event.path
+            elif event.kind in (FINISHED, FAILED):
+                self._remaining.pop(event.path, None)
+                self.bytes_done += event.bytes
+                if event.kind == FAILED:
+                    self.files_failed += 1
+                    return
+                self.files_done += 1
+                self.pages_done += event.pages
+                if not event.cached:
+                    stats = self._formats.setdefault(event.format, _FormatStats())
+                    stats.files += 1
+                    stats.pages += event.pages
+                    stats.bytes += event.bytes
+                    stats.seconds += event.elapsed
+                    self._busy_seconds += event.elapsed
+
+    @property
+    def wall_seconds(self) -> float:
+        return 0.0 if self.started_at is None else self.clock() - self.started_at
+
+    @property
+    def pages_per_second(self) -> float:
+        wall = self.wall_seconds
+        return self.pages_done / wall if wall > 0 else 0.0
+
+    def eta(self) -> Optional[float]:
+        """
+        Estimated seconds until every queued file is done, or None before
+        anything has finished.
+
+        Per-file estimates are summed, then divided by the parallelism
+        actually observed (busy seconds per wall second).
+        """
+        with self._lock:
+            if not self._remaining:
+                return 0.0
+            known = [stats for stats in self._formats.values() if stats.files]
+            if not known:
+                return None
+            overall = _FormatStats(
+                files=sum(s.files for s in known),
+                bytes=sum(s.bytes for s in known),
+                seconds=sum(s.seconds for s in known),
+            )
+            total = 0.0
+            for path, size in self._remaining.items():
+                stats = self._formats.get(path.suffix.lower())
+                estimate = stats.estimate(size) if stats else None
+                if estimate is None:
+                    estimate = overall.estimate(size) or 0.0
+                total += estimate
+            wall = self.wall_seconds
+            parallelism = self._busy_seconds / wall if wall > 0 else 1.0
+            return total / max(1.0, parallelism)
+
+
+class ProgressBar:
+    """
+    Draw a `ProgressTracker` as a one-line bar on a terminal.
+
+    Example
+    -------
+    >>> convert_and_merge(paths, progress=ProgressBar())
+    """
+
+    WIDTH: int = 24
+    # Redraw at most this often (seconds); file-level events always redraw.
+    MIN_INTERVAL: float = 0.2
+
+    def __init__(self, stream: Optional[TextIO] = None, tracker: Optional[ProgressTracker] = None) -> None:
+        self.stream = stream or sys.stderr
+        self.tracker = tracker or ProgressTracker()
+        self._lock = threading.Lock()
+
+    def __call__(self, event: ProgressEvent) -> None:
+        self.tracker(event)
+        if event.kind == QUEUED:
+            return
+        with self._lock:
+            self.stream.write("\r\x1b[K" + self.render())
+            if self.tracker.files_done + self.tracker.files_failed == self.tracker.files_total:
+                self.stream.write("\n")
+            self.stream.flush()
+
+    def render(self) -> str:
+        t = self.tracker
+        finished = t.files_done + t.files_failed
+        fraction = t.bytes_done / t.bytes_total if t.bytes_total else (
+            finished / t.files_total if t.files_total else 0.0
+        )
+        filled = int(round(self.WIDTH * fraction))
+        parts = [
+            f"[{'#' * filled}{'-' * (self.WIDTH - filled)}] {finished}/{t.files_total} files",
+            f"{t.pages_done} pages",
+            f"{t.pages_per_second:.1f} pages/s",
+        ]
+        eta = t.eta()
+        parts.append(f"ETA {_format_seconds(eta)}" if eta is not None else "ETA --")
+        if t.files_failed:
+            parts.append(f"{t.files_failed} failed")
+        if t.current is not None and finished < t.files_total:
+            parts.append(t.current.name)
+        return " · ".join(parts)
+
+
+def _format_seconds(seconds: float) -> str:
+    seconds = int(round(seconds))
+    hours, rest = divmod(seconds, 3600)
+    minutes, secs = divmod(rest, 60)
+    if hours:
+        return f"{hours}h{minutes:02d}m"
+    if minutes:
+        return f"{minutes}m{secs:02d}s"
+    return f"{secs}s"
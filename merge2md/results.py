@@ -0,0 +1,185 @@
+"""
+Per-file conversion outcomes, retries of transient failures, and the
+results file behind ``--retry-failed``.
+
+`DoclingMarkdownConverter.iter_results` / `to_results` report every input
+– converted, failed or missing – as a `ConversionResult`, in input order,
+so callers can line blocks up with their sources and retry only what
+failed. `save_results` / `load_results` keep a run's results on disk; the
+Markdown of each converted file goes to a ``<results>.blocks/`` directory
+next to it, so a later run can reuse it without converting again.
+
+Worker processes (``ConversionSettings(processes=True)``) hand their
+Markdown back the same way: as a spill file, passed along as a
+`SpilledMarkdown` document instead of a pickled string.
+"""
+from __future__ import annotations
+
+import errno
+import hashlib
+import json
+import logging
+import shutil
+from dataclasses import asdict, dataclass, fields
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Type
+
+from .utils import atomic_write
+
+logger = logging.getLogger(__name__)
+
+# Result statuses; unsupported files are rejected before conversion.
+SUCCESS, FAILED, MISSING, UNSUPPORTED = "success", "failed", "missing", "unsupported"
+
+# OSError errnos worth another try: busy/locked files, flaky network
+# mounts, memory pressure.
+_TRANSIENT_ERRNOS = frozenset(
+    getattr(errno, name)
+    for name in ("EAGAIN", "EBUSY", "EINTR", "EIO", "ENOMEM", "ESTALE", "ETIMEDOUT")
+    if hasattr(errno, name)
+)
+
+
+@dataclass(slots=True)
+class ConversionResult:
+    """What happened to one input."""
+
+    path: Path
+    status: str
+    # The Markdown, or where it was spilled to (see `spill`).
+    markdown: Optional[str] = None
+    spill_path: Optional[Path] = None
+    seconds: float = 0.0
+    pages: int = 0
+    # Conversion attempts made; 0 for cached documents.
+    attempts: int = 0
+    cached: bool = False
+    error: Optional[str] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.status == SUCCESS
+
+    def read_markdown(self) -> Optional[str]:
+        """The Markdown, from memory or its spill file."""
+        if self.markdown is None and self.spill_path is not None:
+            return self.spill_path.read_text(encoding="utf-8")
+        return self.markdown
+
+    def spill(self, directory: Path) -> None:
+        """
+        Move the Markdown out of memory into a file under *directory*.
+
+        Markdown already spilled elsewhere (e.g. by a worker process into
+        a temp directory) is copied into *directory*.
+        """
+        if self.markdown is None and (
+            self.spill_path is None or self.spill_path.parent == directory
+        ):  # guard clause
+            return
+        directory.mkdir(parents=True, exist_ok=True)
+        name = hashlib.sha256(str(self.path).encode("utf-8")).hexdigest()[:16]
+        spill_path = directory / f"{name}.md"
+        with atomic_write(spill_path) as fh:
+            if self.markdown is not None:
+                fh.write(self.markdown.encode("utf-8"))
+            else:
+                with open(self.spill_path, "rb") as src:
+                    shutil.copyfileobj(src, fh)
+        self.spill_path, self.markdown = spill_path, None
+
+    def to_dict(self) -> Dict[str, Any]:
+        data = asdict(self)
+        data["path"] = str(self.path)
+        data["spill_path"] = str(self.spill_path) if self.spill_path else None
+        return data
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "ConversionResult":
+        known = {f.name for f in fields(cls)}
+        values = {key: value for key, value in data.items() if key in known}
+        values["path"] = Path(values["path"])
+        if values.get("spill_path"):
+            values["spill_path"] = Path(values["spill_path"])
+        return cls(**values)
+
+
+class SpilledMarkdown:
+    """
+    A document converted in a worker process, whose Markdown is in a file.
+
+    Stands in for the `DoclingDocument` (like `merge2md.tables.CsvTable`);
+    `MarkdownMerger.export_parts` copies `path` into the output without
+    reading it into a string. *owner* (e.g. the `TemporaryDirectory`
+    holding `path`) is kept alive for as long as the document is; keep the
+    document while you still need `path`.
+    """
+
+    def __init__(self, name: str, path: Path, owner: Any = None) -> None:
+        self.name = name
+        self.path = path
+        self._owner = owner
+
+    def export_to_markdown(self) -> str:
+        return self.path.read_text(encoding="utf-8")
+
+
+@dataclass(frozen=True)
+class RetryPolicy:
+    """
+    Retry transient conversion failures with exponential backoff.
+
+    A file is tried up to *attempts* times; before try *n + 1* the
+    converter waits ``backoff * factor ** (n - 1)`` seconds, capped at
+    *max_delay*. Only errors `is_transient` accepts are retried – a corrupt
+    PDF fails the same way every time.
+    """
+
+    attempts: int = 3
+    backoff: float = 1.0
+    factor: float = 2.0
+    max_delay: float = 30.0
+    transient: Tuple[Type[BaseException], ...] = (TimeoutError, ConnectionError, MemoryError)
+
+    def is_transient(self, exc: BaseException) -> bool:
+        if isinstance(exc, self.transient):
+            return True
+        if isinstance(exc, OSError) and exc.errno in _TRANSIENT_ERRNOS:
+            return True
+        # CUDA/MPS OOM surfaces as a RuntimeError from torch.
+        return isinstance(exc, RuntimeError) and "out of memory" in str(exc).lower()
+
+    def delay(self, attempt: int, exc: BaseException) -> Optional[float]:
+        """Seconds to wait after failed *attempt* (1-based), or None to give up."""
+        if attempt >= self.attempts or not self.is_transient(exc):
+            return None
+        return min(self.max_delay, self.backoff * self.factor ** (attempt - 1))
+
+
+def blocks_dir(results_path: Path) -> Path:
+    """Where `save_results` spills the Markdown of *results_path*'s run."""
+    return results_path.with_name(results_path.name + ".blocks")
+
+
+def save_results(results: Iterable[ConversionResult], path: Path) -> Path:
+    """
+    Write *results* as JSON to *path* (atomically) and return it.
+
+    Markdown still held in memory is spilled to `blocks_dir` first, so the
+    JSON stays small and the blocks can be reused by `--retry-failed`.
+    """
+    results = list(results)
+    for result in results:
+        result.spill(blocks_dir(path))
+    payload = {"results": [result.to_dict() for result in results]}
+    with atomic_write(path) as fh:
+        fh.write(json.dumps(payload, indent=2).encode("utf-8"))
+    failed = sum(not result.ok for result in results)
+    logger.info("Writing %s (%d ok, %d failed)", path, len(results) - failed, failed)
+    return path
+
+
+def load_results(path: Path) -> List[ConversionResult]:
+    """Read results written by `save_results`."""
+    data = json.loads(path.read_text(encoding="utf-8"))
+    return [ConversionResult.from_dict(item) for item in data["results"]]
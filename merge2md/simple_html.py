@@ -0,0 +1,298 @@
+"""
+Convert simple HTML pages to Markdown without Docling.
+
+Pages saved from wikis and intranets are mostly headings, paragraphs,
+lists, links and plain tables. For those, building a Docling document
+costs far more (converter dispatch, backend setup, the document model)
+than parsing. `parse_html` turns them into Markdown in a single pass of
+the standard library's `html.parser`, in the shape Docling's HTML
+backend produces.
+
+Anything the lean parser can't render faithfully – embedded SVG/MathML,
+iframes, forms, tables with merged or nested cells, custom elements – makes
+`parse_html` return None, and the page goes through Docling as before.
+"""
+from __future__ import annotations
+
+import logging
+import re
+from html.parser import HTMLParser
+from typing import List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+HTML_SUFFIXES = (".html", ".htm", ".xhtml")
+# Bigger pages aren't "small"; Docling's overhead doesn't dominate them.
+MAX_BYTES: int = 1024 * 1024
+
+_HEADINGS = {f"h{level}": level for level in range(1, 7)}
+# Block containers: their content starts and ends a paragraph.
+_BLOCKS = frozenset({
+    "p", "div", "section", "article", "header", "footer", "main", "nav",
+    "aside", "figure", "figcaption", "address", "dl", "dt", "dd", "center",
+    "details", "summary",
+})
+# Tags rendered as their text (or ignored) without losing anything.
+_INLINE = frozenset({
+    "html", "body", "span", "a", "strong", "b", "em", "i", "u", "code", "br",
+    "img", "hr", "sup", "sub", "small", "abbr", "time", "mark", "cite", "q",
+    "s", "del", "ins", "kbd", "samp", "var", "label", "font", "wbr", "tt", "big",
+})
+_LISTS = frozenset({"ul", "ol", "li"})
+_TABLES = frozenset({
+    "table", "caption", "thead", "tbody", "tfoot", "tr", "th", "td", "colgroup", "col",
+})
+# Content dropped entirely.
+_SKIPPED = frozenset({"head", "script", "style", "noscript", "template"})
+_EMPHASIS = {"strong": "**", "b": "**", "em": "*", "i": "*"}
+_SUPPORTED = _BLOCKS | _INLINE | _LISTS | _TABLES | _SKIPPED | set(_HEADINGS) | {
+    "pre", "blockquote", "meta", "link", "title", "base",
+}
+
+_CHARSET_RE = re.compile(rb"""<meta[^>]+charset\s*=\s*["']?([\w-]+)""", re.IGNORECASE)
+_SPACE_RE = re.compile(r"\s+")
+
+
+class HtmlPage:
+    """
+    Markdown of a simple HTML page; stands in for a `DoclingDocument`
+    (see `merge2md.tables.CsvTable` for the same idea with CSV).
+    """
+
+    def __init__(self, name: str, markdown: str, title: Optional[str] = None) -> None:
+        self.name = name
+        self.markdown = markdown
+        self.title = title
+
+    def export_to_markdown(self) -> str:
+        return self.markdown
+
+
+class _NotSimple(Exception):
+    """Raised inside the parser when the page needs Docling."""
+
+
+class _MarkdownParser(HTMLParser):
+    """Single-pass HTML → Markdown for the tags in `_SUPPORTED`."""
+
+    def __init__(self) -> None:
+        super().__init__(convert_charrefs=True)
+        self.blocks: List[Tuple[str, str]] = []  # (kind, markdown)
+        self.title: Optional[str] = None
+        self._inline: List[str] = []
+        self._skip = 0
+        self._pre = 0
+        self._quote = 0
+        self._links: List[Tuple[int, Optional[str]]] = []
+        # One (ordered, next number) per open list.
+        self._lists: List[List[int]] = []
+        self._item_prefix: Optional[str] = None
+        self._table: Optional[List[List[str]]] = None
+        self._cell: Optional[List[str]] = None
+        self._in_title = False
+
+    # ------------------------------------------------------------------ #
+    # HTMLParser callbacks
+    # ------------------------------------------------------------------ #
+    def handle_starttag(self, tag: str, attrs: List[Tuple[str, Optional[str]]]) -> None:
+        if tag not in _SUPPORTED:
+            raise _NotSimple(tag)
+        if tag == "title":
+            self._in_title = True
+            return
+        if tag in _SKIPPED:
+            self._skip += 1
+            return
+        if self._skip:
+            return
+        if tag in _HEADINGS or tag in _BLOCKS or tag in ("pre", "blockquote", "hr"):
+            self._flush()
+        if tag == "pre":
+            self._pre += 1
+        elif tag == "blockquote":
+            self._quote += 1
+        elif tag in ("ul", "ol"):
+            if self._table is not None:
+                raise _NotSimple("list in table")
+            self._flush()
+            self._lists.append([tag == "ol", 1])
+        elif tag == "li":
+            self._flush()
+            if self._lists:
+                ordered = self._lists[-1]
+                marker = f"{ordered[1]}." if ordered[0] else "-"
+                ordered[1] += 1
+                self._item_prefix = "   " * (len(self._lists) - 1) + marker + " "
+        elif tag == "table":
+            if self._table is not None:
+                raise _NotSimple("nested table")
+            self._flush()
+            self._table = []
+        elif tag == "tr" and self._table is not None:
+            self._table.append([])
+        elif tag in ("td", "th") and self._table is not None:
+            if any(
+                name in ("colspan", "rowspan") and value not in (None, "1")
+                for name, value in attrs
+            ):
+                raise _NotSimple("merged cells")
+            if not self._table:
+                self._table.append([])
+            self._cell = []
+        elif tag == "br":
+            self._inline.append("\n" if self._pre else " ")
+        elif tag == "img" and self._table is None:
+            self._flush()
+            self.blocks.append(("block", "<!-- image -->"))
+        elif tag == "a":
+            self._links.append((len(self._target()), dict(attrs).get("href")))
+        elif tag in _EMPHASIS and not self._pre:
+            self._target().append(_EMPHASIS[tag])
+        elif tag == "code" and not self._pre:
+            self._target().append("`")
+
+    def handle_endtag(self, tag: str) -> None:
+        if tag == "title":
+            self._in_title = False
+            return
+        if tag in _SKIPPED:
+            self._skip = max(0, self._skip - 1)
+            return
+        if self._skip or tag not in _SUPPORTED:
+            return
+        if tag in _HEADINGS:
+            text = self._take_inline()
+            if text:
+                self.blocks.append(("block", "#" * _HEADINGS[tag] + " " + text))
+        elif tag == "pre":
+            code = "".join(self._inline).strip("\n")
+            self._inline = []
+            self._pre = max(0, self._pre - 1)
+            self.blocks.append(("block", f"```\n{code}\n```"))
+        elif tag == "blockquote":
+            self._flush()
+            self._quote = max(0, self._quote - 1)
+        elif tag in ("ul", "ol"):
+            self._flush()
+            if self._lists:
+                self._lists.pop()
+        elif tag == "li":
+            self._flush()
+            self._item_prefix = None
+        elif tag in ("td", "th") and self._cell is not None and self._table is not None:
+            cell = _SPACE_RE.sub(" ", "".join(self._cell)).strip().replace("|", "\\|")
+            self._table[-1].append(cell)
+            self._cell = None
+        elif tag == "table" and self._table is not None:
+            rows = [row for row in self._table if row]
+            self._table = None
+            if rows:
+                self.blocks.append(("block", _render_table(rows)))
+        elif tag == "a" and self._links:
+            start, href = self._links.pop()
+            target = self._target()
+            text = "".join(target[start:]).strip()
+            del target[start:]
+            target.append(f"[{text}]({href})" if href and text else text)
+        elif tag in _EMPHASIS and not self._pre:
+            self._close_marker(_EMPHASIS[tag])
+        elif tag == "code" and not self._pre:
+            self._close_marker("`")
+        elif tag in _BLOCKS or tag == "caption":
+            self._flush()
+
+    def handle_data(self, data: str) -> None:
+        if self._in_title:
+            self.title = (self.title or "") + data.strip()
+            return
+        if self._skip:
+            return
+        self._target().append(data if self._pre else _SPACE_RE.sub(" ", data))
+
+    def close(self) -> None:
+        super().close()
+        self._flush()
+
+    # ------------------------------------------------------------------ #
+    # Private helpers
+    # ------------------------------------------------------------------ #
+    def _target(self) -> List[str]:
+        """Where inline text currently goes: the open table cell or the paragraph."""
+        return self._cell if self._cell is not None else self._inline
+
+    def _close_marker(self, marker: str) -> None:
+        """Close an emphasis/code span, dropping it if it wrapped nothing."""
+        target = self._target()
+        if target and target[-1] == marker:
+            target.pop()
+        else:
+            target.append(marker)
+
+    def _take_inline(self) -> str:
+        text = _SPACE_RE.sub(" ", "".join(self._inline)).strip()
+        self._inline = []
+        return text
+
+    def _flush(self) -> None:
+        """End the current paragraph or list item."""
+        if self._pre:
+            return
+        text = self._take_inline()
+        if not text:
+            return
+        if self._item_prefix is not None:
+            self.blocks.append(("item", self._item_prefix + text))
+            # Text after a nested list continues the item, indented.
+            self._item_prefix = " " * len(self._item_prefix)
+        elif self._quote:
+            self.blocks.append(("block", "> " * self._quote + text))
+        else:
+            self.blocks.append(("block", text))
+
+
+def _render_table(rows: List[List[str]]) -> str:
+    """Markdown table with the first row as header, padded to the widest row."""
+    columns = max(len(row) for row in rows)
+    rows = [row + [""] * (columns - len(row)) for row in rows]
+    widths = [max(3, *(len(row[i]) for row in rows)) for i in range(columns)]
+    lines = [
+        "| " + " | ".join(cell.ljust(width) for cell, width in zip(row, widths)) + " |"
+        for row in rows
+    ]
+    lines.insert(1, "| " + " | ".join("-" * width for width in widths) + " |")
+    return "\n".join(lines)
+
+
+def decode_html(data: bytes) -> str:
+    """Decode *data* using its BOM or ``<meta charset>``, else UTF-8."""
+    if data.startswith(b"\xef\xbb\xbf"):
+        return data[3:].decode("utf-8", errors="replace")
+    match = _CHARSET_RE.search(data[:2048])
+    encoding = match.group(1).decode("ascii") if match else "utf-8"
+    try:
+        return data.decode(encoding, errors="replace")
+    except LookupError:
+        return data.decode("utf-8", errors="replace")
+
+
+def parse_html(data: bytes, name: str = "page.html") -> Optional[HtmlPage]:
+    """
+    Convert a simple HTML page to an `HtmlPage`, or return None if the
+    markup needs Docling (see the module docstring).
+    """
+    parser = _MarkdownParser()
+    try:
+        parser.feed(decode_html(data))
+        parser.close()
+    except _NotSimple as exc:
+        logger.debug("%s needs Docling (%s)", name, exc)
+        return None
+
+    parts: List[str] = []
+    previous = None
+    for kind, text in parser.blocks:
+        if parts:
+            parts.append("\n" if kind == previous == "item" else "\n\n")
+        parts.append(text)
+        previous = kind
+    return HtmlPage(name, "".join(parts), title=parser.title)
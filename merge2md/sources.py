@@ -0,0 +1,195 @@
+"""
+Inputs that aren't plain files: zip-archive members and in-memory streams.
+
+An archive member is addressed as ``bundle.zip!/dir/doc.pdf`` and is handed
+to Docling as a `DocumentStream` read straight out of the archive, so
+bundles never need extracting to disk. Docling's backends need random
+access, so a member is held in memory while it converts; members larger
+than `MAX_STREAM_BYTES` are spilled to a temporary file instead.
+"""
+from __future__ import annotations
+
+import fnmatch
+import hashlib
+import logging
+import shutil
+import tempfile
+import zipfile
+from contextlib import contextmanager
+from io import BytesIO
+from pathlib import Path
+from typing import BinaryIO, Iterator, List, Optional, Tuple, Union
+
+from docling.datamodel.base_models import DocumentStream
+
+from .utils import file_digest
+
+logger = logging.getLogger(__name__)
+
+ARCHIVE_SEP: str = "!/"
+ARCHIVE_SUFFIXES: Tuple[str, ...] = (".zip",)
+# Largest input read into memory; bigger members go through a temp file.
+MAX_STREAM_BYTES: int = 256 * 1024 * 1024
+_CHUNK_SIZE: int = 1 << 20
+
+# What Docling's `convert` accepts.
+ConverterInput = Union[str, DocumentStream]
+
+
+def split_member(path: Path) -> Optional[Tuple[Path, str]]:
+    """``(archive, member)`` for ``bundle.zip!/doc.pdf``; None for plain paths."""
+    text = path.as_posix()
+    archive, sep, member = text.partition(ARCHIVE_SEP)
+    if not sep or not archive.lower().endswith(ARCHIVE_SUFFIXES):
+        return None
+    return Path(archive), member
+
+
+def member_path(archive: Path, member: str) -> Path:
+    """The ``bundle.zip!/member`` path addressing *member* of *archive*."""
+    return Path(f"{archive.as_posix()}{ARCHIVE_SEP}{member}")
+
+
+def is_archive(path: Path) -> bool:
+    return path.suffix.lower() in ARCHIVE_SUFFIXES
+
+
+def expand_archive(archive: Path, pattern: str = "*") -> List[Path]:
+    """
+    Member paths of *archive* whose names match *pattern*.
+
+    Directories, hidden files and macOS resource forks are skipped.
+    """
+    with zipfile.ZipFile(archive) as zf:
+        names = [
+            info.filename
+            for info in zf.infolist()
+            if not info.is_dir()
+            and not info.filename.startswith("__MACOSX/")
+            and not Path(info.filename).name.startswith(".")
+        ]
+    return [member_path(archive, name) for name in names if fnmatch.fnmatch(name, pattern)]
+
+
+def source_exists(path: Path) -> bool:
+    """Like `Path.exists`, but also understands archive members."""
+    parts = split_member(path)
+    if parts is None:
+        return path.exists()
+    archive, member = parts
+    if not archive.is_file():
+        return False
+    try:
+        with zipfile.ZipFile(archive) as zf:
+            zf.getinfo(member)
+    except (KeyError, zipfile.BadZipFile):
+        return False
+    return True
+
+
+def source_size(path: Path) -> int:
+    """Size in bytes of a file or (uncompressed) archive member."""
+    parts = split_member(path)
+    if parts is None:
+        return path.stat().st_size
+    archive, member = parts
+    with zipfile.ZipFile(archive) as zf:
+        return zf.getinfo(member).file_size
+
+
+def source_digest(path: Path) -> str:
+    """SHA-256 of a file's or archive member's bytes, read in chunks."""
+    parts = split_member(path)
+    if parts is None:
+        return file_digest(path)
+    archive, member = parts
+    digest = hashlib.sha256()
+    with zipfile.ZipFile(archive) as zf, zf.open(member) as fh:
+        for chunk in iter(lambda: fh.read(_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def stream_digest(stream: DocumentStream) -> str:
+    """SHA-256 of an in-memory stream's bytes."""
+    return hashlib.sha256(stream.stream.getbuffer()).hexdigest()
+
+
+def read_stream(
+    name: str, fileobj: BinaryIO, *, max_bytes: int = MAX_STREAM_BYTES
+) -> DocumentStream:
+    """
+    Read a file-like object (socket, HTTP response, …) into a `DocumentStream`.
+
+    Reads at most *max_bytes* and raises `ValueError` beyond that, so a
+    runaway stream can't exhaust memory. *name* must carry the file
+    extension; Docling uses it to pick the format.
+    """
+    buffer = BytesIO()
+    while True:
+        chunk = fileobj.read(min(_CHUNK_SIZE, max_bytes + 1 - buffer.tell()))
+        if not chunk:
+            break
+        buffer.write(chunk)
+        if buffer.tell() > max_bytes:
+            raise ValueError(f"Stream {name} exceeds {max_bytes} bytes")
+    buffer.seek(0)
+    return DocumentStream(name=name, stream=buffer)
+
+
+@contextmanager
+def open_binary(path: Path) -> Iterator[BinaryIO]:
+    """Open a file or archive member for streaming reads, without extracting it."""
+    parts = split_member(path)
+    if parts is None:
+        with path.open("rb") as fh:
+            yield fh
+        return
+    archive, member = parts
+    with zipfile.ZipFile(archive) as zf, zf.open(member) as fh:
+        yield fh
+
+
+@contextmanager
+def open_input(
+    path: Path, *, max_bytes: int = MAX_STREAM_BYTES, suffix: Optional[str] = None
+) -> Iterator[ConverterInput]:
+    """
+    Yield what to pass Docling for *path*: the path string for plain files,
+    a `DocumentStream` for archive members (a temp file if oversized).
+
+    With *suffix* (see `merge2md.detect.route_suffix`), the input is
+    presented under a name ending in it, so Docling picks that format: a
+    plain file through a temporary symlink (a copy where links aren't
+    allowed), a member through its stream or temp file name.
+    """
+    parts = split_member(path)
+    if parts is None:
+        if suffix is None:
+            yield str(path)
+            return
+        with tempfile.TemporaryDirectory(prefix="merge2md-") as tmp_dir:
+            link = Path(tmp_dir) / (path.name + suffix)
+            try:
+                link.symlink_to(path.resolve())
+            except OSError:
+                shutil.copyfile(path, link)
+            yield str(link)
+        return
+
+    archive, member = parts
+    with zipfile.ZipFile(archive) as zf:
+        info = zf.getinfo(member)
+        if info.file_size <= max_bytes:
+            with zf.open(info) as fh:
+                # The DocumentStream name keeps the full member path, so
+                # Docling's results map back to *path*.
+                yield read_stream(str(path) + (suffix or ""), fh, max_bytes=max_bytes)
+            return
+
+        logger.info("Spilling %s (%d bytes) to a temporary file", path, info.file_size)
+        with tempfile.TemporaryDirectory(prefix="merge2md-") as tmp_dir:
+            tmp_path = Path(tmp_dir) / (Path(member).name + (suffix or ""))
+            with zf.open(info) as src, tmp_path.open("wb") as dst:
+                shutil.copyfileobj(src, dst, _CHUNK_SIZE)
+            yield str(tmp_path)
@@ -0,0 +1,201 @@
+"""
+Stream CSV/TSV files straight to Markdown tables.
+
+Docling converts a CSV into a full document model before exporting it,
+which for multi-million-row exports costs minutes and gigabytes.
+`CsvTable` stands in for the converted document instead: nothing is read
+until `export_to_markdown` / `iter_markdown`, and then rows are formatted
+one at a time as they are parsed.
+
+The dialect is sniffed once from the first `SNIFF_CHARS` characters and
+column widths are taken from the first `sample_rows` rows only (later,
+wider cells just aren't padded), so memory stays bounded by the sample
+whatever the file size. A later row with more columns than that keeps its
+extra cells, and the table ends with a note saying so – Markdown renderers
+drop cells past the header's.
+"""
+from __future__ import annotations
+
+import csv
+import io
+import logging
+from contextlib import contextmanager
+from itertools import chain, islice
+from pathlib import Path
+from typing import Any, BinaryIO, Callable, ContextManager, Iterator, List, Optional, Type
+
+logger = logging.getLogger(__name__)
+
+TABLE_SUFFIXES = (".csv", ".tsv")
+# Characters of whole lines handed to `csv.Sniffer`.
+SNIFF_CHARS: int = 64 * 1024
+# Rows read ahead to size the columns.
+SAMPLE_ROWS: int = 1000
+# Widest a column is padded to; longer cells are kept whole, just unpadded.
+MAX_PAD_WIDTH: int = 40
+
+# Opens the raw bytes of a table, e.g. ``lambda: path.open("rb")``.
+Opener = Callable[[], ContextManager[BinaryIO]]
+
+
+def is_table(path: Path) -> bool:
+    return path.suffix.lower() in TABLE_SUFFIXES
+
+
+def sniff_dialect(sample: str, suffix: str = ".csv") -> Type[csv.Dialect]:
+    """
+    Guess the dialect of *sample* (whole lines from the start of a file).
+
+    ``.tsv`` files are always tab-separated; anything `csv.Sniffer` can't
+    make sense of is read as Excel-style CSV.
+    """
+    if suffix.lower() == ".tsv":
+        return csv.excel_tab
+    try:
+        return csv.Sniffer().sniff(sample, delimiters=",;\t|")
+    except csv.Error:
+        return csv.excel
+
+
+class CsvTable:
+    """
+    A CSV file rendered lazily as a Markdown table.
+
+    Quacks like the `DoclingDocument` it replaces as far as merge2md is
+    concerned (`export_to_markdown`), and can be exported any number of
+    times; each export re-reads the file.
+
+    Parameters
+    ----------
+    name
+        File name; its suffix picks TSV vs sniffed CSV.
+    opener
+        Returns a context manager yielding the file's bytes.
+    max_rows
+        Stop after this many data rows and add a truncation note.
+    align
+        Pad cells to the sampled column widths; off writes minimal rows.
+    sample_rows
+        Rows read ahead to compute column widths.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        opener: Opener,
+        *,
+        max_rows: Optional[int] = None,
+        align: bool = True,
+        sample_rows: int = SAMPLE_ROWS,
+    ) -> None:
+        self.name = name
+        self.max_rows = max_rows
+        self.align = align
+        self.sample_rows = sample_rows
+        self._opener = opener
+
+    @classmethod
+    def from_path(cls, path: Path, **kwargs: Any) -> "CsvTable":
+        return cls(path.name, lambda: path.open("rb"), **kwargs)
+
+    def export_to_markdown(self) -> str:
+        return "".join(self.iter_markdown()).rstrip("\n")
+
+    def iter_markdown(self) -> Iterator[str]:
+        """Yield the table one ``"| … |\\n"`` line at a time."""
+        with self._rows() as rows:
+            header = next(rows, None)
+            if header is None:  # guard clause
+                return
+            limit = self.max_rows
+            ahead = self.sample_rows if limit is None else min(limit, self.sample_rows)
+            sample = list(islice(rows, ahead))
+            columns = max([len(header), *(len(row) for row in sample)])
+            widths = self._widths(header, sample, columns) if self.align else [3] * columns
+
+            yield _format_row(header, widths, self.align)
+            yield "| " + " | ".join("-" * width for width in widths) + " |\n"
+            written = wide = 0
+            for row in chain(sample, rows):
+                if limit is not None and written >= limit:
+                    yield from self._wide_note(wide, columns)
+                    yield f"\n_Table truncated after {limit:,} rows._\n"
+                    logger.info("Truncated %s after %d rows", self.name, limit)
+                    return
+                wide += len(row) > columns
+                yield _format_row(row, widths, self.align)
+                written += 1
+            yield from self._wide_note(wide, columns)
+
+    def iter_records(self) -> Iterator[str]:
+        """Yield each data row as ``header = value`` pairs, for chunking."""
+        with self._rows() as rows:
+            header = next(rows, None)
+            if header is None:  # guard clause
+                return
+            for index, row in enumerate(rows):
+                if self.max_rows is not None and index >= self.max_rows:
+                    return
+                yield ", ".join(
+                    f"{key} = {value}" for key, value in zip(header, row) if value
+                )
+
+    # ------------------------------------------------------------------ #
+    # Private helpers
+    # ------------------------------------------------------------------ #
+    @contextmanager
+    def _rows(self) -> Iterator[Iterator[List[str]]]:
+        """Open the file and yield a row iterator over it."""
+        with self._opener() as raw:
+            # utf-8-sig drops the BOM spreadsheet exports like to add.
+            text = io.TextIOWrapper(raw, encoding="utf-8-sig", errors="replace", newline="")
+            try:
+                head: list[str] = []
+                size = 0
+                while size < SNIFF_CHARS:
+                    line = text.readline()
+                    if not line:
+                        break
+                    head.append(line)
+                    size += len(line)
+                dialect = sniff_dialect("".join(head), Path(self.name).suffix)
+                yield csv.reader(chain(head, text), dialect)
+            finally:
+                # Leave closing *raw* to its owner (streams are re-read later).
+                text.detach()
+
+    def _wide_note(self, wide: int, columns: int) -> Iterator[str]:
+        """A note about *wide* rows with cells past the table's *columns*, if any."""
+        if not wide:  # guard clause
+            return
+        logger.warning(
+            "%s: %d rows have more than %d columns; extra cells kept after the last column",
+            self.name, wide, columns,
+        )
+        rows = "1 row has" if wide == 1 else f"{wide:,} rows have"
+        yield f"\n_{rows} more than {columns} columns; the extra cells follow the last column._\n"
+
+    @staticmethod
+    def _widths(header: List[str], sample: List[List[str]], columns: int) -> List[int]:
+        widths = [3] * columns
+        for row in chain([header], sample):
+            for i, cell in enumerate(row[:columns]):
+                widths[i] = max(widths[i], min(len(_escape(cell)), MAX_PAD_WIDTH))
+        return widths
+
+
+def _escape(cell: str) -> str:
+    """Make *cell* safe inside a Markdown table row."""
+    return cell.replace("|", "\\|").replace("\r\n", " ").replace("\n", " ").replace("\r", " ")
+
+
+def _format_row(row: List[str], widths: List[int], align: bool) -> str:
+    """
+    One ``| a | b |`` line, padded to the sampled column count; cells past
+    it are kept, unpadded.
+    """
+    cells = [_escape(cell) for cell in row]
+    cells += [""] * (len(widths) - len(cells))
+    if align:
+        cells = [cell.ljust(width) for cell, width in zip(cells, widths)] + cells[len(widths):]
+    return "| " + " | ".join(cells) + " |\n"
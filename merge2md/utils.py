@@ -1,9 +1,20 @@
 """Utility helpers that don't deserve an external dependency."""
 from __future__ import annotations
 
+import hashlib
+import os
 import re
+import stat
+import tempfile
+import threading
+from contextlib import contextmanager
 from pathlib import Path
-from typing import Iterable, List
+from typing import BinaryIO, Iterable, Iterator, List, Optional
+
+# Umask where /proc can't report it: read once, by flipping it under a lock
+# (see `_umask`).
+_UMASK: Optional[int] = None
+_UMASK_LOCK = threading.Lock()
 
 
 def natural_sort(paths: Iterable[Path]) -> List[Path]:
@@ -16,4 +27,120 @@ def natural_sort(paths: Iterable[Path]) -> List[Path]:
         parts = re.split(r"(\d+)", p.name)
         return [int(part) if part.isdigit() else part.lower() for part in parts]
 
-    return sorted(paths, key=_key)
\ No newline at end of file
+    return sorted(paths, key=_key)
+
+
+def split_cores(workers: int, cores: int | None = None) -> int:
+    """
+    Return how many intra-op threads each of *workers* should get.
+
+    Splits *cores* (default: the cores this process may run on) evenly so
+    that `workers × threads` doesn't oversubscribe the machine; never below 1.
+    """
+    total = cores or _usable_cores()
+    return max(1, total // max(1, workers))
+
+
+def _usable_cores() -> int:
+    """Cores this process may run on: its CPU affinity (cgroups, taskset) where known."""
+    try:
+        return len(os.sched_getaffinity(0)) or 1
+    except AttributeError:  # not on macOS/Windows
+        return os.cpu_count() or 1
+
+
+def file_digest(path: Path, chunk_size: int = 1 << 20) -> str:
+    """Return the SHA-256 hex digest of *path*, read in *chunk_size* chunks."""
+    digest = hashlib.sha256()
+    with path.open("rb") as fh:
+        for chunk in iter(lambda: fh.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _umask() -> int:
+    """
+    The process umask. Linux reports it in /proc; elsewhere it's read once
+    with `os.umask`, which briefly swaps in a restrictive 0o077 for every
+    thread (files created meanwhile come out private, not world-writable).
+    """
+    global _UMASK
+    try:
+        with open("/proc/self/status", encoding="ascii") as fh:
+            for line in fh:
+                if line.startswith("Umask:"):
+                    return int(line.split()[1], 8)
+    except (OSError, ValueError):
+        pass
+    with _UMASK_LOCK:
+        if _UMASK is None:
+            _UMASK = os.umask(0o077)
+            os.umask(_UMASK)
+    return _UMASK
+
+
+@contextmanager
+def atomic_write(
+    path: Path, *, fsync: bool = False, buffering: int = 1 << 20
+) -> Iterator[BinaryIO]:
+    """
+    Open a temp file next to *path* for binary writing; rename it over
+    *path* only if the block succeeds.
+
+    Readers see either the old file or the complete new one, never a
+    truncated one. With *fsync*, data and the rename are flushed to disk
+    before returning, so the file also survives a power loss. A symlinked
+    *path* has its target replaced, and an existing file keeps its mode.
+    """
+    path = Path(os.path.realpath(path))
+    try:
+        mode = stat.S_IMODE(os.stat(path).st_mode)
+    except FileNotFoundError:
+        # `mkstemp` creates files 0600; new outputs get what ``open`` would.
+        mode = 0o666 & ~_umask()
+    fd, tmp_name = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb", buffering=buffering) as fh:
+            yield fh
+            fh.flush()
+            if fsync:
+                os.fsync(fh.fileno())
+        os.chmod(tmp_name, mode)
+        os.replace(tmp_name, path)
+    except BaseException:
+        Path(tmp_name).unlink(missing_ok=True)
+        raise
+    if fsync and hasattr(os, "O_DIRECTORY"):
+        # Persist the rename itself (POSIX only).
+        dir_fd = os.open(path.parent, os.O_RDONLY | os.O_DIRECTORY)
+        try:
+            os.fsync(dir_fd)
+        finally:
+            os.close(dir_fd)
+
+
+def simhash(text: str, *, shingle: int = 3) -> int:
+    """
+    Return a 64-bit SimHash of *text* over word *shingle*-grams.
+
+    Near-identical texts get hashes a few bits apart; compare them with
+    `hamming`.
+    """
+    words = text.lower().split()
+    grams = [
+        " ".join(words[i:i + shingle])
+        for i in range(max(1, len(words) - shingle + 1))
+    ]
+    weights = [0] * 64
+    for gram in grams:
+        value = int.from_bytes(
+            hashlib.blake2b(gram.encode("utf-8"), digest_size=8).digest(), "big"
+        )
+        for bit in range(64):
+            weights[bit] += 1 if value >> bit & 1 else -1
+    return sum(1 << bit for bit, weight in enumerate(weights) if weight > 0)
+
+
+def hamming(a: int, b: int) -> int:
+    """Number of differing bits between *a* and *b*."""
+    return bin(a ^ b).count("1")
@@ -0,0 +1,206 @@
+"""
+Watch a folder and keep a merged document up to date as files land.
+
+`FolderWatcher` keeps one warm `DoclingMarkdownConverter` and the
+Markdown of every file it has converted, so each change costs one
+conversion plus a cheap re-merge. File-system events (inotify/FSEvents
+via **watchdog**, *if available*) only wake the loop; a directory scan
+decides what changed, so the same code works on network shares where
+events are unreliable and falls back to plain polling without watchdog.
+
+A file is converted once its size and mtime have stopped changing for
+``settle`` seconds, which skips half-copied scanner output.
+"""
+from __future__ import annotations
+
+import logging
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+from .converter import ConversionSettings, DoclingMarkdownConverter
+from .merger import MarkdownMerger
+from .utils import natural_sort
+
+logger = logging.getLogger(__name__)
+
+try:
+    from watchdog.events import FileSystemEventHandler
+    from watchdog.observers import Observer
+
+    _HAS_WATCHDOG = True
+except ImportError:  # pragma: no cover
+    _HAS_WATCHDOG = False
+
+# Inputs picked up by the watcher (what Docling's allowed formats accept).
+WATCH_SUFFIXES: Tuple[str, ...] = (
+    ".pdf", ".docx", ".pptx", ".html", ".htm", ".csv", ".md", ".adoc", ".asciidoc",
+    ".png", ".jpg", ".jpeg", ".tif", ".tiff", ".bmp", ".webp",
+)
+# Names scanners and copy tools use while a file is still being written.
+_PARTIAL_SUFFIXES: Tuple[str, ...] = (".part", ".partial", ".tmp", ".crdownload", ".download")
+
+# (size, mtime_ns) – a file is stable once this stops changing.
+_Signature = Tuple[int, int]
+
+
+class FolderWatcher:
+    """
+    Incrementally convert *directory* into *output*.
+
+    Example
+    -------
+    >>> watcher = FolderWatcher(Path("~/Scans").expanduser(), Path("scans.md"))
+    >>> watcher.run()  # blocks; Ctrl-C to stop
+    """
+
+    def __init__(
+        self,
+        directory: Path,
+        output: Path,
+        *,
+        settings: Optional[ConversionSettings] = None,
+        title: Optional[str] = None,
+        toc: bool = False,
+        dedupe_sections: bool = False,
+        settle: float = 1.0,
+        interval: float = 0.5,
+    ) -> None:
+        self.directory = directory
+        self.output = output
+        self.title = title
+        self.toc = toc
+        self.settle = settle
+        self.interval = interval
+        self.converter = DoclingMarkdownConverter(settings=settings)
+        self.merger = MarkdownMerger(dedupe_sections=dedupe_sections)
+        self.merger.check_formats([output])
+
+        self._blocks: Dict[Path, Tuple[_Signature, str]] = {}
+        # Files seen changing: last signature and when it was first observed.
+        self._pending: Dict[Path, Tuple[_Signature, float]] = {}
+        self._wake = threading.Event()
+
+    # ------------------------------------------------------------------ #
+    # Public helpers
+    # ------------------------------------------------------------------ #
+    def poll(self, now: Optional[float] = None) -> bool:
+        """
+        Scan once, convert files that have settled, and re-export if needed.
+
+        Returns
+        -------
+        bool
+            True if *output* was rewritten.
+        """
+        now = time.monotonic() if now is None else now
+        current = self._scan()
+
+        removed = [path for path in self._blocks if path not in current]
+        for path in removed:
+            logger.info("Removed %s", path.name)
+            del self._blocks[path]
+        for path in [p for p in self._pending if p not in current]:
+            del self._pending[path]
+
+        ready: list[Path] = []
+        for path, signature in current.items():
+            known = self._blocks.get(path)
+            if known and known[0] == signature:
+                continue
+            seen = self._pending.get(path)
+            if seen is None and time.time() - signature[1] / 1e9 >= self.settle:
+                # Untouched since before we looked (e.g. at startup): no need to wait.
+                self._pending[path] = (signature, now)
+                ready.append(path)
+            elif seen is None or seen[0] != signature:
+                # New or still growing: restart its settle timer.
+                self._pending[path] = (signature, now)
+            elif now - seen[1] >= self.settle:
+                ready.append(path)
+
+        converted = dict(self.converter.to_markdown_with_sources(ready))
+        for path in ready:
+            signature = self._pending.pop(path)[0]
+            if path in converted:
+                logger.info("Converted %s", path.name)
+            # Failed conversions stay out of the merge (dropping any older
+            # Markdown) until the file changes again.
+            self._blocks[path] = (signature, converted.get(path, ""))
+
+        if not ready and not removed:
+            return False
+        self._export()
+        return True
+
+    def run(self, stop: Optional[threading.Event] = None) -> None:
+        """Poll until *stop* is set (or forever); sleeps between scans unless woken by an event."""
+        stop = stop or threading.Event()
+        observer = self._start_observer()
+        logger.info(
+            "Watching %s → %s (%s)",
+            self.directory, self.output, "events" if observer else "polling",
+        )
+        try:
+            while not stop.is_set():
+                self.poll()
+                # With pending files, re-check soon enough to hit the settle deadline.
+                timeout = min(self.interval, self.settle) if self._pending else self.interval
+                self._wake.wait(timeout)
+                self._wake.clear()
+        finally:
+            if observer is not None:
+                observer.stop()
+                observer.join()
+
+    # ------------------------------------------------------------------ #
+    # Private helpers
+    # ------------------------------------------------------------------ #
+    def _scan(self) -> Dict[Path, _Signature]:
+        """Signatures of every watchable file directly in the directory."""
+        found: Dict[Path, _Signature] = {}
+        output = self.output.resolve()
+        with os.scandir(self.directory) as entries:
+            for entry in entries:
+                name = entry.name
+                if name.startswith((".", "~$")) or name.lower().endswith(_PARTIAL_SUFFIXES):
+                    continue
+                if not name.lower().endswith(WATCH_SUFFIXES) or not entry.is_file():
+                    continue
+                path = Path(entry.path)
+                if path.resolve() == output:
+                    continue
+                stat = entry.stat()
+                found[path] = (stat.st_size, stat.st_mtime_ns)
+        return found
+
+    def _export(self) -> None:
+        sources = [path for path in natural_sort(list(self._blocks)) if self._blocks[path][1]]
+        merged_md = self.merger.merge(
+            [self._blocks[path][1] for path in sources],
+            header=self.title,
+            sources=sources,
+            toc=self.toc,
+        )
+        self.merger.export(merged_md, self.output)
+        if self.toc and self.output.suffix.lower() == ".md":
+            self.merger.write_index(merged_md, self.output, sources)
+        logger.info("Updated %s (%d files)", self.output, len(sources))
+
+    def _start_observer(self) -> Optional["Observer"]:
+        """Start a watchdog observer that wakes the poll loop, or None to poll."""
+        if not _HAS_WATCHDOG:
+            return None
+        wake = self._wake
+
+        class _Handler(FileSystemEventHandler):
+            def on_any_event(self, event: object) -> None:
+                wake.set()
+
+        observer = Observer()
+        observer.schedule(_Handler(), str(self.directory), recursive=False)
+        observer.start()
+        return observer
+
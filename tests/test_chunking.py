@@ -0,0 +1,104 @@
+"""Unit tests for the chunking module."""
+import json
+import pytest
+from pathlib import Path
+from types import SimpleNamespace
+from unittest.mock import patch
+
+from merge2md.chunking import ChunkWriter, chunk_document
+from merge2md.simple_html import HtmlPage
+from merge2md.tables import CsvTable
+
+
+def _piece(text, headings=None, pages=()):
+    """Build an object shaped like a Docling chunk."""
+    items = [SimpleNamespace(prov=[SimpleNamespace(page_no=p) for p in pages])]
+    return SimpleNamespace(text=text, meta=SimpleNamespace(headings=headings, doc_items=items))
+
+
+@pytest.fixture
+def pieces():
+    """Patch Docling's HierarchicalChunker to return the given pieces."""
+    def _install(items):
+        patcher = patch("merge2md.chunking.HierarchicalChunker")
+        chunker = patcher.start()
+        chunker.return_value.chunk.return_value = iter(items)
+        return patcher
+    patchers = []
+    yield lambda items: patchers.append(_install(items))
+    for patcher in patchers:
+        patcher.stop()
+
+
+class TestChunkDocument:
+    """Test packing and splitting of document pieces."""
+
+    def test_packs_same_heading_pieces(self, pieces):
+        """Test neighbours under one heading share a chunk with a page range."""
+        pieces([
+            _piece("one two", ["Intro"], [1]),
+            _piece("three four", ["Intro"], [2]),
+            _piece("five", ["Intro", "Details"], [2]),
+        ])
+        chunks = list(chunk_document(object(), Path("a.pdf"), max_tokens=10))
+
+        assert [c.text for c in chunks] == ["one two\n\nthree four", "five"]
+        assert chunks[0].headings == ["Intro"]
+        assert (chunks[0].page_start, chunks[0].page_end) == (1, 2)
+        assert chunks[1].headings == ["Intro", "Details"]
+        assert [c.index for c in chunks] == [0, 1]
+        assert chunks[0].source == "a.pdf"
+        assert chunks[0].tokens == 4
+
+    def test_respects_token_bound(self, pieces):
+        """Test no chunk exceeds max_tokens and long pieces are split."""
+        long_text = " ".join(f"w{i}" for i in range(25))
+        pieces([_piece("a b c", ["H"]), _piece(long_text, ["H"])])
+        chunks = list(chunk_document(object(), Path("a.md"), max_tokens=10))
+
+        assert all(c.tokens <= 10 for c in chunks)
+        assert " ".join(c.text.replace("\n\n", " ") for c in chunks) == "a b c " + long_text
+        # Non-paged formats have no page range
+        assert chunks[0].page_start is None
+
+    def test_custom_token_counter(self, pieces):
+        """Test a tokenizer's counting function bounds the chunks."""
+        pieces([_piece("abcdef"), _piece("ghijkl")])
+        chunks = list(chunk_document(object(), Path("a.md"), max_tokens=8, count_tokens=len))
+        assert [c.text for c in chunks] == ["abcdef", "ghijkl"]
+
+    def test_csv_table_rows(self, tmp_path):
+        """Test streamed CSV tables are chunked as header = value rows."""
+        path = tmp_path / "t.csv"
+        path.write_text("name,age\nAnn,30\nBob,\n")
+        chunks = list(chunk_document(CsvTable.from_path(path), path, max_tokens=6))
+        assert [c.text for c in chunks] == ["name = Ann, age = 30", "name = Bob"]
+
+    def test_html_page_paragraphs(self):
+        """Test fast-path HTML pages are chunked by paragraph with heading paths."""
+        page = HtmlPage("p.html", "# Guide\n\nIntro text.\n\n## Setup\n\nRun it.")
+        chunks = list(chunk_document(page, Path("p.html"), max_tokens=2))
+        assert [(c.text, c.headings) for c in chunks] == [
+            ("Intro text.", ["Guide"]),
+            ("Run it.", ["Guide", "Setup"]),
+        ]
+
+
+class TestChunkWriter:
+    """Test streaming JSONL output."""
+
+    def test_writes_one_line_per_chunk(self, pieces, tmp_path):
+        """Test each chunk becomes one JSON line, flushed per document."""
+        pieces([_piece("hello", ["Intro"], [3])])
+        out_path = tmp_path / "chunks.jsonl"
+
+        with ChunkWriter(out_path) as writer:
+            assert writer.write(Path("a.pdf"), object()) == 1
+            # Already visible to readers before the writer closes
+            record = json.loads(out_path.read_text().splitlines()[0])
+
+        assert record == {
+            "source": "a.pdf", "index": 0, "text": "hello", "headings": ["Intro"],
+            "page_start": 3, "page_end": 3, "tokens": 1,
+        }
+        assert writer.chunks_written == 1
@@ -1,12 +1,22 @@
 """Unit tests for the converter module."""
+import gc
+import os
+import sys
 import pytest
 from pathlib import Path
 from unittest.mock import Mock, patch, MagicMock
 
-from merge2md.converter import ConversionSettings, DoclingMarkdownConverter
-from docling.datamodel.pipeline_options import PdfPipelineOptions, EasyOcrOptions
+from merge2md.converter import ConversionSettings, DoclingMarkdownConverter, PROFILES
+from docling.datamodel.pipeline_options import (
+    AcceleratorDevice,
+    PdfPipelineOptions,
+    EasyOcrOptions,
+    RapidOcrOptions,
+    TableFormerMode,
+    TesseractCliOcrOptions,
+)
 from docling.datamodel.base_models import InputFormat
-from docling.document_converter import PdfFormatOption, WordFormatOption
+from docling.document_converter import ImageFormatOption, PdfFormatOption, WordFormatOption
 from docling.pipeline.simple_pipeline import SimplePipeline
 from docling.pipeline.standard_pdf_pipeline import StandardPdfPipeline
 
@@ -20,6 +30,8 @@ class TestConversionSettings:
         assert settings.ocr is True
         assert settings.languages == ["en"]
         assert settings.dpi == 300
+        assert settings.ocr_engine == "easyocr"
+        assert settings.table_mode == "accurate"
         # Test default allowed formats
         assert InputFormat.PDF in settings.allowed_formats
         assert InputFormat.IMAGE in settings.allowed_formats
@@ -63,6 +75,259 @@ class TestConversionSettings:
         assert isinstance(pipeline_options, PdfPipelineOptions)
         assert pipeline_options.do_ocr is False
 
+    def test_ocr_engine_tesseract(self):
+        """Test Tesseract engine selection maps language codes."""
+        settings = ConversionSettings(ocr_engine="tesseract", languages=["en", "de", "xx"])
+        pipeline_options = settings.to_pipeline_options()
+
+        assert isinstance(pipeline_options.ocr_options, TesseractCliOcrOptions)
+        assert pipeline_options.ocr_options.lang == ["eng", "deu", "xx"]
+
+    def test_ocr_engine_rapidocr(self):
+        """Test RapidOCR engine selection."""
+        pipeline_options = ConversionSettings(ocr_engine="rapidocr").to_pipeline_options()
+        assert isinstance(pipeline_options.ocr_options, RapidOcrOptions)
+
+    def test_ocr_engine_unknown(self):
+        """Test an unknown OCR engine raises ValueError."""
+        with pytest.raises(ValueError, match="Unsupported OCR engine: nope"):
+            ConversionSettings(ocr_engine="nope").to_pipeline_options()
+
+    def test_table_mode_and_scale(self):
+        """Test table mode and image scale reach the pipeline options."""
+        settings = ConversionSettings(table_mode="fast", images_scale=2.0)
+        pipeline_options = settings.to_pipeline_options()
+
+        assert pipeline_options.table_structure_options.mode == TableFormerMode.FAST
+        assert pipeline_options.images_scale == 2.0
+
+    def test_from_profile(self):
+        """Test named profiles set engine, table mode and scale."""
+        for name, values in PROFILES.items():
+            settings = ConversionSettings.from_profile(name)
+            assert settings.ocr_engine == values["ocr_engine"]
+            assert settings.table_mode == values["table_mode"]
+            assert settings.images_scale == values["images_scale"]
+
+        fast = ConversionSettings.from_profile("fast")
+        assert fast.ocr_engine == "tesseract"
+        assert fast.table_mode == "fast"
+
+    def test_from_profile_overrides(self):
+        """Test explicit overrides beat the profile's values."""
+        settings = ConversionSettings.from_profile("fast", ocr_engine="easyocr", languages=["fr"])
+        assert settings.ocr_engine == "easyocr"
+        assert settings.table_mode == "fast"
+        assert settings.languages == ["fr"]
+
+    def test_from_profile_unknown(self):
+        """Test an unknown profile raises ValueError."""
+        with pytest.raises(ValueError, match="Unknown profile: turbo"):
+            ConversionSettings.from_profile("turbo")
+
+    def test_table_and_picture_switches(self):
+        """Test table/picture switches reach the pipeline options."""
+        default = ConversionSettings().to_pipeline_options()
+        assert default.do_table_structure is True
+        assert default.do_picture_classification is False
+        assert default.generate_picture_images is False
+
+        pipeline_options = ConversionSettings(
+            table_structure=False,
+            picture_classification=True,
+            picture_images=True,
+        ).to_pipeline_options()
+        assert pipeline_options.do_table_structure is False
+        assert pipeline_options.do_picture_classification is True
+        assert pipeline_options.generate_picture_images is True
+
+    def test_for_pattern(self):
+        """Test per-pattern overrides produce a derived settings copy."""
+        settings = ConversionSettings(
+            table_structure=False,
+            overrides={"*financial*.pdf": {"table_structure": True, "table_mode": "accurate"}},
+        )
+        derived = settings.for_pattern("*financial*.pdf")
+
+        assert derived.table_structure is True
+        assert derived.table_mode == "accurate"
+        assert derived.overrides == {}
+        # The original is untouched
+        assert settings.table_structure is False
+
+    def test_for_pattern_invalid_field(self):
+        """Test overrides naming unknown fields raise ValueError."""
+        settings = ConversionSettings(overrides={"*.pdf": {"no_such_field": 1}})
+        with pytest.raises(ValueError, match="Invalid override"):
+            settings.for_pattern("*.pdf")
+
+    def test_model_threads(self, monkeypatch):
+        """Test model threads default to an even core split across workers."""
+        monkeypatch.setattr("merge2md.utils.os.sched_getaffinity", lambda pid: set(range(16)),
+                            raising=False)
+        assert ConversionSettings().model_threads == 16
+        assert ConversionSettings(workers=4).model_threads == 4
+        assert ConversionSettings(workers=2, batch_concurrency=2).model_threads == 4
+        assert ConversionSettings(workers=4, num_threads=3).model_threads == 3
+
+    def test_accelerator_options(self):
+        """Test thread count and device reach the pipeline options."""
+        pipeline_options = ConversionSettings(num_threads=2, device="cpu").to_pipeline_options()
+        assert pipeline_options.accelerator_options.num_threads == 2
+        assert pipeline_options.accelerator_options.device == AcceleratorDevice.CPU
+
+    @pytest.fixture
+    def thread_env(self, monkeypatch):
+        """A loaded torch stand-in and no thread env vars set."""
+        for var in ("OMP_NUM_THREADS", "MKL_NUM_THREADS", "OPENBLAS_NUM_THREADS",
+                    "DOCLING_NUM_THREADS"):
+            monkeypatch.delenv(var, raising=False)
+        torch = Mock()
+        monkeypatch.setitem(sys.modules, "torch", torch)
+        return torch
+
+    def test_apply_thread_settings(self, thread_env):
+        """Test OpenMP env vars and an already-loaded torch are capped."""
+        ConversionSettings(num_threads=3).apply_thread_settings()
+
+        assert os.environ["OMP_NUM_THREADS"] == "3"
+        assert os.environ["MKL_NUM_THREADS"] == "3"
+        thread_env.set_num_threads.assert_called_once_with(3)
+
+    def test_apply_thread_settings_splits_for_workers(self, thread_env, monkeypatch):
+        """Test parallel workers get an even share of the cores."""
+        monkeypatch.setattr("merge2md.utils.os.sched_getaffinity", lambda pid: set(range(8)),
+                            raising=False)
+
+        ConversionSettings(workers=4).apply_thread_settings()
+
+        assert os.environ["OMP_NUM_THREADS"] == "2"
+        thread_env.set_num_threads.assert_called_once_with(2)
+
+    def test_apply_thread_settings_single_worker_untouched(self, thread_env):
+        """Test the defaults (one worker, no num_threads) change nothing."""
+        ConversionSettings().apply_thread_settings()
+
+        assert "OMP_NUM_THREADS" not in os.environ
+        thread_env.set_num_threads.assert_not_called()
+
+    @pytest.mark.parametrize("var", ["DOCLING_NUM_THREADS", "OMP_NUM_THREADS"])
+    def test_accelerator_threads_left_to_docling(self, thread_env, monkeypatch, var):
+        """Test a single worker, or a user's thread env var, leaves Docling's thread count alone."""
+        monkeypatch.setattr("merge2md.utils.os.sched_getaffinity", lambda pid: set(range(16)),
+                            raising=False)
+        with patch("merge2md.converter.AcceleratorOptions") as options:
+            ConversionSettings().to_pipeline_options()
+            assert "num_threads" not in options.call_args.kwargs
+
+            monkeypatch.setenv(var, "2")
+            ConversionSettings(workers=4).to_pipeline_options()
+            assert "num_threads" not in options.call_args.kwargs
+
+            monkeypatch.delenv(var)
+            ConversionSettings(workers=4).to_pipeline_options()
+            assert options.call_args.kwargs["num_threads"] == 4
+            monkeypatch.setenv(var, "2")
+            ConversionSettings(num_threads=3).to_pipeline_options()
+            assert options.call_args.kwargs["num_threads"] == 3
+
+    def test_apply_thread_settings_keeps_user_env(self, thread_env, monkeypatch):
+        """Test thread env vars the user set win over the core split."""
+        monkeypatch.setenv("OMP_NUM_THREADS", "6")
+
+        ConversionSettings(workers=4).apply_thread_settings()
+
+        assert os.environ["OMP_NUM_THREADS"] == "6"
+        thread_env.set_num_threads.assert_not_called()
+
+    def test_artifacts_path(self, tmp_path):
+        """Test a local model directory disables downloads."""
+        settings = ConversionSettings(artifacts_path=tmp_path)
+        pipeline_options = settings.to_pipeline_options()
+
+        assert pipeline_options.artifacts_path == str(tmp_path)
+        assert pipeline_options.ocr_options.model_storage_directory == str(tmp_path / "EasyOcr")
+        assert pipeline_options.ocr_options.download_enabled is False
+
+    def test_apply_offline_settings(self, tmp_path, monkeypatch):
+        """Test Hugging Face is put in offline mode only with artifacts_path."""
+        monkeypatch.delenv("HF_HUB_OFFLINE", raising=False)
+        monkeypatch.delenv("TRANSFORMERS_OFFLINE", raising=False)
+        ConversionSettings().apply_offline_settings()
+        assert "HF_HUB_OFFLINE" not in os.environ
+
+        ConversionSettings(artifacts_path=tmp_path).apply_offline_settings()
+        assert os.environ["HF_HUB_OFFLINE"] == "1"
+        assert os.environ["TRANSFORMERS_OFFLINE"] == "1"
+
+    def test_apply_offline_settings_after_import(self, tmp_path, monkeypatch):
+        """Test already-imported Hugging Face modules go offline too, not just os.environ."""
+        import types
+
+        monkeypatch.setenv("HF_HUB_OFFLINE", "0")
+        monkeypatch.setenv("TRANSFORMERS_OFFLINE", "0")
+        constants = sys.modules.get("huggingface_hub.constants") or types.ModuleType("constants")
+        hub = sys.modules.get("transformers.utils.hub") or types.ModuleType("hub")
+        monkeypatch.setitem(sys.modules, "huggingface_hub.constants", constants)
+        monkeypatch.setitem(sys.modules, "transformers.utils.hub", hub)
+        # As read at import, before the converter was built.
+        monkeypatch.setattr(constants, "HF_HUB_OFFLINE", False, raising=False)
+        monkeypatch.setattr(hub, "_is_offline_mode", False, raising=False)
+
+        ConversionSettings(artifacts_path=tmp_path).apply_offline_settings()
+
+        assert constants.HF_HUB_OFFLINE is True
+        assert hub._is_offline_mode is True
+
+    def test_cache_key(self):
+        """Test the cache key changes only with conversion-relevant fields."""
+        base = ConversionSettings()
+        assert base.cache_key() == ConversionSettings(workers=8, dedupe=False).cache_key()
+        assert base.cache_key() != ConversionSettings(ocr_engine="tesseract").cache_key()
+        assert base.cache_key() != ConversionSettings(table_structure=False).cache_key()
+
+    def test_batch_settings_defaults(self):
+        """Test batching defaults keep one file per pipeline run."""
+        settings = ConversionSettings()
+        assert settings.page_batch_size == 4
+        assert settings.doc_batch_size == 1
+        assert settings.batch_concurrency == 1
+
+    def test_batch_settings(self):
+        """Test batching knobs reach Docling's settings only inside the block."""
+        from docling.datamodel.settings import settings as docling_settings
+
+        before = docling_settings.perf.page_batch_size
+        with ConversionSettings(
+            page_batch_size=16, doc_batch_size=8, batch_concurrency=0
+        ).batch_settings():
+            assert docling_settings.perf.page_batch_size == 16
+            assert docling_settings.perf.doc_batch_size == 8
+            # Non-positive values are clamped to one.
+            assert docling_settings.perf.doc_batch_concurrency == 1
+
+        assert docling_settings.perf.page_batch_size == before
+
+    def test_batch_settings_wait_for_other_values(self):
+        """Test differing batch settings take turns; equal ones share."""
+        import threading
+        from docling.datamodel.settings import settings as docling_settings
+
+        big = ConversionSettings(page_batch_size=16)
+        seen = []
+        with big.batch_settings():
+            other = threading.Thread(target=lambda: seen.append(
+                ConversionSettings().batch_settings().__enter__() or
+                docling_settings.perf.page_batch_size
+            ))
+            other.start()
+            with big.batch_settings():  # same values: no wait
+                assert docling_settings.perf.page_batch_size == 16
+            other.join(timeout=0.2)
+            assert other.is_alive() and seen == []
+        other.join(timeout=5)
+        assert seen == [4]
+
 
 class TestDoclingMarkdownConverter:
     """Test the DoclingMarkdownConverter class."""
@@ -124,9 +389,46 @@ class TestDoclingMarkdownConverter:
         # Check DOCX format option
         assert InputFormat.DOCX in format_options
         assert isinstance(format_options[InputFormat.DOCX], WordFormatOption)
+        
+        # Images share the PDF pipeline options (OCR engine, scale)
+        assert InputFormat.IMAGE in format_options
+        assert isinstance(format_options[InputFormat.IMAGE], ImageFormatOption)
+        assert (
+            format_options[InputFormat.IMAGE].pipeline_options
+            is format_options[InputFormat.PDF].pipeline_options
+        )
     
-    def test_to_markdown_with_different_formats(self, converter, test_data_dir):
+    def test_override_converter_selection(self, test_data_dir):
+        """Test files matching an override pattern use their own converter."""
+        settings = ConversionSettings(
+            table_structure=False,
+            overrides={"*.HTML": {"table_structure": True}},
+        )
+        build = DoclingMarkdownConverter._build_converter
+        with patch.object(DoclingMarkdownConverter, "_build_converter", side_effect=build) as spy:
+            converter = DoclingMarkdownConverter(settings)
+        override = converter._override_converters["*.HTML"]
+
+        # Docling's option attributes vary by release; check what it was built from.
+        built_with = [c.args[0] for c in spy.call_args_list]
+        assert [s.table_structure for s in built_with] == [False, True]
+        assert built_with[1].to_pipeline_options().do_table_structure is True
+        assert converter._converter_for(test_data_dir / "test.html") is override
+        assert converter._converter_for(test_data_dir / "test1.md") is converter._converter
+
+        with patch.object(converter._converter, 'convert') as mock_default, \
+                patch.object(override, 'convert') as mock_override:
+            mock_default.return_value.document.export_to_markdown.return_value = "# MD"
+            mock_override.return_value.document.export_to_markdown.return_value = "# HTML"
+            blocks = converter.to_markdown([test_data_dir / "test1.md", test_data_dir / "test.html"])
+
+        assert blocks == ["# MD", "# HTML"]
+        mock_override.assert_called_once_with(str(test_data_dir / "test.html"))
+
+    def test_to_markdown_with_different_formats(self, test_data_dir):
         """Test converting different file formats to markdown."""
+        # CSV and HTML go through Docling too, not the lightweight paths
+        converter = DoclingMarkdownConverter(ConversionSettings(stream_csv=False, fast_html=False))
         # Test with various file formats
         test_files = [
             test_data_dir / "test1.md",
@@ -309,3 +611,536 @@ class TestDoclingMarkdownConverter:
         
         # The number of results depends on how Docling handles non-allowed formats
         # It might skip them or raise exceptions that we catch
+
+    def test_to_markdown_batched(self, test_data_dir, caplog):
+        """Test batched conversion keeps input order and skips failures."""
+        from docling.datamodel.base_models import ConversionStatus
+
+        converter = DoclingMarkdownConverter(
+            ConversionSettings(doc_batch_size=4, stream_csv=False, fast_html=False)
+        )
+        test_files = [
+            test_data_dir / "test1.md",
+            test_data_dir / "test.html",
+            test_data_dir / "test.csv",
+        ]
+
+        def _result(path, status, text):
+            result = Mock()
+            result.input.file = path
+            result.status = status
+            result.document.export_to_markdown.return_value = text
+            return result
+
+        # Docling may yield results out of order; they're matched by path.
+        results = [
+            _result(test_files[2], ConversionStatus.SUCCESS, "# CSV"),
+            _result(test_files[0], ConversionStatus.SUCCESS, "# MD"),
+            _result(test_files[1], ConversionStatus.FAILURE, ""),
+        ]
+        with patch.object(converter._converter, 'convert_all', return_value=iter(results)) as mock_all:
+            with patch.object(converter._converter, 'convert') as mock_convert:
+                blocks = converter.to_markdown(test_files)
+
+        mock_convert.assert_not_called()
+        # Inputs are opened lazily, as Docling pulls them
+        assert list(mock_all.call_args[0][0]) == [str(p) for p in test_files]
+        assert mock_all.call_args[1]["raises_on_error"] is False
+        assert blocks == ["# MD", "# CSV"]
+        assert "Docling failed on" in caplog.text
+        assert "test.html" in caplog.text
+
+    def test_second_converter_keeps_batch_settings(self, test_data_dir):
+        """Test building another converter doesn't reset an existing one's batching."""
+        from docling.datamodel.base_models import ConversionStatus
+        from docling.datamodel.settings import settings as docling_settings
+
+        converter = DoclingMarkdownConverter(ConversionSettings(
+            page_batch_size=16, doc_batch_size=8, stream_csv=False, fast_html=False,
+        ))
+        DoclingMarkdownConverter(ConversionSettings())
+        seen = []
+
+        def _convert_all(sources, **kwargs):
+            for source in sources:
+                seen.append((docling_settings.perf.page_batch_size, docling_settings.perf.doc_batch_size))
+                result = Mock()
+                result.input.file = Path(source)
+                result.status = ConversionStatus.SUCCESS
+                result.document.export_to_markdown.return_value = "# Doc"
+                yield result
+
+        with patch.object(converter._converter, 'convert_all', side_effect=_convert_all):
+            converter.to_markdown([test_data_dir / "test1.md", test_data_dir / "test.html"])
+
+        assert seen == [(16, 8), (16, 8)]
+
+    def test_to_markdown_parallel_workers(self, test_data_dir):
+        """Test parallel workers keep input order and drop failures."""
+        converter = DoclingMarkdownConverter(
+            ConversionSettings(workers=3, stream_csv=False, fast_html=False)
+        )
+        test_files = [
+            test_data_dir / "test1.md",
+            test_data_dir / "test2.txt",
+            test_data_dir / "test.html",
+            test_data_dir / "test.csv",
+        ]
+
+        def _convert(source):
+            # Plain text reaches Docling's Markdown backend as "test2.txt.md".
+            if Path(source).name.startswith("test2.txt"):
+                raise Exception("boom")
+            result = Mock()
+            result.document.export_to_markdown.return_value = f"# {Path(source).name}"
+            return result
+
+        with patch.object(converter._converter, 'convert', side_effect=_convert):
+            blocks = converter.to_markdown(test_files)
+
+        assert blocks == ["# test1.md", "# test.html", "# test.csv"]
+
+    def test_to_markdown_dedupes_identical_files(self, converter, tmp_path, caplog):
+        """Test byte-identical inputs are converted once and reused."""
+        a = tmp_path / "a.md"
+        b = tmp_path / "copy_of_a.md"
+        c = tmp_path / "c.md"
+        a.write_text("# Same")
+        b.write_text("# Same")
+        c.write_text("# Different")
+
+        def _convert(source):
+            result = Mock()
+            result.document.export_to_markdown.return_value = f"# {Path(source).name}"
+            return result
+
+        with patch.object(converter._converter, 'convert', side_effect=_convert) as mock_convert:
+            with caplog.at_level("INFO"):
+                blocks = converter.to_markdown([a, c, b])
+
+        assert mock_convert.call_count == 2
+        assert blocks == ["# a.md", "# c.md", "# a.md"]
+        assert "Skipping 1 duplicate files" in caplog.text
+
+    def test_to_markdown_dedupe_disabled(self, tmp_path):
+        """Test dedupe=False converts every copy."""
+        converter = DoclingMarkdownConverter(ConversionSettings(dedupe=False))
+        a = tmp_path / "a.md"
+        b = tmp_path / "b.md"
+        a.write_text("# Same")
+        b.write_text("# Same")
+
+        with patch.object(converter._converter, 'convert') as mock_convert:
+            mock_convert.return_value.document.export_to_markdown.return_value = "# Same"
+            blocks = converter.to_markdown([a, b])
+
+        assert mock_convert.call_count == 2
+        assert blocks == ["# Same", "# Same"]
+
+    def test_to_markdown_with_sources(self, test_data_dir):
+        """Test blocks are paired with their source paths, skipping failures."""
+        converter = DoclingMarkdownConverter(ConversionSettings(fast_html=False))
+        test_files = [
+            test_data_dir / "test1.md",
+            test_data_dir / "missing.pdf",
+            test_data_dir / "test.html",
+        ]
+        with patch.object(converter._converter, 'convert') as mock_convert:
+            mock_convert.return_value.document.export_to_markdown.return_value = "# Doc"
+            pairs = converter.to_markdown_with_sources(test_files)
+
+        assert pairs == [(test_files[0], "# Doc"), (test_files[2], "# Doc")]
+
+    def test_document_cache_round_trip(self, tmp_path):
+        """Test converted documents are cached and re-used without Docling."""
+        from merge2md.converter import DoclingDocument
+
+        source = tmp_path / "report.pdf"
+        source.write_bytes(b"%PDF-1.4 fake")
+        settings = ConversionSettings(cache_dir=tmp_path / "cache")
+
+        first = DoclingMarkdownConverter(settings)
+        with patch.object(first._converter, 'convert') as mock_convert:
+            document = mock_convert.return_value.document
+            document.export_to_dict.return_value = {"name": "report"}
+            document.export_to_markdown.return_value = "# Report"
+            assert first.to_markdown([source]) == ["# Report"]
+
+        cached = list((tmp_path / "cache").glob("*.docling.json.gz"))
+        assert len(cached) == 1
+
+        second = DoclingMarkdownConverter(settings)
+        restored = Mock()
+        restored.export_to_markdown.return_value = "# Report"
+        with patch.object(second._converter, 'convert') as mock_convert, \
+                patch.object(DoclingDocument, 'model_validate', return_value=restored) as mock_validate:
+            assert second.to_markdown([source]) == ["# Report"]
+
+        mock_convert.assert_not_called()
+        mock_validate.assert_called_once_with({"name": "report"})
+
+    def test_inputs_hashed_once_per_call(self, tmp_path):
+        """Test dedupe, cache load and cache store share one digest per file."""
+        from merge2md import converter as converter_module
+
+        sources = [tmp_path / "a.pdf", tmp_path / "b.pdf"]
+        sources[0].write_bytes(b"%PDF-1.4 one")
+        sources[1].write_bytes(b"%PDF-1.4 two")
+        converter = DoclingMarkdownConverter(ConversionSettings(cache_dir=tmp_path / "cache"))
+        with patch.object(converter._converter, 'convert') as mock_convert, \
+                patch.object(converter_module, 'source_digest',
+                             wraps=converter_module.source_digest) as mock_digest:
+            mock_convert.return_value.document.export_to_dict.return_value = {"name": "doc"}
+            mock_convert.return_value.document.export_to_markdown.return_value = "# Doc"
+            converter.to_markdown(sources)
+
+        assert sorted(call.args[0] for call in mock_digest.call_args_list) == sources
+        assert len(list((tmp_path / "cache").glob("*.docling.json.gz"))) == 2
+
+    def test_document_cache_ignores_corrupt_entries(self, tmp_path, caplog):
+        """Test an unreadable cache entry falls back to conversion."""
+        source = tmp_path / "report.pdf"
+        source.write_bytes(b"%PDF-1.4 fake")
+        from merge2md.converter import _Call
+
+        converter = DoclingMarkdownConverter(ConversionSettings(cache_dir=tmp_path / "cache"))
+        cache_path = converter._cache_path(_Call(), source)
+        cache_path.parent.mkdir()
+        cache_path.write_bytes(b"not gzip")
+
+        with patch.object(converter._converter, 'convert') as mock_convert:
+            mock_convert.return_value.document.export_to_dict.return_value = {"name": "report"}
+            mock_convert.return_value.document.export_to_markdown.return_value = "# Fresh"
+            assert converter.to_markdown([source]) == ["# Fresh"]
+
+        assert "Ignoring unreadable cache" in caplog.text
+
+    def test_iter_documents_streams_in_order(self, converter, tmp_path):
+        """Test documents are yielded one by one, duplicates included."""
+        a = tmp_path / "a.md"
+        b = tmp_path / "b.md"
+        a_copy = tmp_path / "a_copy.md"
+        a.write_text("# A")
+        b.write_text("# B")
+        a_copy.write_text("# A")
+
+        with patch.object(converter._converter, 'convert') as mock_convert:
+            mock_convert.side_effect = lambda source: Mock(document=f"doc:{Path(source).name}")
+            stream = converter.iter_documents([a, b, a_copy])
+            assert next(stream) == (a, "doc:a.md")
+            # Only the first file has been converted so far
+            assert mock_convert.call_count == 1
+            rest = list(stream)
+
+        assert rest == [(b, "doc:b.md"), (a_copy, "doc:a.md")]
+        assert mock_convert.call_count == 2
+
+    def test_archive_members_and_streams(self, converter, tmp_path):
+        """Test zip members and in-memory streams are converted without extracting."""
+        import io
+        import zipfile
+        from docling.datamodel.base_models import DocumentStream
+
+        bundle = tmp_path / "bundle.zip"
+        with zipfile.ZipFile(bundle, "w") as zf:
+            zf.writestr("a.md", "# A")
+        member = Path(f"{bundle}!/a.md")
+        upload = DocumentStream(name="upload.md", stream=io.BytesIO(b"# Upload"))
+
+        seen = []
+
+        def fake_convert(source):
+            seen.append(source)
+            return Mock(document=Mock(export_to_markdown=Mock(
+                return_value=source.stream.read().decode()
+            )))
+
+        with patch.object(converter._converter, 'convert', side_effect=fake_convert):
+            results = converter.to_markdown_with_sources([member, upload])
+
+        assert results == [(member, "# A"), (Path("upload.md"), "# Upload")]
+        assert all(isinstance(source, DocumentStream) for source in seen)
+
+    @pytest.mark.parametrize("doc_batch_size", [1, 2])
+    def test_streams_with_the_same_name(self, doc_batch_size):
+        """Test same-named in-memory streams are converted separately, in order."""
+        import io
+        from types import SimpleNamespace
+        from docling.datamodel.base_models import ConversionStatus, DocumentStream
+
+        converter = DoclingMarkdownConverter(
+            ConversionSettings(doc_batch_size=doc_batch_size, dedupe=False)
+        )
+        streams = [
+            DocumentStream(name="a.md", stream=io.BytesIO(b"# First")),
+            DocumentStream(name="a.md", stream=io.BytesIO(b"# Second")),
+        ]
+
+        def fake_convert(source):
+            text = source.stream.read().decode()
+            return SimpleNamespace(
+                input=SimpleNamespace(file=Path(source.name)),
+                status=ConversionStatus.SUCCESS,
+                document=Mock(export_to_markdown=Mock(return_value=text)),
+            )
+
+        with patch.object(converter._converter, 'convert', side_effect=fake_convert), \
+                patch.object(converter._converter, 'convert_all',
+                             side_effect=lambda sources, **_: map(fake_convert, sources)):
+            results = converter.to_results(streams)
+
+        assert [(r.path, r.markdown) for r in results] == [
+            (Path("a.md"), "# First"), (Path("a.md"), "# Second"),
+        ]
+
+    def test_progress_events(self, tmp_path):
+        """Test files report queued/started/finished/failed with pages and bytes."""
+        ok = tmp_path / "ok.md"
+        bad = tmp_path / "bad.md"
+        ok.write_text("# OK")
+        bad.write_text("# Bad!")
+        events = []
+        converter = DoclingMarkdownConverter(progress=events.append)
+
+        def fake_convert(source):
+            if source.endswith("bad.md"):
+                raise RuntimeError("boom")
+            return Mock(document=Mock(pages={1: None, 2: None}))
+
+        with patch.object(converter._converter, 'convert', side_effect=fake_convert):
+            list(converter.iter_documents([ok, bad]))
+
+        assert [(e.kind, e.path.name) for e in events] == [
+            ("queued", "ok.md"), ("queued", "bad.md"),
+            ("started", "ok.md"), ("finished", "ok.md"),
+            ("started", "bad.md"), ("failed", "bad.md"),
+        ]
+        assert events[3].pages == 2
+        assert events[3].bytes == 4
+        assert events[5].error == "boom"
+
+    def test_progress_callback_errors_ignored(self, tmp_path):
+        """Test a failing progress callback doesn't fail the conversion."""
+        path = tmp_path / "a.md"
+        path.write_text("# A")
+
+        def broken(event):
+            raise ValueError("bad callback")
+
+        converter = DoclingMarkdownConverter(progress=broken)
+        with patch.object(converter._converter, 'convert', return_value=Mock(document="doc")):
+            assert list(converter.iter_documents([path])) == [(path, "doc")]
+
+    def test_profiler_collects_docling_timings(self, tmp_path):
+        """Test Docling's per-stage timings reach a running profiler."""
+        from types import SimpleNamespace
+        from merge2md.profiling import Profiler
+
+        path = tmp_path / "a.md"
+        path.write_text("# A")
+        converter = DoclingMarkdownConverter()
+        result = Mock(document="doc", timings={"layout": SimpleNamespace(times=[0.5, 0.25])})
+        with patch.object(converter._converter, 'convert', return_value=result):
+            with Profiler(tmp_path / "prof", cprofile=False) as profiler:
+                list(converter.iter_documents([path]))
+
+        stages = {name: (calls, total) for name, calls, total in profiler.stages.rows()}
+        assert stages["docling.layout"] == (2, 0.75)
+        assert stages["convert"][0] == 1
+
+    def test_csv_streams_without_docling(self, test_data_dir):
+        """Test CSV files become streamed tables and never reach Docling."""
+        converter = DoclingMarkdownConverter(ConversionSettings(csv_max_rows=2))
+        with patch.object(converter._converter, 'convert') as mock_convert:
+            blocks = converter.to_markdown([test_data_dir / "test.csv"])
+
+        mock_convert.assert_not_called()
+        lines = blocks[0].splitlines()
+        assert lines[0].split("|")[1].strip() == "Name"
+        assert len([line for line in lines if line.startswith("|")]) == 4
+        assert lines[-1] == "_Table truncated after 2 rows._"
+
+    def test_csv_in_batches_and_streams(self, tmp_path):
+        """Test the streaming path also covers batched runs and in-memory streams."""
+        from io import BytesIO
+        from docling.datamodel.base_models import DocumentStream
+
+        converter = DoclingMarkdownConverter(ConversionSettings(doc_batch_size=4))
+        stream = DocumentStream(name="rows.tsv", stream=BytesIO(b"a\tb\n1\t2\n"))
+        with patch.object(converter._converter, 'convert_all') as mock_all:
+            blocks = converter.to_markdown([stream])
+
+        mock_all.assert_not_called()
+        assert blocks == ["| a   | b   |\n| --- | --- |\n| 1   | 2   |"]
+
+    def test_iter_results_reports_every_input(self, tmp_path):
+        """Test results line up with inputs, including failed, missing and duplicate files."""
+        ok = tmp_path / "ok.md"
+        copy = tmp_path / "copy.md"
+        bad = tmp_path / "bad.md"
+        ok.write_text("# OK")
+        copy.write_text("# OK")
+        bad.write_text("# Bad")
+        converter = DoclingMarkdownConverter()
+
+        def fake_convert(source):
+            if source.endswith("bad.md"):
+                raise ValueError("corrupt")
+            return Mock(document=Mock(pages={1: None}, export_to_markdown=Mock(return_value="# OK")))
+
+        inputs = [ok, tmp_path / "gone.md", bad, copy, ok]
+        with patch.object(converter._converter, 'convert', side_effect=fake_convert) as mock_convert:
+            results = converter.to_results(inputs, spill_dir=tmp_path / "spill")
+
+        assert mock_convert.call_count == 2  # ok (and its copies) once, bad once
+        assert [(r.path, r.status) for r in results] == [
+            (ok, "success"), (tmp_path / "gone.md", "missing"), (bad, "failed"),
+            (copy, "success"), (ok, "success"),
+        ]
+        assert results[0].pages == 1 and results[0].attempts == 1
+        assert results[0].markdown is None
+        assert results[0].read_markdown() == "# OK"
+        assert results[2].error == "corrupt"
+
+    def test_transient_errors_are_retried(self, tmp_path, caplog):
+        """Test transient failures are retried per the policy; others are not."""
+        from merge2md.results import RetryPolicy
+
+        path = tmp_path / "a.md"
+        path.write_text("# A")
+        converter = DoclingMarkdownConverter(retry=RetryPolicy(attempts=3, backoff=0))
+        outcomes = [TimeoutError("slow NFS"), MemoryError(), Mock(document="doc")]
+        with patch.object(converter._converter, 'convert', side_effect=outcomes) as mock_convert:
+            results = list(converter.iter_results([path]))
+
+        assert mock_convert.call_count == 3
+        assert results[0][0].attempts == 3
+        assert results[0][1] == "doc"
+        assert "Retrying a.md" in caplog.text
+
+        with patch.object(converter._converter, 'convert', side_effect=ValueError("corrupt")) as mock_convert:
+            result, document = next(converter.iter_results([path]))
+        assert mock_convert.call_count == 1
+        assert (result.status, result.attempts, document) == ("failed", 1, None)
+
+    def test_simple_html_skips_docling(self, test_data_dir, tmp_path):
+        """Test simple pages are parsed directly and complex ones still go to Docling."""
+        complex_page = tmp_path / "chart.html"
+        complex_page.write_text("<p>Sales</p><svg><rect/></svg>")
+        converter = DoclingMarkdownConverter()
+        with patch.object(converter._converter, 'convert') as mock_convert:
+            mock_convert.return_value.document.export_to_markdown.return_value = "# Docling"
+            blocks = converter.to_markdown([test_data_dir / "test.html", complex_page])
+
+        assert blocks[0].startswith("# HTML Test Document")
+        assert blocks[1] == "# Docling"
+        mock_convert.assert_called_once_with(str(complex_page))
+
+    def test_worker_processes_spill_markdown(self, test_data_dir, tmp_path):
+        """Test process workers hand Markdown back as spill files, in input order."""
+        from merge2md.results import SpilledMarkdown
+
+        paths = [test_data_dir / "test.csv", test_data_dir / "test.html", tmp_path / "gone.csv"]
+        expected = DoclingMarkdownConverter().to_markdown(paths[:2])
+        events = []
+        converter = DoclingMarkdownConverter(
+            ConversionSettings(workers=2, processes=True), progress=events.append
+        )
+
+        results = list(converter.iter_results(paths))
+
+        assert [(r.path, r.status) for r, _ in results] == [
+            (paths[0], "success"), (paths[1], "success"), (paths[2], "missing"),
+        ]
+        documents = [document for _, document in results[:2]]
+        assert all(isinstance(document, SpilledMarkdown) for document in documents)
+        assert [document.export_to_markdown() for document in documents] == expected
+        assert sorted(event.kind for event in events if event.kind != "queued") == [
+            "finished", "finished", "started", "started",
+        ]
+
+        # The call's spill directory goes away with its documents.
+        spill_dir = documents[0].path.parent
+        del results, documents
+        gc.collect()
+        assert not spill_dir.exists()
+
+    def test_format_detection_rejects_and_routes(self, tmp_path):
+        """Test unsupported files never reach Docling and mislabeled ones are renamed."""
+        import zipfile
+
+        legacy = tmp_path / "old.doc"
+        legacy.write_bytes(b"\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1" + bytes(64))
+        disguised = tmp_path / "report.pdf"
+        with zipfile.ZipFile(disguised, "w") as docx:
+            docx.writestr("word/document.xml", "<w:document/>")
+        page = tmp_path / "saved.txt"
+        page.write_text("<html><body><h1>Saved</h1></body></html>")
+        converter = DoclingMarkdownConverter()
+        seen = []
+
+        def _convert(source):
+            seen.append(Path(source).name)
+            result = Mock()
+            result.document.export_to_markdown.return_value = "# Word"
+            return result
+
+        with patch.object(converter._converter, 'convert', side_effect=_convert):
+            results = list(converter.iter_results([legacy, disguised, page]))
+
+        assert [(r.status, r.error) for r, _ in results][0] == (
+            "unsupported", "legacy Office (OLE2) file; save it as .docx/.pptx/.xlsx"
+        )
+        assert seen == ["report.pdf.docx"]
+        assert results[1][1].export_to_markdown() == "# Word"
+        # HTML saved as .txt takes the fast HTML path
+        assert results[2][1].export_to_markdown() == "# Saved"
+
+    def test_format_detection_passes_unsniffed_formats(self, tmp_path):
+        """Test enabled formats detection can't sniff (JATS, Docling JSON) reach Docling as-is."""
+        article = tmp_path / "article.xml"
+        article.write_text('<?xml version="1.0"?><article/>')
+        saved = tmp_path / "doc.json"
+        saved.write_text('{"schema_name": "DoclingDocument"}')
+        settings = ConversionSettings(allowed_formats=[
+            InputFormat.MD, InputFormat.XML_JATS, InputFormat.JSON_DOCLING,
+        ])
+        converter = DoclingMarkdownConverter(settings)
+
+        with patch.object(converter._converter, 'convert') as mock_convert:
+            mock_convert.return_value.document.export_to_markdown.return_value = "# Doc"
+            results = converter.to_results([article, saved])
+
+        assert [r.status for r in results] == ["success", "success"]
+        assert [c.args for c in mock_convert.call_args_list] == [(str(article),), (str(saved),)]
+        # Not enabled: still rejected up front.
+        assert DoclingMarkdownConverter().to_results([article])[0].status == "unsupported"
+
+    def test_format_detection_reencodes_utf16_text(self, tmp_path):
+        """Test UTF-16 text reaches Docling's Markdown backend as UTF-8."""
+        notes = tmp_path / "notes.txt"
+        notes.write_bytes("# Café\n\nNotes".encode("utf-16"))
+        converter = DoclingMarkdownConverter()
+        seen = []
+
+        def _convert(source):
+            seen.append((source.name, source.stream.read()))
+            result = Mock()
+            result.document.export_to_markdown.return_value = "# Café"
+            return result
+
+        with patch.object(converter._converter, 'convert', side_effect=_convert):
+            results = converter.to_results([notes])
+
+        assert seen == [("notes.txt.md", "# Café\n\nNotes".encode("utf-8"))]
+        assert results[0].path == notes
+
+    def test_format_detection_can_be_disabled(self, tmp_path):
+        """Test detect_formats=False hands every file to Docling by extension."""
+        legacy = tmp_path / "old.doc"
+        legacy.write_bytes(b"\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1")
+        converter = DoclingMarkdownConverter(ConversionSettings(detect_formats=False))
+        with patch.object(converter._converter, 'convert', side_effect=ValueError("bad")) as mock_convert:
+            results = converter.to_results([legacy])
+        mock_convert.assert_called_once_with(str(legacy))
+        assert results[0].status == "failed"
@@ -0,0 +1,121 @@
+"""Unit tests for the detect module."""
+import io
+import zipfile
+import pytest
+from pathlib import Path
+
+from docling.datamodel.base_models import InputFormat
+
+from merge2md.detect import (
+    UnsupportedFormat,
+    detect_format,
+    format_for_suffix,
+    route_suffix,
+    unsniffed_format,
+    utf16_as_utf8,
+)
+
+
+def _zip(*members):
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w") as zf:
+        zf.writestr("[Content_Types].xml", "<Types/>")
+        for member in members:
+            zf.writestr(member, "<xml/>")
+    return buffer.getvalue()
+
+
+def _detect(data, name):
+    return detect_format(io.BytesIO(data), name)
+
+
+class TestDetectFormat:
+    """Test classification from the first bytes."""
+
+    @pytest.mark.parametrize("data,name,expected", [
+        (b"%PDF-1.7\n...", "report.pdf", InputFormat.PDF),
+        (b"\n\n%PDF-1.4", "scan.bin", InputFormat.PDF),
+        (b"\x00\x01junk\r\n%PDF-1.3\n", "mail.pdf", InputFormat.PDF),
+        (b"Save it with a %PDF-1.7 header.\n", "notes.txt", InputFormat.MD),
+        (b"<html><body><pre>%PDF-1.4\n1 0 obj</pre>", "dump.html", InputFormat.HTML),
+        (b"# How PDFs start\n\nWith `%PDF-`.", "pdf.md", InputFormat.MD),
+        (b"\x89PNG\r\n\x1a\n\x00\x00", "figure.png", InputFormat.IMAGE),
+        (b"\xff\xd8\xff\xe0\x00\x10JFIF", "photo.pdf", InputFormat.IMAGE),
+        (_zip("word/document.xml"), "report.pdf", InputFormat.DOCX),
+        (_zip("ppt/presentation.xml"), "deck.pptx", InputFormat.PPTX),
+        (b"<!DOCTYPE html><title>x</title>", "saved.txt", InputFormat.HTML),
+        (b"<p>fragment</p>", "page.htm", InputFormat.HTML),
+        (b"Plain text.\n\nMore.", "notes.txt", InputFormat.MD),
+        ("﻿# Title".encode("utf-8"), "README", InputFormat.MD),
+        (b"a\tb\n1\t2\n", "data.tsv", InputFormat.CSV),
+        (b"= Title\n", "guide.adoc", InputFormat.ASCIIDOC),
+        (b"", "empty.md", InputFormat.MD),
+    ])
+    def test_supported(self, data, name, expected):
+        """Test magic numbers, zip members, markup and text extensions."""
+        assert _detect(data, name) == expected
+
+    def test_real_sample_files(self):
+        """Test the repo's sample files, including the .txt Docling can't take by name."""
+        data = Path(__file__).parent / "data"
+        expected = {
+            "test1.md": InputFormat.MD, "test2.txt": InputFormat.MD,
+            "test.html": InputFormat.HTML, "test.csv": InputFormat.CSV,
+            "test.asciidoc": InputFormat.ASCIIDOC,
+        }
+        for name, input_format in expected.items():
+            with (data / name).open("rb") as fh:
+                assert detect_format(fh, name) == input_format
+
+    @pytest.mark.parametrize("data,name,reason", [
+        (_zip("mimetype"), "book.docx", "zip archive"),
+        (b"PK\x03\x04 truncated", "deck.pptx", "corrupt zip"),
+        (b"\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1\x00\x00", "old.doc", "legacy Office"),
+        (b"GIF89a\x01\x00", "anim.gif", "GIF"),
+        (bytes(range(256)) * 4, "blob.pdf", "binary"),
+        (b"Just some text", "report.pdf", "plain text in a .pdf file"),
+        (b"", "empty.xyz", "empty file"),
+    ])
+    def test_unsupported(self, data, name, reason):
+        """Test files no backend handles are rejected with a reason."""
+        with pytest.raises(UnsupportedFormat, match=reason):
+            _detect(data, name)
+
+
+class TestUnsniffed:
+    """Test formats left to Docling and text re-encoded for it."""
+
+    def test_unsniffed_format(self):
+        """Test only enabled formats detection doesn't sniff pass through by extension."""
+        allowed = [InputFormat.MD, InputFormat.XML_JATS, InputFormat.JSON_DOCLING]
+        assert unsniffed_format("article.NXML", allowed) == InputFormat.XML_JATS
+        assert unsniffed_format("paper.xml", allowed) == InputFormat.XML_JATS
+        assert unsniffed_format("doc.json", allowed) == InputFormat.JSON_DOCLING
+        assert unsniffed_format("doc.json", [InputFormat.MD]) is None
+        # Extensions detection handles are never passed through.
+        assert unsniffed_format("notes.txt", [InputFormat.XML_USPTO]) is None
+        assert unsniffed_format("report.pdf", allowed) is None
+
+    def test_utf16_as_utf8(self):
+        """Test UTF-16 text (either byte order) is re-encoded; other input isn't."""
+        text = "# Café\n"
+        for encoding in ("utf-16", "utf-16-be"):
+            data = (b"\xfe\xff" if encoding == "utf-16-be" else b"") + text.encode(encoding)
+            assert utf16_as_utf8(io.BytesIO(data), InputFormat.MD) == text.encode("utf-8")
+        assert utf16_as_utf8(io.BytesIO(text.encode("utf-8")), InputFormat.MD) is None
+        assert utf16_as_utf8(io.BytesIO(text.encode("utf-16")), InputFormat.HTML) is None
+
+
+class TestRouting:
+    """Test extension lookups used to route mislabeled files."""
+
+    def test_format_for_suffix(self):
+        assert format_for_suffix(".DOCX") == InputFormat.DOCX
+        assert format_for_suffix(".txt") is None
+
+    def test_route_suffix(self):
+        """Test only mismatched extensions get a routing suffix."""
+        assert route_suffix("a.pdf", InputFormat.PDF) is None
+        assert route_suffix("a.JPEG", InputFormat.IMAGE) is None
+        assert route_suffix("a.pdf", InputFormat.DOCX) == ".docx"
+        assert route_suffix("notes.txt", InputFormat.MD) == ".md"
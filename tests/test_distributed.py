@@ -0,0 +1,191 @@
+"""Unit tests for the distributed module."""
+import threading
+import pytest
+from pathlib import Path
+from unittest.mock import Mock
+
+from merge2md.distributed import WorkQueue, coordinate, run_worker
+from merge2md.results import ConversionResult
+
+
+@pytest.fixture
+def queue(tmp_path):
+    """A fresh queue with short leases."""
+    return WorkQueue(tmp_path / "queue.db", lease=10.0, max_attempts=2, steal_after=30.0)
+
+
+@pytest.fixture
+def files(tmp_path):
+    """Input files named so natural and lexical order differ."""
+    paths = []
+    for name in ("doc10.md", "doc2.md", "doc1.md"):
+        path = tmp_path / name
+        path.write_text(f"# {name}")
+        paths.append(path)
+    return paths
+
+
+def _echo(path):
+    return ConversionResult(path=path, status="success", markdown=path.read_text())
+
+
+def _echo_converter():
+    """Converter stand-in that returns each file's text."""
+    converter = Mock()
+    converter.to_results.side_effect = lambda paths: [_echo(p) for p in paths]
+    return converter
+
+
+class TestWorkQueue:
+    """Test leasing, retries and work stealing."""
+
+    def test_claims_in_natural_order(self, queue, files):
+        """Test tasks are handed out in natural order, one lease each."""
+        queue.submit(files)
+        claimed = [queue.claim("w1", now=0.0).path.name for _ in files]
+        assert claimed == ["doc1.md", "doc2.md", "doc10.md"]
+        assert queue.claim("w1", now=1.0) is None
+
+    def test_expired_lease_is_reclaimed(self, queue, files):
+        """Test a dead worker's task goes to another worker."""
+        queue.submit(files[:1])
+        task = queue.claim("dead", now=0.0)
+        assert queue.claim("w2", now=5.0) is None
+
+        retry = queue.claim("w2", now=11.0)
+        assert retry.id == task.id
+        assert retry.attempt == 2
+
+    def test_renew_keeps_lease(self, queue, files):
+        """Test renewing stops a live task from being reclaimed."""
+        queue.submit(files[:1])
+        task = queue.claim("w1", now=0.0)
+        queue.renew(task, now=8.0)
+        assert queue.claim("w2", now=11.0) is None
+
+    def test_retry_then_give_up(self, queue, files):
+        """Test failures are retried up to max_attempts, then recorded."""
+        job = queue.submit(files[:1])
+        queue.fail(queue.claim("w1", now=0.0), "boom")
+        assert queue.counts(job) == {"pending": 1}
+
+        queue.fail(queue.claim("w1", now=1.0), "boom again")
+        assert queue.is_finished(job)
+        assert queue.failures(job) == [(files[0].resolve(), "boom again")]
+
+    def test_steals_stragglers(self, queue, files):
+        """Test idle workers duplicate a long-running task; first result wins."""
+        job = queue.submit(files[:1])
+        slow = queue.claim("slow", now=0.0)
+        queue.renew(slow, now=15.0)
+        assert queue.claim("fast", now=20.0) is None
+        queue.renew(slow, now=25.0)
+
+        stolen = queue.claim("fast", now=31.0)
+        assert stolen.id == slow.id
+        # At most two copies of a task run at once
+        assert queue.claim("third", now=40.0) is None
+
+        assert queue.complete(stolen, "# fast") is True
+        assert queue.complete(slow, "# slow") is False
+        assert queue.results(job) == [(files[0].resolve(), "# fast")]
+
+    def test_failed_copy_leaves_other_running(self, queue, files):
+        """Test one copy failing doesn't requeue a task another copy still holds."""
+        job = queue.submit(files[:1])
+        slow = queue.claim("slow", now=0.0)
+        queue.renew(slow, now=25.0)
+        stolen = queue.claim("fast", now=31.0)
+
+        queue.fail(stolen, "oom")
+        assert queue.counts(job) == {"leased": 1}
+        queue.complete(slow, "# slow")
+        assert queue.counts(job) == {"done": 1}
+
+    def test_both_copies_failing_requeues(self, queue, files):
+        """Test the original holder's failure still counts after its stealer failed."""
+        job = queue.submit(files[:1])
+        slow = queue.claim("slow", now=0.0)
+        queue.renew(slow, now=25.0)
+        stolen = queue.claim("fast", now=31.0)
+
+        queue.fail(stolen, "oom")
+        queue.fail(slow, "oom too")
+        assert queue.counts(job) == {"failed": 1}  # two attempts used up
+
+    def test_fail_after_lost_lease_is_ignored(self, queue, files):
+        """Test a worker whose lease expired can't fail the task for its new holder."""
+        job = queue.submit(files[:1])
+        stale = queue.claim("stale", now=0.0)
+        current = queue.claim("current", now=11.0)
+
+        queue.fail(stale, "timed out")
+        queue.renew(stale, now=12.0)
+        assert queue.counts(job) == {"leased": 1}
+        assert queue.claim("other", now=22.0).id == current.id  # stale renewal didn't extend
+
+    def test_permanent_failure_is_not_retried(self, queue, files):
+        """Test unconvertible input fails on the first attempt, even with a copy running."""
+        job = queue.submit(files[:1])
+        slow = queue.claim("slow", now=0.0)
+        queue.renew(slow, now=25.0)
+        queue.claim("fast", now=31.0)
+
+        queue.fail(slow, "corrupt zip container", permanent=True)
+        assert queue.failures(job) == [(files[0].resolve(), "corrupt zip container")]
+
+
+class TestWorkersAndCoordinator:
+    """Test end-to-end on one machine."""
+
+    def test_run_worker_until_idle(self, queue, files):
+        """Test a worker converts everything and reports failures."""
+        job = queue.submit(files)
+        converter = _echo_converter()
+        converter.to_results.side_effect = lambda paths: [
+            ConversionResult(path=paths[0], status="failed", error="boom")
+            if paths[0].name == "doc2.md" else _echo(paths[0])
+        ]
+
+        completed = run_worker(queue, converter, worker_id="w1", exit_when_idle=True)
+
+        assert completed == 2
+        assert [p.name for p, _ in queue.results(job)] == ["doc1.md", "doc10.md"]
+        assert [p.name for p, _ in queue.failures(job)] == ["doc2.md"]
+        assert converter.to_results.call_count == 4  # doc2.md tried max_attempts times
+
+    def test_run_worker_gives_up_on_unsupported_files(self, queue, files):
+        """Test files the converter rejects as unsupported aren't retried."""
+        job = queue.submit(files[:1])
+        converter = Mock()
+        converter.to_results.side_effect = lambda paths: [
+            ConversionResult(path=paths[0], status="unsupported", error="GIF image")
+        ]
+
+        run_worker(queue, converter, worker_id="w1", exit_when_idle=True)
+
+        converter.to_results.assert_called_once()
+        assert queue.failures(job) == [(files[0].resolve(), "GIF image")]
+
+    def test_coordinate_with_worker_threads(self, queue, files, tmp_path):
+        """Test the coordinator merges blocks from several workers in natural order."""
+        stop = threading.Event()
+        workers = [
+            threading.Thread(
+                target=run_worker,
+                args=(queue, _echo_converter()),
+                kwargs={"worker_id": f"w{i}", "poll": 0.01, "stop": stop},
+            )
+            for i in range(3)
+        ]
+        for worker in workers:
+            worker.start()
+        try:
+            output = coordinate(queue, files, tmp_path / "out.md", poll=0.01)
+        finally:
+            stop.set()
+            for worker in workers:
+                worker.join(timeout=5)
+
+        merged = output.read_text()
+        assert merged.index("# doc1.md") < merged.index("# doc2.md") < merged.index("# doc10.md")
@@ -1,4 +1,5 @@
 """Test the public API exposed by __init__.py."""
+import json
 import pytest
 from pathlib import Path
 from unittest.mock import patch, Mock
@@ -13,9 +14,12 @@ class TestPublicAPI:
     @pytest.fixture
     def temp_dir(self, tmp_path):
         """Create a temporary directory with test files."""
-        # Create test files
-        (tmp_path / "test.pdf").write_text("PDF content")
-        (tmp_path / "test.docx").write_text("Word content")
+        # Create test files (PDF/DOCX need their magic bytes to pass format detection)
+        import zipfile
+
+        (tmp_path / "test.pdf").write_bytes(b"%PDF-1.4\nPDF content")
+        with zipfile.ZipFile(tmp_path / "test.docx", "w") as docx:
+            docx.writestr("word/document.xml", "<w:document>Word content</w:document>")
         (tmp_path / "test.html").write_text("<html><body>HTML content</body></html>")
         (tmp_path / "test.csv").write_text("Name,Value\nA,1\nB,2")
         (tmp_path / "test.md").write_text("# Markdown content")
@@ -105,6 +109,186 @@ class TestPublicAPI:
             assert result == output
             mock_pypandoc.assert_called_once()
     
+    @patch('merge2md.converter.DocumentConverter')
+    def test_convert_and_merge_toc(self, mock_converter_class, temp_dir):
+        """Test toc=True adds contents and an index sidecar."""
+        mock_converter = Mock()
+        mock_converter_class.return_value = mock_converter
+        mock_converter.convert.return_value = Mock(
+            document=Mock(export_to_markdown=Mock(return_value="# Converted"))
+        )
+        files = [temp_dir / "test.pdf", temp_dir / "test.html"]
+        output = temp_dir / "output.md"
+
+        convert_and_merge(files, output, toc=True, show_notification=False)
+
+        content = output.read_text()
+        assert "- [test.pdf](#source-1)" in content
+        assert "- [test.html](#source-2)" in content
+        assert (temp_dir / "output.md.index.json").exists()
+
+    @patch('merge2md.converter.DocumentConverter')
+    @patch('merge2md.merger.pypandoc.convert_file')
+    def test_convert_and_merge_multiple_outputs(self, mock_pypandoc, mock_converter_class, temp_dir):
+        """Test one conversion pass feeds several outputs."""
+        with patch('merge2md.merger._HAS_PYPANDOC', True):
+            mock_converter = Mock()
+            mock_converter_class.return_value = mock_converter
+            mock_converter.convert.return_value = Mock(
+                document=Mock(export_to_markdown=Mock(return_value="# Converted"))
+            )
+            files = [temp_dir / "test.pdf", temp_dir / "test.html"]
+            outputs = [temp_dir / "out.md", temp_dir / "out.pdf", temp_dir / "out.html"]
+
+            result = convert_and_merge(
+                files, outputs, settings=ConversionSettings(fast_html=False), show_notification=False
+            )
+
+        assert result == outputs
+        assert mock_converter.convert.call_count == 2
+        assert "# Converted" in (temp_dir / "out.md").read_text()
+        assert mock_pypandoc.call_count == 2
+
+    @patch('merge2md.converter.DocumentConverter')
+    @patch('merge2md.chunking.HierarchicalChunker')
+    def test_convert_and_merge_jsonl_chunks(self, mock_chunker, mock_converter_class, temp_dir):
+        """Test .jsonl outputs get chunks alongside the merged Markdown."""
+        mock_converter = Mock()
+        mock_converter_class.return_value = mock_converter
+        mock_converter.convert.return_value = Mock(
+            document=Mock(export_to_markdown=Mock(return_value="# Converted"))
+        )
+        mock_chunker.return_value.chunk.side_effect = lambda dl_doc: iter([
+            Mock(text="chunk text", meta=Mock(headings=["Converted"], doc_items=[]))
+        ])
+        files = [temp_dir / "test.pdf", temp_dir / "test.html"]
+        outputs = [temp_dir / "out.jsonl", temp_dir / "out.md"]
+
+        convert_and_merge(files, outputs, show_notification=False)
+
+        lines = (temp_dir / "out.jsonl").read_text().splitlines()
+        assert [json.loads(line)["source"] for line in lines] == [str(f) for f in files]
+        assert "# Converted" in (temp_dir / "out.md").read_text()
+
+    @patch('merge2md.converter.DocumentConverter')
+    def test_convert_and_merge_failure_releases_reserved_name(self, mock_converter_class, temp_dir, monkeypatch):
+        """Test a failed run removes its empty Downloads placeholder."""
+        monkeypatch.setattr(Path, "home", lambda: temp_dir)
+        mock_converter_class.return_value.convert.return_value = Mock(
+            document=Mock(export_to_markdown=Mock(return_value="# Converted"))
+        )
+        with patch('merge2md.__init__.MarkdownMerger.export_all', side_effect=RuntimeError("boom")):
+            with pytest.raises(RuntimeError, match="boom"):
+                convert_and_merge([temp_dir / "test.md"], show_notification=False)
+
+        assert list((temp_dir / "Downloads").iterdir()) == []
+
+    @patch('merge2md.converter.DocumentConverter')
+    def test_convert_and_merge_str_output(self, mock_converter_class, temp_dir):
+        """Test a plain string output path works like a Path."""
+        mock_converter_class.return_value.convert.return_value = Mock(
+            document=Mock(export_to_markdown=Mock(return_value="# Converted"))
+        )
+        output = str(temp_dir / "out.md")
+
+        result = convert_and_merge([temp_dir / "test.md"], output, show_notification=False)
+
+        assert result == Path(output)
+        assert "# Converted" in result.read_text()
+
+    @patch('merge2md.converter.DocumentConverter')
+    def test_convert_and_merge_custom_notifier(self, mock_converter_class, temp_dir):
+        """Test the notifier gets the result without convert_and_merge waiting on it."""
+        import threading
+        mock_converter_class.return_value.convert.return_value = Mock(
+            document=Mock(export_to_markdown=Mock(return_value="# Converted"))
+        )
+        release = threading.Event()
+        calls = []
+
+        def callback(path, success):
+            release.wait(5)
+            calls.append((path, success))
+
+        output = temp_dir / "out.md"
+        assert convert_and_merge([temp_dir / "test.md"], output, notifier=callback) == output
+        assert calls == []  # returned while the notifier was still busy
+        release.set()
+        for thread in threading.enumerate():
+            if thread.name == "merge2md-notify":
+                thread.join(5)
+        assert calls == [(output, True)]
+
+    @patch('merge2md.converter.DocumentConverter')
+    def test_convert_and_merge_retry_failed(self, mock_converter_class, temp_dir):
+        """Test a results file records failures and --retry-failed redoes only those."""
+        from merge2md.results import load_results
+
+        def first_run(source):
+            if source.endswith("test.docx"):
+                raise ValueError("bad docx")
+            return Mock(document=Mock(export_to_markdown=Mock(return_value=f"# {Path(source).name}")))
+
+        mock_converter = mock_converter_class.return_value
+        mock_converter.convert.side_effect = first_run
+        files = [temp_dir / "test.pdf", temp_dir / "test.docx", temp_dir / "missing.pdf"]
+        output = temp_dir / "out.md"
+        results = temp_dir / "run.json"
+
+        convert_and_merge(files, output, results=results, show_notification=False)
+        assert [(r.path.name, r.status) for r in load_results(results)] == [
+            ("test.pdf", "success"), ("test.docx", "failed"), ("missing.pdf", "missing"),
+        ]
+        assert load_results(results)[1].error == "bad docx"
+
+        mock_converter.convert.reset_mock()
+        mock_converter.convert.side_effect = lambda source: Mock(
+            document=Mock(export_to_markdown=Mock(return_value="# fixed docx"))
+        )
+        convert_and_merge([], output, results=results, retry_failed=True, show_notification=False)
+
+        converted = [call.args[0] for call in mock_converter.convert.call_args_list]
+        assert converted == [str(temp_dir / "test.docx")]
+        content = output.read_text()
+        assert content.index("# test.pdf") < content.index("# fixed docx")
+        assert [r.status for r in load_results(results)] == ["success", "success", "missing"]
+
+    def test_retry_failed_needs_results(self, temp_dir):
+        """Test retry mode without a results file is rejected up front."""
+        with pytest.raises(ValueError):
+            convert_and_merge([], temp_dir / "out.md", retry_failed=True, show_notification=False)
+
+    def test_retry_failed_errors_release_reserved_names(self, temp_dir, monkeypatch):
+        """Test bad retry arguments leave no empty Downloads placeholders behind."""
+        monkeypatch.setattr(Path, "home", lambda: temp_dir)
+        with pytest.raises(ValueError):
+            convert_and_merge([], retry_failed=True, show_notification=False)
+        with pytest.raises(OSError):
+            convert_and_merge(
+                [], retry_failed=True, results=temp_dir / "missing.json", show_notification=False
+            )
+
+        assert list((temp_dir / "Downloads").iterdir()) == []
+
+    def test_convert_and_merge_worker_processes(self, temp_dir):
+        """Test process workers' spilled blocks merge like in-memory ones, chunks included."""
+        import json
+
+        data = Path(__file__).parent / "data"
+        files = [data / "test.html", data / "test.csv"]
+        expected = temp_dir / "threads.md"
+        convert_and_merge(files, expected, title="T", show_notification=False)
+
+        outputs = [temp_dir / "procs.md", temp_dir / "procs.jsonl"]
+        convert_and_merge(
+            files, outputs, title="T", show_notification=False,
+            settings=ConversionSettings(workers=2, processes=True),
+        )
+
+        assert outputs[0].read_bytes() == expected.read_bytes()
+        chunks = [json.loads(line) for line in outputs[1].read_text().splitlines()]
+        assert {chunk["source"] for chunk in chunks} == {str(path) for path in files}
+
     def test_imports(self):
         """Test that all expected exports are available."""
         from merge2md import convert_and_merge, ConversionSettings, DoclingMarkdownConverter
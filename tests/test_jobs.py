@@ -0,0 +1,138 @@
+"""Unit tests for the jobs module."""
+import threading
+import pytest
+from pathlib import Path
+from unittest.mock import Mock
+
+from merge2md.jobs import BATCH, INTERACTIVE, JobQueue
+from merge2md.results import ConversionResult
+
+
+class FakeConverter:
+    """Records the order files convert in; files in `hold` block until released."""
+
+    def __init__(self, hold=()):
+        self.settings = Mock(workers=1)
+        self.order = []
+        self.running = []
+        self.peak = {}
+        self.hold = {Path(p): threading.Event() for p in hold}
+        self.entered = {path: threading.Event() for path in self.hold}
+        self._lock = threading.Lock()
+
+    def to_results(self, paths, spill_dir=None):
+        path = paths[0]
+        with self._lock:
+            self.order.append(path.name)
+            self.running.append(path.parent.name)
+            tenant = path.parent.name
+            self.peak[tenant] = max(self.peak.get(tenant, 0), self.running.count(tenant))
+        if path in self.hold:
+            self.entered[path].set()
+            assert self.hold[path].wait(5)
+        with self._lock:
+            self.running.remove(path.parent.name)
+        if path.stem == "bad":
+            return [ConversionResult(path=path, status="failed", error="boom")]
+        return [ConversionResult(path=path, status="success", markdown=f"# {path.stem}")]
+
+
+class TestJobQueue:
+    """Test lanes, quotas, results and cancellation."""
+
+    def test_interactive_preempts_batch_at_file_boundary(self):
+        """Test an interactive job runs right after the batch file in progress."""
+        converter = FakeConverter(hold=["t/b1.pdf"])
+        with JobQueue(converter, slots=1) as queue:
+            batch = queue.submit([Path("t/b1.pdf"), Path("t/b2.pdf"), Path("t/b3.pdf")])
+            assert converter.entered[Path("t/b1.pdf")].wait(5)
+            urgent = queue.submit([Path("t/i1.pdf")], lane=INTERACTIVE)
+            assert queue.pending() == {INTERACTIVE: 1, BATCH: 2}
+            converter.hold[Path("t/b1.pdf")].set()
+
+            assert urgent.result(5) == "# i1"
+            assert batch.result(5) == "# b1\n\n---\n\n# b2\n\n---\n\n# b3"
+        assert converter.order == ["b1.pdf", "i1.pdf", "b2.pdf", "b3.pdf"]
+        assert urgent.status == "done" and urgent.waited is not None
+
+    def test_tenant_quota_caps_concurrency(self):
+        """Test a tenant over its quota leaves free slots to other tenants."""
+        converter = FakeConverter(hold=["a/1.pdf"])
+        with JobQueue(converter, slots=2, quotas={"a": 1}) as queue:
+            job_a = queue.submit([Path("a/1.pdf"), Path("a/2.pdf")], tenant="a")
+            assert converter.entered[Path("a/1.pdf")].wait(5)
+            job_b = queue.submit([Path("b/1.pdf")], tenant="b")
+            assert job_b.result(5) == "# 1"
+            assert job_a.status == "running"
+            converter.hold[Path("a/1.pdf")].set()
+            job_a.result(5)
+        assert converter.peak["a"] == 1
+
+    def test_outputs_and_failures(self, tmp_path):
+        """Test jobs write their outputs, skip failed files and keep results."""
+        with JobQueue(FakeConverter(), slots=2) as queue:
+            job = queue.submit(
+                [Path("t/one.pdf"), Path("t/bad.pdf")], [tmp_path / "out.md"], title="T"
+            )
+            assert job.result(5) == [tmp_path / "out.md"]
+        assert (tmp_path / "out.md").read_text() == "# T\n\n---\n\n# one"
+        assert [r.status for r in job.results] == ["success", "failed"]
+
+    def test_cancel_drops_remaining_files(self):
+        """Test cancelling stops the job at the next file boundary."""
+        converter = FakeConverter(hold=["t/1.pdf"])
+        with JobQueue(converter, slots=1) as queue:
+            job = queue.submit([Path("t/1.pdf"), Path("t/2.pdf")])
+            assert converter.entered[Path("t/1.pdf")].wait(5)
+            assert job.cancel()
+            converter.hold[Path("t/1.pdf")].set()
+        assert job.status == "cancelled"
+        assert converter.order == ["1.pdf"]
+
+    def test_rejects_bad_lane_and_closed_queue(self, tmp_path):
+        """Test unknown lanes, bad output formats and closed queues raise."""
+        queue = JobQueue(FakeConverter())
+        with pytest.raises(ValueError, match="Unknown lane"):
+            queue.submit([Path("t/a.pdf")], lane="urgent")
+        with pytest.raises(ValueError, match="Unsupported output format"):
+            queue.submit([Path("t/a.pdf")], tmp_path / "out.docx")
+        queue.close()
+        with pytest.raises(RuntimeError):
+            queue.submit([Path("t/a.pdf")])
+
+    def test_same_path_in_concurrent_jobs(self, tmp_path):
+        """Test two slots converting one path on a shared converter keep their own results."""
+        from types import SimpleNamespace
+        from merge2md.converter import DoclingMarkdownConverter
+        from merge2md.progress import FINISHED
+
+        path = tmp_path / "same.md"
+        path.write_text("# Same")
+        converter = DoclingMarkdownConverter()
+        pages = iter([1, 2])
+
+        def fake_convert(source):
+            count = next(pages)
+            return SimpleNamespace(document=SimpleNamespace(
+                pages=dict.fromkeys(range(count)), export_to_markdown=lambda: f"# {count}",
+            ))
+
+        # Both files finish before either job collects its result.
+        both_finished = threading.Barrier(2, timeout=5)
+        emit = converter._emit
+
+        def emit_then_wait(*args, **kwargs):
+            emit(*args, **kwargs)
+            if FINISHED in args:
+                both_finished.wait()
+
+        converter._converter.convert = fake_convert
+        converter._emit = emit_then_wait
+        with JobQueue(converter, slots=2) as queue:
+            jobs = [queue.submit([path]), queue.submit([path])]
+            markdown = sorted(job.result(5) for job in jobs)
+
+        assert markdown == ["# 1", "# 2"]
+        results = [job.results[0] for job in jobs]
+        assert all(result.ok and result.attempts == 1 for result in results)
+        assert sorted(result.pages for result in results) == [1, 2]
@@ -0,0 +1,139 @@
+"""Unit tests for the command-line interface."""
+import pytest
+
+from pathlib import Path
+
+from merge2md.__main__ import (
+    _build_settings,
+    _collect_paths,
+    _parse_args,
+    _parse_coordinator_args,
+    _parse_overrides,
+    _parse_watch_args,
+    _parse_worker_args,
+)
+
+
+class TestBuildSettings:
+    """Test translating CLI flags into ConversionSettings."""
+
+    def test_defaults(self):
+        """Test settings built from no flags match the library defaults."""
+        settings = _build_settings(_parse_args(["a.pdf"]))
+        assert settings.ocr is True
+        assert settings.languages == ["en"]
+        assert settings.ocr_engine == "easyocr"
+        assert settings.table_structure is True
+        assert settings.overrides == {}
+
+    def test_profile_with_explicit_flags(self):
+        """Test explicit flags beat the profile's values."""
+        args = _parse_args(["a.pdf", "--profile", "fast", "--table-mode", "accurate"])
+        settings = _build_settings(args)
+        assert settings.ocr_engine == "tesseract"
+        assert settings.table_mode == "accurate"
+
+    def test_table_and_picture_flags(self):
+        """Test table/picture switches."""
+        args = _parse_args(["a.pdf", "--no-tables", "--picture-classification", "--picture-images"])
+        settings = _build_settings(args)
+        assert settings.table_structure is False
+        assert settings.picture_classification is True
+        assert settings.picture_images is True
+
+
+class TestParseArgs:
+    """Test argument parsing."""
+
+    def test_multiple_outputs(self):
+        """Test -o can be repeated."""
+        args = _parse_args(["a.pdf", "-o", "x.md", "-o", "x.pdf"])
+        assert args.outputs == ["x.md", "x.pdf"]
+
+    def test_default_output(self):
+        """Test no -o leaves the output to the library default."""
+        assert _parse_args(["a.pdf"]).outputs is None
+
+    def test_results_and_retry_args(self, tmp_path):
+        """Test --retry-failed works without file arguments."""
+        args = _parse_args(["--results", str(tmp_path / "run.json"), "--retry-failed", "--retries", "5"])
+        assert args.files == []
+        assert args.results == tmp_path / "run.json"
+        assert args.retry_failed is True
+        assert args.retries == 5
+
+    def test_profile_to(self, tmp_path):
+        """Test --profile-to is separate from the --profile presets."""
+        args = _parse_args(["a.pdf", "--profile", "fast", "--profile-to", str(tmp_path)])
+        assert args.profile == "fast"
+        assert args.profile_to == tmp_path
+        assert _parse_args(["a.pdf"]).profile_to is None
+
+    def test_watch_args(self):
+        """Test the watch sub-command accepts the shared conversion flags."""
+        args = _parse_watch_args(["inbox", "-o", "out.md", "--settle", "2", "--no-tables"])
+        assert args.directory == Path("inbox")
+        assert args.output == Path("out.md")
+        assert args.settle == 2.0
+        assert _build_settings(args).table_structure is False
+        assert _build_settings(args).workers == 1
+
+    def test_coordinator_and_worker_args(self):
+        """Test the distributed sub-commands share queue options."""
+        args = _parse_coordinator_args(["q.db", "a.pdf", "b.pdf", "-o", "out.md", "--max-attempts", "5"])
+        assert args.queue == Path("q.db")
+        assert args.files == ["a.pdf", "b.pdf"]
+        assert args.max_attempts == 5
+
+        args = _parse_worker_args(["q.db", "--exit-when-idle", "--profile", "fast"])
+        assert args.exit_when_idle is True
+        assert _build_settings(args).ocr_engine == "tesseract"
+        assert _build_settings(args).workers == 1
+        assert _build_settings(_parse_worker_args(["q.db", "--threads", "3"])).workers == 3
+
+
+class TestCollectPaths:
+    """Test expanding input patterns."""
+
+    def test_zip_inputs(self, tmp_path):
+        """Test archives expand to their members and member globs filter them."""
+        import zipfile
+
+        for name in ("b.zip", "a.zip"):
+            with zipfile.ZipFile(tmp_path / name, "w") as zf:
+                zf.writestr("doc10.pdf", b"x")
+                zf.writestr("doc2.pdf", b"x")
+                zf.writestr("notes.md", b"x")
+        (tmp_path / "c.md").write_text("x")
+
+        paths = _collect_paths([str(tmp_path / "a.zip"), f"{tmp_path}/b.zip!/*.pdf", str(tmp_path / "c.md")])
+
+        assert sorted(p.as_posix().replace(tmp_path.as_posix(), "") for p in paths) == [
+            "/a.zip!/doc10.pdf", "/a.zip!/doc2.pdf", "/a.zip!/notes.md",
+            "/b.zip!/doc10.pdf", "/b.zip!/doc2.pdf", "/c.md",
+        ]
+
+
+class TestParseOverrides:
+    """Test the --override parser."""
+
+    def test_parse_overrides(self):
+        """Test values are coerced and patterns collected."""
+        overrides = _parse_overrides([
+            "*financial*.pdf:table_structure=true,table_mode=accurate",
+            "*.png:images_scale=2.5,page_batch_size=8",
+        ])
+        assert overrides == {
+            "*financial*.pdf": {"table_structure": True, "table_mode": "accurate"},
+            "*.png": {"images_scale": 2.5, "page_batch_size": 8},
+        }
+
+    def test_parse_overrides_none(self):
+        """Test no overrides yields an empty mapping."""
+        assert _parse_overrides(None) == {}
+
+    @pytest.mark.parametrize("spec", ["table_structure=true", "*.pdf:table_structure"])
+    def test_parse_overrides_invalid(self, spec):
+        """Test malformed specs raise ValueError."""
+        with pytest.raises(ValueError, match="Invalid override"):
+            _parse_overrides([spec])
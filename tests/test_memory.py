@@ -0,0 +1,229 @@
+"""Memory regression tests: bounded growth over long runs, bounded peaks."""
+import gc
+import io
+import os
+import tracemalloc
+import weakref
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+from docling.datamodel.base_models import DocumentStream
+
+from merge2md.converter import ConversionSettings, DoclingMarkdownConverter
+from merge2md.merger import MarkdownMerger
+
+DATA_DIR = Path(__file__).parent / "data"
+
+# Allocations made by tracemalloc itself and by imports don't count.
+_NOISE = [
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap*>"),
+    tracemalloc.Filter(False, "<unknown>"),
+]
+
+
+def _retained(snapshot_before, snapshot_after):
+    """Bytes allocated between two snapshots and still alive."""
+    stats = snapshot_after.filter_traces(_NOISE).compare_to(
+        snapshot_before.filter_traces(_NOISE), "filename"
+    )
+    return sum(stat.size_diff for stat in stats)
+
+
+def _growth(call, calls, warmup=20, windows=3):
+    """
+    Bytes retained per call of *call*, after a warm-up: the least over
+    *windows* runs of *calls* calls each. A leak grows in every window;
+    one-off resizes of interpreter tables (interned strings, type
+    caches) don't.
+    """
+    for _ in range(warmup):
+        call()
+    retained = []
+    tracemalloc.start()
+    try:
+        for _ in range(windows):
+            gc.collect()
+            before = tracemalloc.take_snapshot()
+            for _ in range(calls):
+                call()
+            gc.collect()
+            retained.append(_retained(before, tracemalloc.take_snapshot()))
+    finally:
+        tracemalloc.stop()
+    return min(retained) / calls
+
+
+def _peak(call):
+    """Peak bytes allocated while *call* runs, above what was live before."""
+    gc.collect()
+    tracemalloc.start()
+    try:
+        baseline, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        call()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return peak - baseline
+
+
+def _fake_convert(source):
+    """Docling stand-in; a plain function so no call history piles up like a Mock's."""
+    if isinstance(source, DocumentStream):
+        text = source.stream.read().decode("utf-8")
+    else:
+        text = Path(source).read_text(encoding="utf-8")
+    return SimpleNamespace(document=SimpleNamespace(
+        pages={}, export_to_markdown=lambda: text,
+    ))
+
+
+@pytest.fixture
+def converter(monkeypatch):
+    converter = DoclingMarkdownConverter(ConversionSettings(dedupe=False))
+    monkeypatch.setattr(converter._converter, "convert", _fake_convert)
+    return converter
+
+
+class TestConverterGrowth:
+    """Repeated conversions on one converter must not accumulate memory."""
+
+    @pytest.fixture
+    def fixtures(self):
+        return sorted(DATA_DIR.iterdir())
+
+    def test_repeated_fixture_runs(self, converter, fixtures):
+        """Test converting the test fixtures over and over retains (almost) nothing."""
+        assert len(converter.to_markdown(fixtures)) == len(fixtures)
+
+        per_call = _growth(lambda: converter.to_markdown(fixtures), calls=200)
+
+        assert per_call < 256
+
+    def test_streams_are_released(self, converter):
+        """Test in-memory inputs don't outlive the call that converted them."""
+        names = iter(range(10**9))
+        payload = b"# Upload\n\n" + b"x" * 16 * 1024
+
+        def convert():
+            stream = DocumentStream(
+                name=f"upload-{next(names)}.md", stream=io.BytesIO(payload)
+            )
+            assert converter.to_markdown([stream]) == [payload.decode()]
+
+        per_call = _growth(convert, calls=200)
+
+        assert per_call < len(payload) // 8
+
+    def test_abandoned_iteration_releases_streams(self, converter):
+        """Test stopping `iter_results` early also drops the registered streams."""
+        buffers = [io.BytesIO(b"# Doc") for _ in range(3)]
+        refs = [weakref.ref(buffer) for buffer in buffers]
+        results = converter.iter_results(
+            [DocumentStream(name=f"{i}.md", stream=buffer) for i, buffer in enumerate(buffers)]
+        )
+        next(results)
+        results.close()
+        del buffers
+        gc.collect()
+
+        assert [ref() for ref in refs] == [None, None, None]
+
+    def test_repeated_csv_exports(self):
+        """Test re-exporting a streamed table retains nothing per export."""
+        converter = DoclingMarkdownConverter()
+        (_, table), = converter.iter_documents([DATA_DIR / "test.csv"])
+
+        per_call = _growth(table.export_to_markdown, calls=500)
+
+        assert per_call < 64
+
+    def test_large_csv_streams_in_bounded_memory(self, tmp_path):
+        """Test a big CSV renders with a peak far below its Markdown size."""
+        path = tmp_path / "big.csv"
+        with open(path, "w", encoding="utf-8") as fh:
+            fh.write("id,name,value\n")
+            for i in range(150_000):
+                fh.write(f"{i},row {i},{i * 3}\n")
+        converter = DoclingMarkdownConverter()
+        (_, table), = converter.iter_documents([path])
+
+        written = 0
+
+        def render():
+            nonlocal written
+            for piece in table.iter_markdown():
+                written += len(piece)
+
+        peak = _peak(render)
+
+        assert written > 4 * 1024 * 1024
+        assert peak < written // 4
+
+
+class TestMergerPeaks:
+    """Merging and exporting big documents must not copy them over and over."""
+
+    BLOCK = "# Section\n\n" + "Lorem ipsum dolor sit amet. " * 36_000 + "End."  # ~1 MiB
+
+    def test_merge_peak_is_one_output(self):
+        """Test merging allocates about one copy of the output, not one per step."""
+        merger = MarkdownMerger()
+        blocks = [self.BLOCK] * 16
+        size = len(self.BLOCK) * 16
+
+        peak = _peak(lambda: merger.merge(blocks, header="Big"))
+
+        assert peak < size * 1.25
+
+    def test_export_peak_is_chunked(self, tmp_path):
+        """Test exporting a big document only encodes one chunk at a time."""
+        merger = MarkdownMerger()
+        merged = merger.merge([self.BLOCK] * 16)
+        out = tmp_path / "big.md"
+
+        peak = _peak(lambda: merger.export(merged, out))
+
+        assert out.stat().st_size == len(merged.encode("utf-8"))
+        assert peak < 4 * merger.WRITE_CHUNK
+
+    def test_repeated_merge_and_export(self, tmp_path):
+        """Test many merge/export rounds on one merger retain nothing."""
+        merger = MarkdownMerger()
+        blocks = [self.BLOCK[:20_000]] * 8
+        out = tmp_path / "out.md"
+
+        per_call = _growth(lambda: merger.export(merger.merge(blocks), out), calls=100)
+
+        assert per_call < 256
+
+
+@pytest.mark.skipif(not os.path.exists("/proc/self/statm"), reason="needs /proc")
+class TestResidentSize:
+    """Process RSS stays flat across a long run (catches leaks outside Python's heap)."""
+
+    @staticmethod
+    def _rss():
+        with open("/proc/self/statm") as fh:
+            return int(fh.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+
+    def test_rss_flat_over_many_calls(self, converter, tmp_path):
+        """Test RSS doesn't keep climbing over thousands of convert/merge/export calls."""
+        fixtures = sorted(DATA_DIR.iterdir())
+        merger = MarkdownMerger()
+        out = tmp_path / "out.md"
+
+        def run(rounds):
+            for _ in range(rounds):
+                merger.export(merger.merge(converter.to_markdown(fixtures)), out)
+
+        run(200)  # warm-up: allocator pools, lazy imports
+        gc.collect()
+        start = self._rss()
+        run(2000)
+        gc.collect()
+
+        assert self._rss() - start < 8 * 1024 * 1024
@@ -1,4 +1,5 @@
 """Unit tests for the merger module."""
+import json
 import pytest
 import tempfile
 import subprocess
@@ -219,3 +220,240 @@ class TestMarkdownMerger:
         
         # Check separators
         assert result.count("\n\n---\n\n") == 5  # Header + 5 blocks = 5 separators
+
+    def test_merge_dedupe_sections(self):
+        """Test near-identical sections are collapsed across blocks."""
+        boilerplate = " ".join(f"word{i}" for i in range(60))
+        blocks = [
+            f"# Contract A\n\nUnique intro for A.\n\n## Exhibit\n\n{boilerplate}",
+            f"# Contract B\n\nUnique intro for B.\n\n## Exhibit\n\n{boilerplate} extra",
+        ]
+        merger = MarkdownMerger(dedupe_sections=True)
+        result = merger.merge(blocks)
+
+        assert result.count(boilerplate) == 1
+        assert result.count(MarkdownMerger.DUPLICATE_NOTE) == 1
+        assert "Unique intro for B." in result
+        # The collapsed section keeps its heading
+        assert result.count("## Exhibit") == 2
+
+    def test_merge_dedupe_sections_keeps_short_and_distinct(self):
+        """Test short stubs and distinct sections are left alone."""
+        blocks = [
+            "## Notes\n\nSee above.",
+            "## Notes\n\nSee above.",
+            " ".join(f"alpha{i}" for i in range(40)),
+            " ".join(f"beta{i}" for i in range(40)),
+        ]
+        result = MarkdownMerger(dedupe_sections=True).merge(blocks)
+        assert result == MarkdownMerger().merge(blocks)
+
+    def test_merge_dedupe_sections_off_by_default(self, merger):
+        """Test repeated sections are kept unless asked for."""
+        text = " ".join(f"word{i}" for i in range(60))
+        assert merger.merge([text, text]).count(text) == 2
+
+    def test_merge_with_toc(self, merger):
+        """Test the TOC links every source and heading to an anchor."""
+        blocks = ["# Intro\n\nText\n\n## Details\n\nMore", "## Summary\n\nDone"]
+        sources = [Path("docs/a.pdf"), Path("b.docx")]
+        result = merger.merge(blocks, header="Pack", sources=sources, toc=True)
+
+        assert result.startswith("# Pack")
+        assert "## Contents" in result
+        assert "- [a.pdf](#source-1)" in result
+        assert "  - [Intro](#source-1-intro)" in result
+        assert "    - [Details](#source-1-details)" in result
+        assert "- [b.docx](#source-2)" in result
+        # Depth is relative to each block's shallowest heading
+        assert "  - [Summary](#source-2-summary)" in result
+        assert '<a id="source-1"></a>' in result
+        assert '<a id="source-2-summary"></a>\n## Summary' in result
+
+    def test_merge_toc_skips_code_fences_and_dedupes_slugs(self, merger):
+        """Test fenced '#' lines aren't headings and repeated titles get unique anchors."""
+        block = "## Step\n\n```bash\n# comment\n```\n\n## Step\n\nAgain"
+        result = merger.merge([block], toc=True)
+
+        assert "- [Document 1](#source-1)" in result
+        assert "#source-1-step)" in result
+        assert "#source-1-step-1)" in result
+        assert "comment" not in result.split("---")[0]
+
+    def test_merge_without_toc_unchanged(self, merger):
+        """Test sources alone don't alter the output."""
+        blocks = ["# A", "# B"]
+        assert merger.merge(blocks, sources=[Path("a"), Path("b")]) == merger.merge(blocks)
+
+    def test_build_index_offsets(self, merger):
+        """Test index byte offsets slice the exact source blocks."""
+        blocks = ["# Café\n\nnaïve text", "## Other\n\nbody"]
+        sources = [Path("a.pdf"), Path("b.pdf")]
+        merged = merger.merge(blocks, header="Title", sources=sources, toc=True)
+        index = merger.build_index(merged, sources)
+        data = merged.encode("utf-8")
+
+        assert index["size"] == len(data)
+        first, second = index["sources"]
+        assert first["source"] == "a.pdf"
+        assert data[first["start"]:first["end"]].decode().endswith("naïve text")
+        assert data[second["start"]:second["end"]].decode().endswith("body")
+        heading = first["headings"][0]
+        assert heading["title"] == "Café"
+        assert data[heading["start"]:].startswith(b'<a id="source-1-caf')
+
+    def test_write_index(self, merger, temp_dir):
+        """Test the index sidecar is written next to the output."""
+        merged = merger.merge(["# A"], sources=[Path("a.pdf")], toc=True)
+        out_path = temp_dir / "merged.md"
+
+        index_path = merger.write_index(merged, out_path, [Path("a.pdf")])
+
+        assert index_path == temp_dir / "merged.md.index.json"
+        index = json.loads(index_path.read_text())
+        assert index["output"] == "merged.md"
+        assert index["sources"][0]["source"] == "a.pdf"
+
+    @patch('merge2md.merger.pypandoc.convert_file')
+    def test_export_html_with_pypandoc(self, mock_convert, merger, temp_dir):
+        """Test HTML export produces a standalone page via Pandoc."""
+        with patch('merge2md.merger._HAS_PYPANDOC', True):
+            output_path = temp_dir / "output.html"
+            merger.export("# Test", output_path)
+
+        mock_convert.assert_called_once()
+        assert mock_convert.call_args[0][1] == "html"
+        assert mock_convert.call_args[1]["outputfile"] == str(output_path)
+        assert "--standalone" in mock_convert.call_args[1]["extra_args"]
+
+    @patch('merge2md.merger.pypandoc.convert_file')
+    def test_export_removes_temp_file(self, mock_convert, merger, temp_dir):
+        """Test the Pandoc input temp file is cleaned up."""
+        with patch('merge2md.merger._HAS_PYPANDOC', True):
+            merger.export("# Test", temp_dir / "output.pdf")
+
+        assert not Path(mock_convert.call_args[0][0]).exists()
+
+    @patch('merge2md.merger.pypandoc.convert_file')
+    def test_export_all(self, mock_convert, merger, temp_dir):
+        """Test several outputs are written from the same merged text."""
+        with patch('merge2md.merger._HAS_PYPANDOC', True):
+            outputs = [temp_dir / "a.md", temp_dir / "a.pdf", temp_dir / "a.html"]
+            merger.export_all("# Test", outputs)
+
+        assert (temp_dir / "a.md").read_text(encoding="utf-8") == "# Test"
+        formats = sorted(call.args[1] for call in mock_convert.call_args_list)
+        assert formats == ["html", "pdf"]
+
+    def test_export_all_rejects_unknown_format_first(self, merger, temp_dir):
+        """Test a bad suffix fails before anything is written."""
+        outputs = [temp_dir / "a.md", temp_dir / "a.docx"]
+        with pytest.raises(ValueError, match="Unsupported output format: .docx"):
+            merger.export_all("# Test", outputs)
+        assert not (temp_dir / "a.md").exists()
+
+    @patch('merge2md.merger.pypandoc.convert_file', side_effect=RuntimeError("pandoc crashed"))
+    def test_export_all_propagates_errors(self, mock_convert, merger, temp_dir):
+        """Test an export failure is re-raised."""
+        with patch('merge2md.merger._HAS_PYPANDOC', True):
+            with pytest.raises(RuntimeError, match="pandoc crashed"):
+                merger.export_all("# Test", [temp_dir / "a.md", temp_dir / "a.pdf"])
+
+    def test_export_gzip(self, temp_dir):
+        """Test .md.gz is written compressed, chunk by chunk, at the chosen level."""
+        import gzip
+
+        merger = MarkdownMerger(compression_level=1)
+        merger.WRITE_CHUNK = 7
+        content = "# Title\n\nBody with ünïcode " * 50
+        output_path = temp_dir / "out.md.gz"
+
+        merger.export(content, output_path)
+
+        assert gzip.decompress(output_path.read_bytes()).decode("utf-8") == content
+        # Level 1 sets the gzip "fastest" flag; mtime=0 keeps output reproducible
+        assert output_path.read_bytes()[8] == 4
+        assert output_path.read_bytes()[4:8] == b"\0\0\0\0"
+
+    def test_export_zstd(self, temp_dir):
+        """Test .md.zst round-trips through zstandard."""
+        zstandard = pytest.importorskip("zstandard")
+        merger = MarkdownMerger(compression_level=5, compression_threads=2)
+        output_path = temp_dir / "out.md.zst"
+
+        merger.export("# Zstd", output_path)
+
+        with zstandard.ZstdDecompressor().stream_reader(output_path.open("rb")) as reader:
+            assert reader.read() == b"# Zstd"
+
+    def test_check_formats_compressed(self, merger, temp_dir):
+        """Test compression only applies to Markdown and zstd needs its package."""
+        merger.check_formats([temp_dir / "a.MD.GZ"])
+        with pytest.raises(ValueError, match="Unsupported output format: .pdf.gz"):
+            merger.check_formats([temp_dir / "a.pdf.gz"])
+        with patch('merge2md.merger._HAS_ZSTD', False):
+            with pytest.raises(RuntimeError, match="zstandard not installed"):
+                merger.check_formats([temp_dir / "a.md.zst"])
+
+    def test_export_failure_keeps_previous_output(self, temp_dir):
+        """Test a failed write leaves the old file instead of a truncated one."""
+        import gzip
+
+        output_path = temp_dir / "out.md.gz"
+        output_path.write_bytes(gzip.compress(b"old"))
+        merger = MarkdownMerger()
+
+        with patch('merge2md.merger.gzip.GzipFile', side_effect=OSError("disk full")):
+            with pytest.raises(OSError, match="disk full"):
+                merger.export("# New", output_path)
+
+        assert gzip.decompress(output_path.read_bytes()) == b"old"
+        assert [p.name for p in temp_dir.iterdir()] == ["out.md.gz"]
+
+    def test_export_parts_matches_merge(self, merger, temp_dir):
+        """Test file and string parts merge byte-for-byte like merge + export."""
+        spilled = temp_dir / "b.md"
+        spilled.write_text("\n\n## B\n\nCafé text\n\n", encoding="utf-8")
+        (temp_dir / "empty.md").write_bytes(b"")
+        parts = ["  # A\n", spilled, temp_dir / "empty.md", "C"]
+        expected = merger.merge(["  # A\n", spilled.read_text(encoding="utf-8"), "", "C"], header="T")
+
+        merger.export_parts(parts, [temp_dir / "out.md", temp_dir / "out.md.gz"], header="T")
+
+        import gzip
+        assert (temp_dir / "out.md").read_text(encoding="utf-8") == expected
+        assert gzip.decompress((temp_dir / "out.md.gz").read_bytes()).decode("utf-8") == expected
+
+    def test_export_parts_strips_unicode_whitespace(self, merger, temp_dir):
+        """Test file parts lose the same non-ASCII whitespace str.strip() removes."""
+        spilled = temp_dir / "b.md"
+        spilled.write_text("\u2028\u00a0 ## B\n\nÉté\u00a0 \n\u3000\u00a0 ", encoding="utf-8")
+        expected = merger.merge(["# A", spilled.read_text(encoding="utf-8"), "C"])
+
+        merger.export_parts(["# A", spilled, "C"], [temp_dir / "out.md"])
+
+        assert (temp_dir / "out.md").read_text(encoding="utf-8") == expected
+        assert "\u00a0" not in expected
+
+    def test_export_parts_copies_in_kernel(self, merger, temp_dir):
+        """Test file parts use copy_file_range and fall back when it's refused."""
+        import errno
+        import os
+
+        spilled = temp_dir / "b.md"
+        spilled.write_text("# B\n" + "x" * 10000 + "\n", encoding="utf-8")
+        expected = merger.merge(["# A", spilled.read_text(encoding="utf-8")])
+
+        with patch("merge2md.merger.os.copy_file_range", create=True,
+                   wraps=getattr(os, "copy_file_range", None)) as mock_copy:
+            if not hasattr(os, "copy_file_range"):
+                pytest.skip("no copy_file_range on this platform")
+            merger.export_parts(["# A", spilled], [temp_dir / "fast.md"])
+        mock_copy.assert_called()
+        assert (temp_dir / "fast.md").read_text(encoding="utf-8") == expected
+
+        refused = OSError(errno.EXDEV, "cross-device")
+        with patch("merge2md.merger.os.copy_file_range", create=True, side_effect=refused), \
+                patch("merge2md.merger.os.sendfile", create=True, side_effect=refused):
+            merger.export_parts(["# A", spilled], [temp_dir / "slow.md"])
+        assert (temp_dir / "slow.md").read_text(encoding="utf-8") == expected
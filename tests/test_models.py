@@ -0,0 +1,49 @@
+"""Unit tests for the models module."""
+import json
+import pytest
+from pathlib import Path
+from unittest.mock import patch
+
+from merge2md.models import MANIFEST_NAME, fetch_models, verify_models
+
+
+def _fake_download(output_dir, **kwargs):
+    """Stand-in for Docling's downloader that writes a few weight files."""
+    (output_dir / "layout").mkdir(exist_ok=True)
+    (output_dir / "layout" / "model.safetensors").write_bytes(b"layout")
+    (output_dir / "EasyOcr").mkdir(exist_ok=True)
+    (output_dir / "EasyOcr" / "craft.pth").write_bytes(b"craft")
+
+
+class TestModels:
+    """Test fetching and verifying pinned model directories."""
+
+    @pytest.fixture
+    def fetched(self, tmp_path):
+        """Fetch fake models into a temporary directory."""
+        with patch("docling.utils.model_downloader.download_models", side_effect=_fake_download):
+            return fetch_models(tmp_path / "models")
+
+    def test_fetch_writes_manifest(self, fetched):
+        """Test fetch pins every downloaded file."""
+        manifest = json.loads((fetched / MANIFEST_NAME).read_text())
+        assert set(manifest) == {"layout/model.safetensors", "EasyOcr/craft.pth"}
+
+    def test_verify_ok(self, fetched):
+        """Test an untouched directory verifies cleanly."""
+        assert verify_models(fetched) == []
+
+    def test_verify_detects_missing_and_modified(self, fetched):
+        """Test missing and modified files are reported."""
+        (fetched / "EasyOcr" / "craft.pth").unlink()
+        (fetched / "layout" / "model.safetensors").write_bytes(b"tampered")
+
+        problems = verify_models(fetched)
+        assert "Missing: EasyOcr/craft.pth" in problems
+        assert "Checksum mismatch: layout/model.safetensors" in problems
+
+    def test_verify_without_manifest(self, tmp_path):
+        """Test a directory that was never fetched is reported."""
+        problems = verify_models(tmp_path)
+        assert len(problems) == 1
+        assert "No manifest" in problems[0]
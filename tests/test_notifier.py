@@ -4,7 +4,19 @@ from pathlib import Path
 from unittest.mock import patch, call
 import subprocess
 
-from merge2md.notifier import show_completion_dialog, get_default_output_path
+from merge2md.notifier import (
+    CallbackNotifier,
+    ConsoleNotifier,
+    DesktopNotifier,
+    DialogNotifier,
+    NullNotifier,
+    WebhookNotifier,
+    default_notifier,
+    get_default_output_path,
+    get_notifier,
+    notify,
+    show_completion_dialog,
+)
 
 
 class TestNotifier:
@@ -122,4 +134,140 @@ class TestNotifier:
             path = get_default_output_path(filename)
             # May have number suffix if file exists
             assert path.name.startswith("output") and path.name.endswith(ext)
-            assert path.suffix == ext 
\ No newline at end of file
+            assert path.suffix == ext
+
+    def test_get_default_output_path_reserve(self, tmp_path, monkeypatch):
+        """Test reserved names are created with O_EXCL and never handed out twice."""
+        downloads = tmp_path / "Downloads"
+        downloads.mkdir()
+        monkeypatch.setattr(Path, "home", lambda: tmp_path)
+        (downloads / "merged.md").write_text("existing")
+
+        first = get_default_output_path("merged.md", reserve=True)
+        second = get_default_output_path("merged.md", reserve=True)
+
+        assert (first.name, second.name) == ("merged_1.md", "merged_2.md")
+        assert first.exists() and first.stat().st_size == 0
+
+    def test_get_default_output_path_reserve_race(self, tmp_path, monkeypatch):
+        """Test a name taken between listing and creating is skipped."""
+        import os
+        downloads = tmp_path / "Downloads"
+        downloads.mkdir()
+        monkeypatch.setattr(Path, "home", lambda: tmp_path)
+        real_open = os.open
+
+        def racing_open(path, flags, mode=0o777):
+            if Path(path).name == "merged.md":
+                (downloads / "merged.md").write_text("other run")
+            return real_open(path, flags, mode)
+
+        with patch('merge2md.notifier.os.open', side_effect=racing_open):
+            path = get_default_output_path("merged.md", reserve=True)
+
+        assert path.name == "merged_1.md"
+        assert (downloads / "merged.md").read_text() == "other run"
+
+    def test_get_default_output_path_compressed_suffix(self, tmp_path, monkeypatch):
+        """Test numbering goes before compound suffixes like .md.gz."""
+        (tmp_path / "Downloads").mkdir()
+        (tmp_path / "Downloads" / "merged.md.gz").write_bytes(b"")
+        monkeypatch.setattr(Path, "home", lambda: tmp_path)
+        assert get_default_output_path("merged.md.gz").name == "merged_1.md.gz"
+
+
+class TestNotifierBackends:
+    """Test the pluggable, non-blocking notifiers."""
+
+    def test_notify_runs_in_background(self, tmp_path):
+        """Test notify returns while the backend is still running."""
+        import threading
+        release = threading.Event()
+        calls = []
+
+        def slow_callback(path, success):
+            release.wait(5)
+            calls.append((path, success))
+
+        thread = notify(CallbackNotifier(slow_callback), tmp_path / "out.md", True)
+        assert calls == []
+        release.set()
+        thread.join(5)
+        assert calls == [(tmp_path / "out.md", True)]
+
+    def test_notify_logs_errors(self, tmp_path, caplog):
+        """Test a failing backend is logged, never raised."""
+        def broken(path, success):
+            raise OSError("no display")
+
+        notify(broken, tmp_path / "out.md", False).join(5)
+        assert "no display" in caplog.text
+
+    @patch('merge2md.notifier.subprocess.Popen')
+    def test_dialog_does_not_wait(self, mock_popen, tmp_path):
+        """Test the dialog is started in its own session and not waited on."""
+        DialogNotifier()(tmp_path / "out.md", True)
+        args, kwargs = mock_popen.call_args
+        assert args[0][0] == "osascript"
+        assert "Open in Finder" in args[0][2]
+        assert kwargs["start_new_session"] is True
+        mock_popen.return_value.wait.assert_not_called()
+
+    @patch('merge2md.notifier.sys.platform', "linux")
+    @patch('merge2md.notifier.subprocess.Popen')
+    def test_desktop_notify_send(self, mock_popen, tmp_path):
+        """Test Linux desktops use notify-send."""
+        DesktopNotifier()(tmp_path / "out.md", True)
+        command = mock_popen.call_args[0][0]
+        assert command[0] == "notify-send"
+        assert command[-2:] == ["Conversion Complete", "File saved as: out.md"]
+
+    def test_webhook_posts_json(self, tmp_path):
+        """Test the webhook receives output path and status."""
+        import json
+        import threading
+        from http.server import BaseHTTPRequestHandler, HTTPServer
+
+        received = []
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                received.append(json.loads(self.rfile.read(int(self.headers["Content-Length"]))))
+                self.send_response(204)
+                self.end_headers()
+
+            def log_message(self, *args):
+                pass
+
+        server = HTTPServer(("127.0.0.1", 0), Handler)
+        threading.Thread(target=server.handle_request, daemon=True).start()
+        try:
+            WebhookNotifier(f"http://127.0.0.1:{server.server_port}/done")(tmp_path / "out.md", False)
+        finally:
+            server.server_close()
+        assert received == [{"output": str(tmp_path / "out.md"), "success": False}]
+
+    def test_null_and_console(self, tmp_path, capsys):
+        """Test the no-op and console backends."""
+        NullNotifier()(tmp_path / "out.md", True)
+        assert capsys.readouterr().out == ""
+        ConsoleNotifier()(tmp_path / "out.md", True)
+        assert "Conversion complete" in capsys.readouterr().out
+
+    def test_get_notifier(self):
+        """Test backends are looked up by name."""
+        assert isinstance(get_notifier("none"), NullNotifier)
+        assert get_notifier("webhook", webhook_url="http://localhost:9/x").url == "http://localhost:9/x"
+        with pytest.raises(ValueError, match="needs a URL"):
+            get_notifier("webhook")
+        with pytest.raises(ValueError, match="Unknown notifier"):
+            get_notifier("pager")
+
+    def test_default_notifier_headless(self, monkeypatch):
+        """Test headless Linux falls back to the console."""
+        monkeypatch.setattr('merge2md.notifier.sys.platform', "linux")
+        monkeypatch.delenv("DISPLAY", raising=False)
+        monkeypatch.delenv("WAYLAND_DISPLAY", raising=False)
+        assert isinstance(default_notifier(), ConsoleNotifier)
+        monkeypatch.setattr('merge2md.notifier.sys.platform', "darwin")
+        assert isinstance(default_notifier(), DialogNotifier)
@@ -0,0 +1,100 @@
+"""Unit tests for the profiling module."""
+import pstats
+import time
+import pytest
+from types import SimpleNamespace
+
+from docling.datamodel.settings import settings as docling_settings
+
+from merge2md.profiling import Profiler, StageTimings, active_stages, stage
+
+
+def _busy_loop(seconds):
+    """Burn CPU so the sampler catches this frame."""
+    end = time.perf_counter() + seconds
+    total = 0
+    while time.perf_counter() < end:
+        total += 1
+    return total
+
+
+class TestStageTimings:
+    """Test stage aggregation and rendering."""
+
+    def test_add_and_rows(self):
+        """Test calls and seconds accumulate and rows sort slowest first."""
+        stages = StageTimings()
+        stages.add("merge", 0.5)
+        stages.add("export", 1.0)
+        stages.add("merge", 1.0)
+        assert stages.rows() == [("merge", 2, 1.5), ("export", 1, 1.0)]
+
+    def test_add_docling(self):
+        """Test Docling ProfilingItems are folded in with a docling. prefix."""
+        stages = StageTimings()
+        stages.add_docling({
+            "layout": SimpleNamespace(times=[0.25, 0.75]),
+            "ocr": SimpleNamespace(times=[]),
+        })
+        stages.add_docling(None)
+        assert stages.rows() == [("docling.layout", 2, 1.0)]
+
+    def test_render(self):
+        """Test the table lists every stage with mean milliseconds."""
+        stages = StageTimings()
+        stages.add("docling.table_structure", 0.3, count=3)
+        table = stages.render()
+        assert table.splitlines()[0].split() == ["Stage", "Calls", "Total", "s", "Mean", "ms"]
+        assert "docling.table_structure" in table
+        assert "100.0" in table
+
+
+class TestProfiler:
+    """Test profiling runs and their reports."""
+
+    def test_stage_is_noop_without_profiler(self):
+        """Test stage() records nothing when no profiler is running."""
+        assert active_stages() is None
+        with stage("anything"):
+            pass
+        assert active_stages() is None
+
+    def test_writes_reports(self, tmp_path):
+        """Test a run writes the summary, collapsed stacks and pstats."""
+        with Profiler(tmp_path, interval=0.001) as profiler:
+            with stage("busy"):
+                _busy_loop(0.2)
+
+        assert set(profiler.paths) == {"summary", "collapsed", "pstats"}
+        summary = profiler.paths["summary"].read_text()
+        assert "busy" in summary and "total" in summary
+        assert "_busy_loop" in summary  # cProfile section
+
+        lines = profiler.paths["collapsed"].read_text().splitlines()
+        assert lines
+        stack, count = lines[0].rsplit(" ", 1)
+        assert int(count) > 0
+        assert any("_busy_loop" in line for line in lines)
+        assert pstats.Stats(str(profiler.paths["pstats"])).total_calls > 0
+
+    def test_without_cprofile(self, tmp_path):
+        """Test cprofile=False skips the pstats file."""
+        with Profiler(tmp_path, cprofile=False) as profiler:
+            _busy_loop(0.02)
+        assert "pstats" not in profiler.paths
+
+    def test_enables_docling_timings_and_restores(self, tmp_path):
+        """Test Docling's pipeline timings are on only while profiling."""
+        before = docling_settings.debug.profile_pipeline_timings
+        with Profiler(tmp_path, cprofile=False):
+            assert docling_settings.debug.profile_pipeline_timings is True
+            assert active_stages() is not None
+        assert docling_settings.debug.profile_pipeline_timings == before
+        assert active_stages() is None
+
+    def test_nested_profiler_rejected(self, tmp_path):
+        """Test only one profiler can run at a time."""
+        with Profiler(tmp_path, cprofile=False):
+            with pytest.raises(RuntimeError):
+                with Profiler(tmp_path, cprofile=False):
+                    pass
@@ -0,0 +1,109 @@
+"""Unit tests for the progress module."""
+import io
+import pytest
+from pathlib import Path
+
+from merge2md.progress import ProgressBar, ProgressEvent, ProgressTracker
+
+
+class FakeClock:
+    """Manually advanced monotonic clock."""
+
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+def _run(tracker, clock, path, size, pages, seconds, **kwargs):
+    """Feed the events of one file taking *seconds*."""
+    tracker(ProgressEvent("started", path, bytes=size))
+    clock.now += seconds
+    tracker(ProgressEvent("finished", path, bytes=size, pages=pages, elapsed=seconds, **kwargs))
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+class TestProgressTracker:
+    """Test aggregation and ETA."""
+
+    def test_counts_and_throughput(self, clock):
+        """Test totals, failures and pages/s."""
+        tracker = ProgressTracker(clock=clock)
+        for name in ("a.pdf", "b.pdf", "c.pdf"):
+            tracker(ProgressEvent("queued", Path(name), bytes=1000))
+        _run(tracker, clock, Path("a.pdf"), 1000, 10, 5.0)
+        tracker(ProgressEvent("failed", Path("b.pdf"), bytes=1000, error="boom"))
+
+        assert (tracker.files_total, tracker.files_done, tracker.files_failed) == (3, 1, 1)
+        assert tracker.bytes_done == 2000
+        assert tracker.pages_per_second == 2.0
+
+    def test_eta_per_format(self, clock):
+        """Test remaining files are estimated from their own format's rate."""
+        tracker = ProgressTracker(clock=clock)
+        queued = {"a.pdf": 1000, "b.docx": 500, "c.pdf": 3000, "d.docx": 1000}
+        for name, size in queued.items():
+            tracker(ProgressEvent("queued", Path(name), bytes=size))
+        assert tracker.eta() is None
+
+        # PDFs: 10 pages per 1000 bytes at 2 pages/s; DOCX: 1 s per 500 bytes
+        _run(tracker, clock, Path("a.pdf"), 1000, 10, 5.0)
+        _run(tracker, clock, Path("b.docx"), 500, 0, 1.0)
+
+        # c.pdf → 30 pages → 15 s; d.docx → 2 s
+        assert tracker.eta() == pytest.approx(17.0)
+
+    def test_eta_divides_by_parallelism(self, clock):
+        """Test overlapping files (parallel workers) shorten the ETA."""
+        tracker = ProgressTracker(clock=clock)
+        for name in ("a.pdf", "b.pdf", "c.pdf", "d.pdf"):
+            tracker(ProgressEvent("queued", Path(name), bytes=1000))
+        tracker(ProgressEvent("started", Path("a.pdf")))
+        tracker(ProgressEvent("started", Path("b.pdf")))
+        clock.now += 4.0
+        for name in ("a.pdf", "b.pdf"):
+            tracker(ProgressEvent("finished", Path(name), bytes=1000, pages=4, elapsed=4.0))
+
+        # Two more 4 s files, two at a time
+        assert tracker.eta() == pytest.approx(4.0)
+
+    def test_cached_files_do_not_skew_rate(self, clock):
+        """Test cache hits count as done but not as conversion speed."""
+        tracker = ProgressTracker(clock=clock)
+        for name in ("a.pdf", "b.pdf", "c.pdf"):
+            tracker(ProgressEvent("queued", Path(name), bytes=1000))
+        _run(tracker, clock, Path("a.pdf"), 1000, 5, 0.01, cached=True)
+        assert tracker.eta() is None
+        _run(tracker, clock, Path("b.pdf"), 1000, 5, 10.0)
+        assert tracker.eta() == pytest.approx(10.0)
+
+
+class TestProgressBar:
+    """Test terminal rendering."""
+
+    def test_render(self, clock):
+        """Test the bar line shows files, pages, rate, ETA and the current file."""
+        stream = io.StringIO()
+        bar = ProgressBar(stream, ProgressTracker(clock=clock))
+        for name in ("a.pdf", "b.pdf"):
+            bar(ProgressEvent("queued", Path(name), bytes=1000))
+        bar(ProgressEvent("started", Path("a.pdf")))
+        clock.now += 65.0
+        bar(ProgressEvent("finished", Path("a.pdf"), bytes=1000, pages=130, elapsed=65.0))
+        bar(ProgressEvent("started", Path("b.pdf")))
+
+        line = bar.render()
+        assert line.startswith("[############------------] 1/2 files")
+        assert "130 pages · 2.0 pages/s · ETA 1m05s · b.pdf" in line
+        assert stream.getvalue().startswith("\r\x1b[K")
+        assert not stream.getvalue().endswith("\n")
+
+        clock.now += 65.0
+        bar(ProgressEvent("failed", Path("b.pdf"), bytes=1000, error="boom"))
+        assert "1 failed" in bar.render()
+        assert stream.getvalue().endswith("\n")
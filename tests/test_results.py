@@ -0,0 +1,91 @@
+"""Unit tests for the results module."""
+import errno
+import json
+import pytest
+from pathlib import Path
+
+from merge2md.results import (
+    ConversionResult,
+    RetryPolicy,
+    blocks_dir,
+    load_results,
+    save_results,
+)
+
+
+class TestRetryPolicy:
+    """Test which errors are retried and how long to wait."""
+
+    @pytest.mark.parametrize("exc", [
+        TimeoutError("timed out"),
+        ConnectionResetError(),
+        MemoryError(),
+        OSError(errno.EBUSY, "busy"),
+        RuntimeError("CUDA out of memory. Tried to allocate 2 GiB"),
+    ])
+    def test_transient(self, exc):
+        """Test timeouts, busy files and OOM count as transient."""
+        assert RetryPolicy().is_transient(exc)
+
+    @pytest.mark.parametrize("exc", [
+        ValueError("corrupt"),
+        FileNotFoundError(errno.ENOENT, "gone"),
+        RuntimeError("bad page"),
+    ])
+    def test_permanent(self, exc):
+        """Test deterministic errors are not retried."""
+        assert not RetryPolicy().is_transient(exc)
+        assert RetryPolicy().delay(1, exc) is None
+
+    def test_exponential_backoff(self):
+        """Test delays double up to the cap and stop after the last attempt."""
+        policy = RetryPolicy(attempts=5, backoff=1.0, factor=2.0, max_delay=3.0)
+        exc = TimeoutError()
+        assert [policy.delay(n, exc) for n in range(1, 6)] == [1.0, 2.0, 3.0, 3.0, None]
+
+
+class TestResultsFile:
+    """Test spilling and the JSON round trip."""
+
+    def test_spill_and_read(self, tmp_path):
+        """Test spilled Markdown leaves memory but stays readable."""
+        result = ConversionResult(Path("a.pdf"), "success", markdown="# A")
+        result.spill(tmp_path)
+        assert result.markdown is None
+        assert result.spill_path.parent == tmp_path
+        assert result.read_markdown() == "# A"
+
+    def test_spill_copies_foreign_spill_files(self, tmp_path):
+        """Test Markdown spilled elsewhere (by a worker) is copied into the directory."""
+        worker_file = tmp_path / "worker" / "x.md"
+        worker_file.parent.mkdir()
+        worker_file.write_text("# W", encoding="utf-8")
+        result = ConversionResult(Path("w.pdf"), "success", spill_path=worker_file)
+        result.spill(tmp_path / "blocks")
+        assert result.spill_path.parent == tmp_path / "blocks"
+        assert result.read_markdown() == "# W"
+        assert worker_file.exists()
+
+    def test_save_and_load(self, tmp_path):
+        """Test results survive a round trip with Markdown moved to the blocks dir."""
+        path = tmp_path / "run.json"
+        results = [
+            ConversionResult(Path("a.pdf"), "success", markdown="# A", seconds=1.5, pages=3, attempts=2),
+            ConversionResult(Path("b.pdf"), "failed", attempts=3, error="boom"),
+            ConversionResult(Path("c.pdf"), "missing", error="Missing file"),
+        ]
+        save_results(results, path)
+
+        data = json.loads(path.read_text())
+        assert data["results"][0]["markdown"] is None
+        assert Path(data["results"][0]["spill_path"]).parent == blocks_dir(path)
+
+        loaded = load_results(path)
+        assert [(r.path, r.status, r.ok) for r in loaded] == [
+            (Path("a.pdf"), "success", True),
+            (Path("b.pdf"), "failed", False),
+            (Path("c.pdf"), "missing", False),
+        ]
+        assert loaded[0].read_markdown() == "# A"
+        assert (loaded[0].seconds, loaded[0].pages, loaded[0].attempts) == (1.5, 3, 2)
+        assert loaded[1].error == "boom"
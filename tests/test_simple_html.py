@@ -0,0 +1,84 @@
+"""Unit tests for the simple_html module."""
+import pytest
+from pathlib import Path
+
+from merge2md.simple_html import decode_html, parse_html
+
+
+def _md(html):
+    page = parse_html(html.encode("utf-8"))
+    assert page is not None
+    return page.markdown
+
+
+class TestParseHtml:
+    """Test Markdown produced for simple pages."""
+
+    def test_sample_page(self):
+        """Test the test-data page renders like Docling's HTML export."""
+        data = (Path(__file__).parent / "data" / "test.html").read_bytes()
+        page = parse_html(data, "test.html")
+        assert page.title == "Test HTML Document"
+        assert page.export_to_markdown() == (
+            "# HTML Test Document\n\n"
+            "This is a test HTML file for testing Docling conversion.\n\n"
+            "## Section 1\n\n"
+            "Some content in section 1.\n\n"
+            "- Item 1\n- Item 2\n- Item 3"
+        )
+
+    def test_inline_formatting_and_links(self):
+        """Test emphasis, code and links inside a paragraph."""
+        assert _md(
+            '<p>Use <b>bold</b>, <em>em</em>, <code>x = 1</code> and '
+            '<a href="https://wiki/x">the <i>wiki</i></a>.</p>'
+        ) == "Use **bold**, *em*, `x = 1` and [the *wiki*](https://wiki/x)."
+
+    def test_whitespace_is_collapsed(self):
+        """Test source indentation and line breaks don't leak into paragraphs."""
+        assert _md("<p>\n   one\n   two  </p><p>three<br>four</p>") == "one two\n\nthree four"
+
+    def test_nested_and_ordered_lists(self):
+        """Test list markers, numbering and nesting."""
+        assert _md("<ol><li>One<ul><li>sub</li></ul></li><li>Two</li></ol>") == (
+            "1. One\n   - sub\n2. Two"
+        )
+
+    def test_table(self):
+        """Test a plain table becomes a Markdown table with escaped pipes."""
+        assert _md(
+            "<table><tr><th>Name</th><th>A|B</th></tr><tr><td>x</td><td>1</td></tr></table>"
+        ) == "| Name | A\\|B |\n| ---- | ---- |\n| x    | 1    |"
+
+    def test_pre_blockquote_image_and_scripts(self):
+        """Test code blocks keep whitespace, quotes are prefixed, scripts dropped."""
+        assert _md(
+            "<head><style>p {}</style></head><pre>  a\n  b</pre>"
+            "<blockquote><p>quoted</p></blockquote><img src='x.png'><script>var a;</script>"
+        ) == "```\n  a\n  b\n```\n\n> quoted\n\n<!-- image -->"
+
+    @pytest.mark.parametrize("html", [
+        "<p>chart</p><svg><circle/></svg>",
+        "<iframe src='x'></iframe>",
+        "<form><input name='q'></form>",
+        "<table><tr><td colspan='2'>x</td></tr></table>",
+        "<table><tr><td><table><tr><td>x</td></tr></table></td></tr></table>",
+        "<my-widget>x</my-widget>",
+    ])
+    def test_complex_markup_needs_docling(self, html):
+        """Test markup the lean parser can't render returns None."""
+        assert parse_html(html.encode("utf-8")) is None
+
+
+class TestDecodeHtml:
+    """Test character set detection."""
+
+    def test_meta_charset(self):
+        """Test <meta charset> picks the codec."""
+        data = '<meta charset="iso-8859-1"><p>café</p>'.encode("latin-1")
+        assert "café" in decode_html(data)
+
+    def test_bom_and_unknown_charset(self):
+        """Test a UTF-8 BOM wins and unknown charsets fall back to UTF-8."""
+        assert decode_html("﻿<p>ü</p>".encode("utf-8")) == "<p>ü</p>"
+        assert decode_html('<meta charset="bogus"><p>ü</p>'.encode("utf-8")).endswith("ü</p>")
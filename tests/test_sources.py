@@ -0,0 +1,120 @@
+"""Unit tests for the sources module."""
+import io
+import zipfile
+import pytest
+from pathlib import Path
+
+from docling.datamodel.base_models import DocumentStream
+
+from merge2md.sources import (
+    expand_archive,
+    open_binary,
+    open_input,
+    read_stream,
+    source_digest,
+    source_exists,
+    split_member,
+)
+from merge2md.utils import file_digest
+
+
+@pytest.fixture
+def bundle(tmp_path):
+    """A zip with two documents, a directory entry and macOS junk."""
+    path = tmp_path / "bundle.zip"
+    with zipfile.ZipFile(path, "w") as zf:
+        zf.writestr("reports/", "")
+        zf.writestr("reports/q1.pdf", b"%PDF-q1")
+        zf.writestr("notes.md", b"# Notes")
+        zf.writestr("__MACOSX/._notes.md", b"junk")
+        zf.writestr(".DS_Store", b"junk")
+    return path
+
+
+class TestArchiveMembers:
+    """Test addressing and reading zip members."""
+
+    def test_split_member(self, bundle):
+        """Test member paths split into archive and member name."""
+        assert split_member(Path(f"{bundle}!/reports/q1.pdf")) == (bundle, "reports/q1.pdf")
+        assert split_member(bundle) is None
+        # Only archive suffixes count
+        assert split_member(Path("odd!/name.pdf")) is None
+
+    def test_expand_archive(self, bundle):
+        """Test members are listed without directories or hidden files."""
+        assert [p.as_posix() for p in expand_archive(bundle)] == [
+            f"{bundle.as_posix()}!/reports/q1.pdf",
+            f"{bundle.as_posix()}!/notes.md",
+        ]
+        assert [p.name for p in expand_archive(bundle, "*.pdf")] == ["q1.pdf"]
+
+    def test_source_exists(self, bundle, tmp_path):
+        """Test existence checks for files and members."""
+        assert source_exists(bundle)
+        assert source_exists(Path(f"{bundle}!/notes.md"))
+        assert not source_exists(Path(f"{bundle}!/missing.md"))
+        assert not source_exists(Path(f"{tmp_path}/nope.zip!/notes.md"))
+
+    def test_source_digest_matches_extracted_file(self, bundle, tmp_path):
+        """Test a member hashes like the same bytes on disk."""
+        extracted = tmp_path / "notes.md"
+        extracted.write_bytes(b"# Notes")
+        assert source_digest(Path(f"{bundle}!/notes.md")) == file_digest(extracted)
+
+    def test_open_input(self, bundle, tmp_path):
+        """Test plain files pass as paths and members as in-memory streams."""
+        plain = tmp_path / "a.md"
+        with open_input(plain) as source:
+            assert source == str(plain)
+
+        member = Path(f"{bundle}!/reports/q1.pdf")
+        with open_input(member) as source:
+            assert isinstance(source, DocumentStream)
+            assert source.name == str(member)
+            assert source.stream.read() == b"%PDF-q1"
+
+    def test_open_input_renames_for_routing(self, bundle, tmp_path):
+        """Test a routing suffix renames files (via a temp link) and member streams."""
+        plain = tmp_path / "notes.txt"
+        plain.write_bytes(b"plain text")
+        with open_input(plain, suffix=".md") as source:
+            assert Path(source).name == "notes.txt.md"
+            assert Path(source).read_bytes() == b"plain text"
+        assert not Path(source).exists()
+
+        member = Path(f"{bundle}!/notes.md")
+        with open_input(member, suffix=".html") as source:
+            assert source.name == f"{member}.html"
+
+    def test_open_binary(self, bundle, tmp_path):
+        """Test files and members open as readable byte streams."""
+        plain = tmp_path / "a.md"
+        plain.write_bytes(b"# A")
+        with open_binary(plain) as fh:
+            assert fh.read() == b"# A"
+        with open_binary(Path(f"{bundle}!/notes.md")) as fh:
+            assert fh.read() == b"# Notes"
+
+    def test_open_input_spills_large_members(self, bundle):
+        """Test members over the limit go through a temp file with the same suffix."""
+        with open_input(Path(f"{bundle}!/reports/q1.pdf"), max_bytes=3) as source:
+            spilled = Path(source)
+            assert spilled.name == "q1.pdf"
+            assert spilled.read_bytes() == b"%PDF-q1"
+        assert not spilled.exists()
+
+
+class TestReadStream:
+    """Test bounded reads of file-like objects."""
+
+    def test_reads_into_memory(self):
+        """Test a stream becomes a rewound DocumentStream."""
+        stream = read_stream("upload.pdf", io.BytesIO(b"x" * 5000), max_bytes=5000)
+        assert stream.name == "upload.pdf"
+        assert stream.stream.read() == b"x" * 5000
+
+    def test_rejects_oversized(self):
+        """Test reading stops once the limit is exceeded."""
+        with pytest.raises(ValueError, match="exceeds"):
+            read_stream("big.pdf", io.BytesIO(b"x" * 5001), max_bytes=5000)
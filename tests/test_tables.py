@@ -0,0 +1,124 @@
+"""Unit tests for the tables module."""
+import csv
+import io
+import pytest
+from contextlib import nullcontext
+from pathlib import Path
+
+from merge2md.tables import MAX_PAD_WIDTH, CsvTable, is_table, sniff_dialect
+
+
+def _table(tmp_path, text, name="t.csv", **kwargs):
+    path = tmp_path / name
+    path.write_text(text, encoding="utf-8")
+    return CsvTable.from_path(path, **kwargs)
+
+
+class TestSniffDialect:
+    """Test dialect detection."""
+
+    def test_semicolons(self):
+        """Test European-style semicolon CSV is detected."""
+        assert sniff_dialect("a;b;c\n1;2;3\n4;5;6\n").delimiter == ";"
+
+    def test_tsv_suffix(self):
+        """Test .tsv is tab-separated without sniffing."""
+        assert sniff_dialect("a,b\n", ".tsv") is csv.excel_tab
+
+    def test_fallback(self):
+        """Test unsniffable input falls back to Excel CSV."""
+        assert sniff_dialect("") is csv.excel
+
+    def test_is_table(self):
+        """Test CSV/TSV suffixes are recognised case-insensitively."""
+        assert is_table(Path("a.CSV")) and is_table(Path("b.tsv"))
+        assert not is_table(Path("c.xlsx"))
+
+
+class TestCsvTable:
+    """Test streaming Markdown rendering."""
+
+    def test_aligned_table(self, tmp_path):
+        """Test header, separator and padded rows."""
+        table = _table(tmp_path, "name,city\nAnn,Oslo\nBartholomew,Rome\n")
+        assert table.export_to_markdown().splitlines() == [
+            "| name        | city |",
+            "| ----------- | ---- |",
+            "| Ann         | Oslo |",
+            "| Bartholomew | Rome |",
+        ]
+
+    def test_unaligned(self, tmp_path):
+        """Test align=False writes minimal rows."""
+        table = _table(tmp_path, "name,city\nBartholomew,Rome\n", align=False)
+        assert table.export_to_markdown().splitlines() == [
+            "| name | city |",
+            "| --- | --- |",
+            "| Bartholomew | Rome |",
+        ]
+
+    def test_escapes_pipes_and_newlines(self, tmp_path):
+        """Test quoted cells can't break the table."""
+        table = _table(tmp_path, 'a,b\n"x|y","two\nlines"\n', align=False)
+        assert table.export_to_markdown().splitlines()[-1] == "| x\\|y | two lines |"
+
+    def test_widths_from_sample_only(self, tmp_path):
+        """Test rows past the sample don't widen columns (and stay whole)."""
+        table = _table(tmp_path, "a\nxx\nyy\n" + "z" * 10 + "\n", sample_rows=2)
+        lines = table.export_to_markdown().splitlines()
+        assert lines[0] == "| a   |"
+        assert lines[-1] == "| " + "z" * 10 + " |"
+
+    def test_padding_is_capped(self, tmp_path):
+        """Test very long cells don't pad every other row."""
+        table = _table(tmp_path, "a\n" + "x" * 100 + "\ny\n")
+        assert table.export_to_markdown().splitlines()[-1] == "| " + "y".ljust(MAX_PAD_WIDTH) + " |"
+
+    def test_ragged_rows(self, tmp_path):
+        """Test short rows are padded to the column count."""
+        table = _table(tmp_path, "a,b,c\n1\n", align=False)
+        assert table.export_to_markdown().splitlines()[-1] == "| 1 |  |  |"
+
+    @pytest.mark.parametrize("align", [True, False])
+    def test_wide_rows_after_sample_keep_cells(self, tmp_path, align):
+        """Test a row wider than the sampled columns keeps its extra cells, with a note."""
+        table = _table(tmp_path, "a,b\n1,2\n3,4,EXTRA,MORE\n", sample_rows=1, align=align)
+        lines = table.export_to_markdown().splitlines()
+        assert [cell.strip() for cell in lines[3].strip("|").split("|")] == ["3", "4", "EXTRA", "MORE"]
+        assert lines[-1] == "_1 row has more than 2 columns; the extra cells follow the last column._"
+
+    def test_max_rows(self, tmp_path):
+        """Test truncation stops reading and leaves a note."""
+        table = _table(tmp_path, "n\n" + "".join(f"{i}\n" for i in range(100)), max_rows=3)
+        lines = table.export_to_markdown().splitlines()
+        assert [line.strip("| ") for line in lines[2:5]] == ["0", "1", "2"]
+        assert lines[-1] == "_Table truncated after 3 rows._"
+
+    def test_max_rows_not_reached(self, tmp_path):
+        """Test no note when the table fits."""
+        table = _table(tmp_path, "n\n1\n2\n", max_rows=2)
+        assert "truncated" not in table.export_to_markdown()
+
+    def test_bom_and_empty_file(self, tmp_path):
+        """Test a UTF-8 BOM is dropped and empty files give no table."""
+        path = tmp_path / "bom.csv"
+        path.write_bytes("﻿a,b\n1,2\n".encode("utf-8"))
+        assert CsvTable.from_path(path).export_to_markdown().startswith("| a ")
+        assert _table(tmp_path, "", name="empty.csv").export_to_markdown() == ""
+
+    def test_reexport_in_memory_stream(self):
+        """Test a stream-backed table can be exported twice and stays open."""
+        buffer = io.BytesIO(b"a\n1\n")
+
+        def opener():
+            buffer.seek(0)
+            return nullcontext(buffer)
+
+        table = CsvTable("t.csv", opener)
+        assert table.export_to_markdown() == table.export_to_markdown()
+        assert not buffer.closed
+
+    def test_iter_records(self, tmp_path):
+        """Test rows as header = value pairs, honouring max_rows."""
+        table = _table(tmp_path, "a,b\n1,2\n3,\n5,6\n", max_rows=2)
+        assert list(table.iter_records()) == ["a = 1, b = 2", "a = 3"]
@@ -2,7 +2,9 @@
 import pytest
 from pathlib import Path
 
-from merge2md.utils import natural_sort
+import hashlib
+
+from merge2md.utils import atomic_write, file_digest, hamming, natural_sort, simhash, split_cores
 
 
 class TestNaturalSort:
@@ -178,4 +180,141 @@ class TestNaturalSort:
             Path("doc20.pptx")
         ]
         
-        assert sorted_paths == expected 
\ No newline at end of file
+        assert sorted_paths == expected
+
+
+class TestSplitCores:
+    """Test the split_cores function."""
+
+    def test_split_even(self):
+        """Test cores are divided evenly between workers."""
+        assert split_cores(4, cores=16) == 4
+        assert split_cores(3, cores=16) == 5
+
+    def test_split_never_below_one(self):
+        """Test more workers than cores still leaves one thread each."""
+        assert split_cores(32, cores=8) == 1
+        assert split_cores(0, cores=8) == 8
+
+    def test_split_defaults_to_affinity(self, monkeypatch):
+        """Test the cores this process may run on are used by default."""
+        monkeypatch.setattr("merge2md.utils.os.cpu_count", lambda: 64)
+        monkeypatch.setattr("merge2md.utils.os.sched_getaffinity", lambda pid: {0, 1, 2, 3},
+                            raising=False)
+        assert split_cores(2) == 2
+
+    def test_split_falls_back_to_cpu_count(self, monkeypatch):
+        """Test the machine's core count is used where affinity is unknown."""
+        monkeypatch.delattr("merge2md.utils.os.sched_getaffinity", raising=False)
+        monkeypatch.setattr("merge2md.utils.os.cpu_count", lambda: 12)
+        assert split_cores(2) == 6
+
+
+class TestFileDigest:
+    """Test the file_digest function."""
+
+    def test_matches_hashlib(self, tmp_path):
+        """Test chunked hashing matches a one-shot SHA-256."""
+        path = tmp_path / "data.bin"
+        data = b"x" * 10_000 + b"tail"
+        path.write_bytes(data)
+        assert file_digest(path, chunk_size=1024) == hashlib.sha256(data).hexdigest()
+
+
+class TestAtomicWrite:
+    """Test the temp-file-and-rename writer."""
+
+    def test_replaces_file(self, tmp_path):
+        """Test the new content lands with normal permissions and no temp file."""
+        import os
+        target = tmp_path / "out.md"
+        target.write_text("old")
+        umask = os.umask(0)
+        os.umask(umask)
+
+        with atomic_write(target, fsync=True) as fh:
+            fh.write(b"new")
+
+        assert target.read_text() == "new"
+        assert target.stat().st_mode & 0o777 == 0o666 & ~umask
+        assert [p.name for p in tmp_path.iterdir()] == ["out.md"]
+
+    def test_failure_keeps_old_file(self, tmp_path):
+        """Test an error mid-write leaves the previous file intact."""
+        target = tmp_path / "out.md"
+        target.write_text("old")
+
+        with pytest.raises(RuntimeError):
+            with atomic_write(target) as fh:
+                fh.write(b"partial")
+                raise RuntimeError("crash")
+
+        assert target.read_text() == "old"
+        assert [p.name for p in tmp_path.iterdir()] == ["out.md"]
+
+    def test_keeps_existing_mode(self, tmp_path):
+        """Test replacing a file keeps its permissions rather than the umask's."""
+        import os
+        target = tmp_path / "out.md"
+        target.write_text("old")
+        os.chmod(target, 0o640)
+
+        with atomic_write(target) as fh:
+            fh.write(b"new")
+
+        assert target.stat().st_mode & 0o777 == 0o640
+
+    def test_replaces_symlink_target(self, tmp_path):
+        """Test a symlinked path keeps the link and updates the file it points to."""
+        real = tmp_path / "data" / "out.md"
+        real.parent.mkdir()
+        real.write_text("old")
+        link = tmp_path / "out.md"
+        link.symlink_to(real)
+
+        with atomic_write(link) as fh:
+            fh.write(b"new")
+
+        assert link.is_symlink()
+        assert real.read_text() == "new"
+        assert sorted(p.name for p in tmp_path.rglob("*")) == ["data", "out.md", "out.md"]
+
+    def test_umask_read_without_changing_it(self, monkeypatch):
+        """Test the umask comes from /proc where available, without os.umask."""
+        import os
+        from merge2md import utils
+
+        umask = os.umask(0o027)
+        try:
+            if not Path("/proc/self/status").exists():
+                pytest.skip("needs /proc")
+            monkeypatch.setattr(utils.os, "umask", lambda mask: pytest.fail("umask flipped"))
+            assert utils._umask() == 0o027
+        finally:
+            monkeypatch.undo()
+            os.umask(umask)
+
+
+class TestSimhash:
+    """Test the simhash and hamming functions."""
+
+    def test_identical_texts(self):
+        """Test identical texts hash identically."""
+        text = "the quick brown fox jumps over the lazy dog"
+        assert simhash(text) == simhash(text.upper())
+
+    def test_near_identical_texts_are_close(self):
+        """Test a small edit moves the hash only a few bits."""
+        base = " ".join(f"word{i}" for i in range(200))
+        assert hamming(simhash(base), simhash(base + " extra")) <= 6
+
+    def test_different_texts_are_far(self):
+        """Test unrelated texts are many bits apart."""
+        a = " ".join(f"alpha{i}" for i in range(100))
+        b = " ".join(f"beta{i}" for i in range(100))
+        assert hamming(simhash(a), simhash(b)) > 10
+
+    def test_hamming(self):
+        """Test bit counting."""
+        assert hamming(0b1010, 0b0110) == 2
+        assert hamming(7, 7) == 0
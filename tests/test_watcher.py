@@ -0,0 +1,120 @@
+"""Unit tests for the watcher module."""
+import os
+import threading
+import pytest
+from pathlib import Path
+from unittest.mock import patch
+
+from merge2md.watcher import FolderWatcher
+
+
+@pytest.fixture
+def watcher(tmp_path):
+    """A watcher over tmp_path/inbox whose converter echoes file contents."""
+    inbox = tmp_path / "inbox"
+    inbox.mkdir()
+    with patch('merge2md.converter.DocumentConverter'):
+        watcher = FolderWatcher(inbox, tmp_path / "out.md", settle=1.0)
+
+    def fake_convert(paths):
+        return [(p, p.read_text()) for p in paths]
+
+    with patch.object(watcher.converter, 'to_markdown_with_sources', side_effect=fake_convert) as mock:
+        watcher.convert_mock = mock
+        yield watcher
+
+
+def _age(path: Path, seconds: float = 60) -> None:
+    """Backdate *path*'s mtime so it counts as settled."""
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns - int(seconds * 1e9)))
+
+
+class TestFolderWatcher:
+    """Test incremental watching and merging."""
+
+    def test_existing_files_convert_immediately(self, watcher):
+        """Test files older than the settle time are merged on the first scan."""
+        for name in ("scan10.md", "scan2.md"):
+            (watcher.directory / name).write_text(f"# {name}")
+            _age(watcher.directory / name)
+
+        assert watcher.poll(now=0.0) is True
+        merged = watcher.output.read_text()
+        # Natural order, not arrival order
+        assert merged.index("# scan2.md") < merged.index("# scan10.md")
+
+    def test_new_file_waits_until_settled(self, watcher):
+        """Test a fresh file is converted only after its size/mtime stop changing."""
+        new = watcher.directory / "new.md"
+        new.write_text("# Part")
+
+        assert watcher.poll(now=0.0) is False
+        assert watcher.poll(now=0.5) is False
+
+        # Still being written: settle timer restarts
+        new.write_text("# Partial write")
+        assert watcher.poll(now=1.2) is False
+        assert watcher.poll(now=2.3) is True
+        assert "# Partial write" in watcher.output.read_text()
+
+    def test_only_changed_files_reconverted(self, watcher):
+        """Test unchanged files reuse their Markdown; removed files drop out."""
+        a = watcher.directory / "a.md"
+        b = watcher.directory / "b.md"
+        a.write_text("# A")
+        b.write_text("# B")
+        _age(a)
+        _age(b)
+        watcher.poll(now=0.0)
+
+        b.write_text("# B v2")
+        _age(b, 30)
+        assert watcher.poll(now=1.0) is True
+        assert watcher.convert_mock.call_args[0][0] == [b]
+        assert "# B v2" in watcher.output.read_text()
+
+        a.unlink()
+        assert watcher.poll(now=2.0) is True
+        assert "# A" not in watcher.output.read_text()
+        assert watcher.poll(now=3.0) is False
+
+    def test_failed_reconversion_drops_old_block(self, watcher):
+        """Test a changed file that fails to convert leaves the merge and isn't retried every poll."""
+        a = watcher.directory / "a.md"
+        a.write_text("# A v1")
+        _age(a)
+        watcher.poll(now=0.0)
+
+        a.write_text("# A v2 broken")
+        _age(a, 30)
+        watcher.convert_mock.side_effect = lambda paths: []
+        assert watcher.poll(now=1.0) is True
+        assert "# A v1" not in watcher.output.read_text()
+
+        assert watcher.poll(now=2.0) is False
+        assert watcher.convert_mock.call_args[0][0] == []
+
+    def test_ignores_partial_hidden_and_output(self, watcher, tmp_path):
+        """Test temp/hidden files, unknown types and the output itself are skipped."""
+        for name in ("scan.pdf.part", ".hidden.md", "~$draft.docx", "notes.xyz"):
+            (watcher.directory / name).write_text("x")
+            _age(watcher.directory / name)
+        watcher.output = watcher.directory / "merged.md"
+        watcher.output.write_text("old")
+        _age(watcher.output)
+
+        assert watcher.poll(now=0.0) is False
+        watcher.convert_mock.assert_called_once_with([])
+
+    def test_run_stops(self, watcher):
+        """Test run() returns once the stop event is set."""
+        stop = threading.Event()
+        watcher.interval = 0.01
+        with patch('merge2md.watcher._HAS_WATCHDOG', False):
+            thread = threading.Thread(target=watcher.run, args=(stop,))
+            thread.start()
+            stop.set()
+            watcher._wake.set()
+            thread.join(timeout=5)
+        assert not thread.is_alive()